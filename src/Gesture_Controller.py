@@ -1,20 +1,31 @@
 # Imports
 import cv2
 import mediapipe as mp
-import pyautogui
 import math
+import time
+import numpy as np
 from enum import IntEnum
-from ctypes import cast, POINTER
-from comtypes import CLSCTX_ALL
-from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
-from google.protobuf.json_format import MessageToDict
-import screen_brightness_control as sbcontrol
 
-# Add this import at the top
 from custom_gesture_manager import CustomGestureManager
+from frame_source import FrameBuffers, FrameGrabber, open_capture
+from hand_frame import hand_frames
+from gesture_debounce import GestureDebouncer
+from dynamic_gestures import DynGest, DynamicGestureRecognizer
+from hand_tracker import HandTracker
+from cursor_actuator import CursorActuator
+from input_backend import INPUT_BACKENDS, RecordingBackend, get_backend, make_backend
+from scroll_engine import ScrollEngine
+from level_actuator import LevelActuator
+from audio_control import FakeAudioBackend, get_volume
+from brightness_control import FakeBrightnessBackend, get_brightness
+from pointer_filter import POINTER_CURVES, make_pointer_filter
+from landmark_filter import LandmarkFilter
+from landmark_trace import TraceWriter, TraceReader
+from landmark_roi import LandmarkROI
+from inference_scheduler import InferenceScheduler
+from preview import PreviewRenderer
+from pipeline_metrics import PipelineMetrics
 
-pyautogui.FAILSAFE = False
-mp_drawing = mp.solutions.drawing_utils
 mp_hands = mp.solutions.hands
 
 # Gesture Encodings 
@@ -42,79 +53,125 @@ class HLabel(IntEnum):
     MINOR = 0
     MAJOR = 1
 
+# Landmark pairs HandRecog measures every frame: finger tip to finger base
+# (index, middle, ring, pinky), finger base to wrist, then the pinch, V tips and
+# V bases pairs
+LANDMARK_PAIRS = [(8,5),(12,9),(16,13),(20,17),(5,0),(9,0),(13,0),(17,0),(8,4),(8,12),(5,9)]
+PAIR_PINCH = 8
+PAIR_V_TIPS = 9
+PAIR_V_BASES = 10
+PAIR_MATRIX = np.zeros((len(LANDMARK_PAIRS), 21), dtype=np.float32)
+for idx, (a, b) in enumerate(LANDMARK_PAIRS):
+    PAIR_MATRIX[idx, a] = 1
+    PAIR_MATRIX[idx, b] = -1
+FINGER_BITS = np.array([8, 4, 2, 1])
+MIN_BASE_DIST = np.float32(0.01)
+# A finger counts as raised above FINGER_UP_RATIO (tip-to-base over
+# base-to-wrist distance), and as folded again only below FINGER_DOWN_RATIO,
+# so a ratio sitting on the boundary does not flap. Indexed by the previous
+# finger state, one threshold per finger.
+FINGER_UP_RATIO = 0.6
+FINGER_DOWN_RATIO = 0.45
+FINGER_THRESHOLDS = np.array([[FINGER_DOWN_RATIO if state & bit else FINGER_UP_RATIO for bit in (8, 4, 2, 1)]
+                              for state in range(16)], dtype=np.float32)
+
+# Debounce windows in ms: a gesture is confirmed after being seen for its
+# confirm window, the confirmed one is released after being gone for its
+# release window
+GESTURE_CONFIRM_MS = {
+    Gest.PALM: 80,
+    Gest.V_GEST: 80,
+    Gest.FIST: 100,
+    Gest.PINCH_MAJOR: 100,
+    Gest.PINCH_MINOR: 100,
+    Gest.MID: 120,
+    Gest.INDEX: 120,
+    Gest.TWO_FINGER_CLOSED: 120,
+}
+GESTURE_RELEASE_MS = {
+    Gest.FIST: 80,
+}
+DEFAULT_CONFIRM_MS = 120
+# gestures dropped at once on a confident observation, e.g. opening the fist ends a drag
+FAST_RELEASE_GESTURES = (Gest.FIST,)
+# handedness score needed for a fast release
+FAST_RELEASE_SCORE = 0.9
+# static gestures during which hand motions (swipes, circles, push / pull) are tracked
+DYNAMIC_GESTURE_POSES = (Gest.PALM, Gest.LAST4)
+
 # Convert Mediapipe Landmarks to recognizable Gestures
 class HandRecog:
-    # ... (keep your existing HandRecog class exactly as is) ...
-    def __init__(self, hand_label):
+    def __init__(self, hand_label, confirm_ms=None, release_ms=None):
         self.finger = 0
         self.ori_gesture = Gest.PALM
         self.prev_gesture = Gest.PALM
-        self.frame_count = 0
         self.hand_result = None
         self.hand_label = hand_label
+        self.coords = None
+        self.pair_diff = None
+        self.pair_dist = None
+        self.ambiguous = False
+        self.debouncer = GestureDebouncer(Gest.PALM, DEFAULT_CONFIRM_MS,
+                                          confirm_ms=GESTURE_CONFIRM_MS if confirm_ms is None else confirm_ms,
+                                          release_ms=GESTURE_RELEASE_MS if release_ms is None else release_ms,
+                                          fast_release=FAST_RELEASE_GESTURES)
+        self.motion = DynamicGestureRecognizer(DYNAMIC_GESTURE_POSES)
     
     def update_hand_result(self, hand_result):
+        """'hand_result' is the HandFrame of this hand, None when it is not in view"""
         self.hand_result = hand_result
+        self.coords = hand_result.coords if hand_result is not None else None
+        self.pair_diff = None
+        self.pair_dist = None
 
-    def get_signed_dist(self, point):
-        sign = -1
-        if self.hand_result.landmark[point[0]].y < self.hand_result.landmark[point[1]].y:
-            sign = 1
-        dist = (self.hand_result.landmark[point[0]].x - self.hand_result.landmark[point[1]].x)**2
-        dist += (self.hand_result.landmark[point[0]].y - self.hand_result.landmark[point[1]].y)**2
-        dist = math.sqrt(dist)
-        return dist*sign
-    
-    def get_dist(self, point):
-        dist = (self.hand_result.landmark[point[0]].x - self.hand_result.landmark[point[1]].x)**2
-        dist += (self.hand_result.landmark[point[0]].y - self.hand_result.landmark[point[1]].y)**2
-        dist = math.sqrt(dist)
-        return dist
-    
-    def get_dz(self,point):
-        return abs(self.hand_result.landmark[point[0]].z - self.hand_result.landmark[point[1]].z)
-    
     def set_finger_state(self):
         if self.hand_result == None:
             return
 
-        points = [[8,5,0],[12,9,0],[16,13,0],[20,17,0]]
-        self.finger = 0
-        self.finger = self.finger | 0 #thumb
-        for idx,point in enumerate(points):
-            
-            dist = self.get_signed_dist(point[:2])
-            dist2 = self.get_signed_dist(point[1:])
-            
-            try:
-                ratio = round(dist/dist2,1)
-            except:
-                ratio = round(dist/0.01,1)
+        # all landmark pair differences of the frame in one product
+        diff = PAIR_MATRIX @ self.coords
+        dist = np.hypot(diff[:, 0], diff[:, 1])
+        # positive when the first point of the pair is above the second one
+        signed = np.copysign(dist, np.negative(diff[:, 1]))
 
-            self.finger = self.finger << 1
-            if ratio > 0.5 :
-                self.finger = self.finger | 1
+        base = signed[4:8]
+        base[base == 0] = MIN_BASE_DIST
+        ratio = signed[:4] / base
+        up = np.greater_equal(ratio, FINGER_THRESHOLDS[self.finger])
+        self.finger = int(up @ FINGER_BITS)
+        # some finger inside the hysteresis band
+        self.ambiguous = bool(((ratio > FINGER_DOWN_RATIO) & (ratio < FINGER_UP_RATIO)).any())
 
-    def get_gesture(self):
+        self.pair_diff = diff
+        self.pair_dist = dist.tolist()
+
+    def get_gesture(self, now=None):
+        """
+        Debounced gesture of the hand. 'now' defaults to the timestamp of the
+        HandFrame, or the current time if the frame has none.
+        """
         if self.hand_result == None:
             return Gest.PALM
 
+        if self.pair_dist is None:
+            self.set_finger_state()
+        dist = self.pair_dist
+
         current_gesture = Gest.PALM
-        if self.finger in [Gest.LAST3,Gest.LAST4] and self.get_dist([8,4]) < 0.05:
+        if self.finger in [Gest.LAST3,Gest.LAST4] and dist[PAIR_PINCH] < 0.05:
             if self.hand_label == HLabel.MINOR :
                 current_gesture = Gest.PINCH_MINOR
             else:
                 current_gesture = Gest.PINCH_MAJOR
 
         elif Gest.FIRST2 == self.finger :
-            point = [[8,12],[5,9]]
-            dist1 = self.get_dist(point[0])
-            dist2 = self.get_dist(point[1])
-            ratio = dist1/dist2
+            dist1 = dist[PAIR_V_TIPS]
+            dist2 = dist[PAIR_V_BASES]
+            ratio = dist1/dist2 if dist2 else math.inf
             if ratio > 1.7:
                 current_gesture = Gest.V_GEST
             else:
-                if self.get_dz([8,12]) < 0.1:
+                if abs(self.pair_diff[PAIR_V_TIPS, 2]) < 0.1:
                     current_gesture =  Gest.TWO_FINGER_CLOSED
                 else:
                     current_gesture =  Gest.MID
@@ -122,334 +179,713 @@ class HandRecog:
         else:
             current_gesture =  self.finger
         
-        if current_gesture == self.prev_gesture:
-            self.frame_count += 1
-        else:
-            self.frame_count = 0
-
         self.prev_gesture = current_gesture
 
-        if self.frame_count > 4 :
-            self.ori_gesture = current_gesture
+        if now is None:
+            now = self.hand_result.timestamp
+            if now is None:
+                now = time.perf_counter()
+        confident = not self.ambiguous and self.hand_result.score >= FAST_RELEASE_SCORE
+        self.ori_gesture = self.debouncer.update(current_gesture, now, confident)
         return self.ori_gesture
 
+    def get_motion(self, now=None):
+        """DynGest completed by the current frame given the confirmed gesture, or None"""
+        return self.motion.update(self.hand_result, self.ori_gesture, now)
+
 # Executes commands according to detected gestures
 class Controller:
-    # ... (keep your existing Controller class exactly as is) ...
-    tx_old = 0
-    ty_old = 0
-    trial = True
-    flag = False
-    grabflag = False
-    pinchmajorflag = False
-    pinchminorflag = False
-    pinchstartxcoord = None
-    pinchstartycoord = None
-    pinchdirectionflag = None
-    prevpinchlv = 0
-    pinchlv = 0
-    framecount = 0
-    prev_hand = None
+    """
+    Input actions of one session: drag, clicks, pinch scrolling and levels.
+    Every session has its own Controller, with its own cursor actuator,
+    scroll engine and pointer filter; the input backend and the volume and
+    brightness actuators are the process wide ones unless given.
+    """
     pinch_threshold = 0.3
-    
-    def getpinchylv(hand_result):
-        dist = round((Controller.pinchstartycoord - hand_result.landmark[8].y)*10,1)
+    # notches/s per pinch level (a tenth of the frame) past pinch_threshold, and the top speed
+    scroll_speed = 15.0
+    max_scroll_speed = 40.0
+    # keys pressed for the dynamic gestures, when enabled
+    dynamic_keys = {
+        DynGest.SWIPE_LEFT: ('alt', 'left'),
+        DynGest.SWIPE_RIGHT: ('alt', 'right'),
+        DynGest.SWIPE_UP: ('pageup',),
+        DynGest.SWIPE_DOWN: ('pagedown',),
+        DynGest.CIRCLE_CW: ('volumeup',),
+        DynGest.CIRCLE_CCW: ('volumedown',),
+        DynGest.PUSH: ('playpause',),
+        DynGest.PULL: ('esc',),
+    }
+
+    def __init__(self, actuator=None, scroller=None, pointer_filter=None, scroll_mode='momentum',
+                 dynamic_gestures=False, input_backend=None, volume=None, brightness=None):
+        """
+        'actuator' (CursorActuator) moves the cursor and mouse buttons,
+        'scroller' (ScrollEngine) scrolls, 'pointer_filter' turns hand motion
+        into cursor motion, new ones by default; 'scroll_mode' is 'momentum'
+        (the pinch sets a scroll velocity) or 'step' (one notch every 5 stable frames).
+        'dynamic_gestures' True presses the dynamic_keys for swipes, circles
+        and push / pull; off by default, the motions are then only counted.
+        'input_backend' (InputBackend) and 'volume' / 'brightness'
+        (LevelActuator) replace the process wide ones for this controller.
+        """
+        self.backend = input_backend
+        self.volume = volume
+        self.brightness = brightness
+        self.actuator = actuator if actuator is not None else CursorActuator(backend=input_backend)
+        self.scroller = scroller if scroller is not None else ScrollEngine(backend=input_backend)
+        # hand motion to cursor motion, swap with set_pointer_filter
+        self.pointer_filter = pointer_filter if pointer_filter is not None else make_pointer_filter()
+        self.scroll_mode = scroll_mode
+        self.dynamic_gestures = dynamic_gestures
+        # dynamic gestures recognized, by DynGest
+        self.motions = {}
+        self.reset()
+
+    def reset(self):
+        """Forgets the gesture state: drag, pending click, pinch"""
+        self.flag = False
+        self.grabflag = False
+        self.pinchmajorflag = False
+        self.pinchminorflag = False
+        self.pinchstartxcoord = None
+        self.pinchstartycoord = None
+        self.pinchdirectionflag = None
+        self.prevpinchlv = 0
+        self.pinchlv = 0
+        self.framecount = 0
+        self.pointer_filter.reset()
+        self.scroller.release()
+
+    def input_backend(self):
+        return self.backend if self.backend is not None else get_backend()
+
+    def volume_actuator(self):
+        return self.volume if self.volume is not None else get_volume()
+
+    def brightness_actuator(self):
+        return self.brightness if self.brightness is not None else get_brightness()
+
+    def release(self):
+        """Lets go of a drag and stops scrolling, when the hands left the view"""
+        if self.grabflag:
+            self.actuator.mouse_up()
+        self.reset()
+
+    def start(self):
+        """
+        Starts the cursor actuator and scroll engine threads, and the level
+        actuators, which keep running while any controller uses them
+        """
+        self.actuator.start()
+        self.scroller.start()
+        self.volume_actuator().start()
+        self.brightness_actuator().start()
+        return self
+
+    def stop(self):
+        self.actuator.stop()
+        self.scroller.stop()
+        self.volume_actuator().stop()
+        self.brightness_actuator().stop()
+
+    def getpinchylv(self, hand_result):
+        dist = round((self.pinchstartycoord - hand_result.coords[8, 1].item())*10,1)
         return dist
 
-    def getpinchxlv(hand_result):
-        dist = round((hand_result.landmark[8].x - Controller.pinchstartxcoord)*10,1)
+    def getpinchxlv(self, hand_result):
+        dist = round((hand_result.coords[8, 0].item() - self.pinchstartxcoord)*10,1)
         return dist
     
-    def changesystembrightness():
-        currentBrightnessLv = sbcontrol.get_brightness(display=0)/100.0
-        currentBrightnessLv += Controller.pinchlv/50.0
-        if currentBrightnessLv > 1.0:
-            currentBrightnessLv = 1.0
-        elif currentBrightnessLv < 0.0:
-            currentBrightnessLv = 0.0       
-        sbcontrol.fade_brightness(int(100*currentBrightnessLv) , start = sbcontrol.get_brightness(display=0))
+    def changesystembrightness(self):
+        # faded on the brightness thread, a newer target replaces the running fade
+        self.brightness_actuator().nudge(self.pinchlv/50.0)
     
-    def changesystemvolume():
-        devices = AudioUtilities.GetSpeakers()
-        interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
-        volume = cast(interface, POINTER(IAudioEndpointVolume))
-        currentVolumeLv = volume.GetMasterVolumeLevelScalar()
-        currentVolumeLv += Controller.pinchlv/50.0
-        if currentVolumeLv > 1.0:
-            currentVolumeLv = 1.0
-        elif currentVolumeLv < 0.0:
-            currentVolumeLv = 0.0
-        volume.SetMasterVolumeLevelScalar(currentVolumeLv, None)
+    def changesystemvolume(self):
+        # coalesced and applied on the volume thread, clamped to 0.0 - 1.0
+        self.volume_actuator().nudge(self.pinchlv/50.0)
     
-    def scrollVertical():
-        pyautogui.scroll(120 if Controller.pinchlv>0.0 else -120)
+    def scrollVertical(self):
+        self.input_backend().scroll(1 if self.pinchlv>0.0 else -1)
         
-    def scrollHorizontal():
-        pyautogui.keyDown('shift')
-        pyautogui.keyDown('ctrl')
-        pyautogui.scroll(-120 if Controller.pinchlv>0.0 else 120)
-        pyautogui.keyUp('ctrl')
-        pyautogui.keyUp('shift')
-
-    def get_position(hand_result):
-        point = 9
-        position = [hand_result.landmark[point].x ,hand_result.landmark[point].y]
-        sx,sy = pyautogui.size()
-        x_old,y_old = pyautogui.position()
-        x = int(position[0]*sx)
-        y = int(position[1]*sy)
-        if Controller.prev_hand is None:
-            Controller.prev_hand = x,y
-        delta_x = x - Controller.prev_hand[0]
-        delta_y = y - Controller.prev_hand[1]
-
-        distsq = delta_x**2 + delta_y**2
-        ratio = 1
-        Controller.prev_hand = [x,y]
-
-        if distsq <= 25:
-            ratio = 0
-        elif distsq <= 900:
-            ratio = 0.07 * (distsq ** (1/2))
+    def scrollHorizontal(self):
+        self.input_backend().scroll(1 if self.pinchlv>0.0 else -1, horizontal=True)
+
+    def scroll_velocity(self, level):
+        excess = abs(level) - self.pinch_threshold
+        if excess <= 0:
+            return 0.0
+        return math.copysign(min(self.max_scroll_speed, self.scroll_speed * excess), level)
+
+    def scroll_control(self, hand_result):
+        # analog scrolling on the dominant axis of the pinch displacement
+        lvx = self.getpinchxlv(hand_result)
+        lvy = self.getpinchylv(hand_result)
+        if abs(lvy) > abs(lvx):
+            self.scroller.set_velocity(self.scroll_velocity(lvy), 0.0, hand_result.timestamp)
         else:
-            ratio = 2.1
-        x , y = x_old + delta_x*ratio , y_old + delta_y*ratio
+            self.scroller.set_velocity(0.0, self.scroll_velocity(lvx), hand_result.timestamp)
+
+    def set_pointer_filter(self, pointer_filter):
+        self.pointer_filter = pointer_filter
+
+    def get_position(self, hand_result):
+        point = 9
+        position = hand_result.coords[point, :2].tolist()
+        size = self.actuator.model.screen_size()
+        x_old,y_old = self.actuator.position()
+        delta_x, delta_y = self.pointer_filter.update(position, size, hand_result.timestamp)
+        x , y = x_old + delta_x , y_old + delta_y
         return (x,y)
 
-    def pinch_control_init(hand_result):
-        Controller.pinchstartxcoord = hand_result.landmark[8].x
-        Controller.pinchstartycoord = hand_result.landmark[8].y
-        Controller.pinchlv = 0
-        Controller.prevpinchlv = 0
-        Controller.framecount = 0
+    def pinch_control_init(self, hand_result):
+        self.pinchstartxcoord, self.pinchstartycoord = hand_result.coords[8, :2].tolist()
+        self.pinchlv = 0
+        self.prevpinchlv = 0
+        self.framecount = 0
 
-    def pinch_control(hand_result, controlHorizontal, controlVertical):
-        if Controller.framecount == 5:
-            Controller.framecount = 0
-            Controller.pinchlv = Controller.prevpinchlv
+    def pinch_control(self, hand_result, controlHorizontal, controlVertical):
+        if self.framecount == 5:
+            self.framecount = 0
+            self.pinchlv = self.prevpinchlv
 
-            if Controller.pinchdirectionflag == True:
+            if self.pinchdirectionflag == True:
                 controlHorizontal()
-            elif Controller.pinchdirectionflag == False:
+            elif self.pinchdirectionflag == False:
                 controlVertical()
 
-        lvx =  Controller.getpinchxlv(hand_result)
-        lvy =  Controller.getpinchylv(hand_result)
+        lvx =  self.getpinchxlv(hand_result)
+        lvy =  self.getpinchylv(hand_result)
             
-        if abs(lvy) > abs(lvx) and abs(lvy) > Controller.pinch_threshold:
-            Controller.pinchdirectionflag = False
-            if abs(Controller.prevpinchlv - lvy) < Controller.pinch_threshold:
-                Controller.framecount += 1
+        if abs(lvy) > abs(lvx) and abs(lvy) > self.pinch_threshold:
+            self.pinchdirectionflag = False
+            if abs(self.prevpinchlv - lvy) < self.pinch_threshold:
+                self.framecount += 1
             else:
-                Controller.prevpinchlv = lvy
-                Controller.framecount = 0
+                self.prevpinchlv = lvy
+                self.framecount = 0
 
-        elif abs(lvx) > Controller.pinch_threshold:
-            Controller.pinchdirectionflag = True
-            if abs(Controller.prevpinchlv - lvx) < Controller.pinch_threshold:
-                Controller.framecount += 1
+        elif abs(lvx) > self.pinch_threshold:
+            self.pinchdirectionflag = True
+            if abs(self.prevpinchlv - lvx) < self.pinch_threshold:
+                self.framecount += 1
             else:
-                Controller.prevpinchlv = lvx
-                Controller.framecount = 0
+                self.prevpinchlv = lvx
+                self.framecount = 0
+
+    def handle_controls(self, gesture, hand_result):  
+        # one-shot dynamic gestures
+        keys = self.dynamic_keys.get(gesture)
+        if keys is not None:
+            self.motions[gesture] = self.motions.get(gesture, 0) + 1
+            if self.dynamic_gestures:
+                self.input_backend().hotkey(*keys)
+            return
 
-    def handle_controls(gesture, hand_result):  
         x,y = None,None
         if gesture != Gest.PALM :
-            x,y = Controller.get_position(hand_result)
+            x,y = self.get_position(hand_result)
         
         # flag reset
-        if gesture != Gest.FIST and Controller.grabflag:
-            Controller.grabflag = False
-            pyautogui.mouseUp(button = "left")
+        if gesture != Gest.FIST and self.grabflag:
+            self.grabflag = False
+            self.actuator.mouse_up()
 
-        if gesture != Gest.PINCH_MAJOR and Controller.pinchmajorflag:
-            Controller.pinchmajorflag = False
+        if gesture != Gest.PINCH_MAJOR and self.pinchmajorflag:
+            self.pinchmajorflag = False
 
-        if gesture != Gest.PINCH_MINOR and Controller.pinchminorflag:
-            Controller.pinchminorflag = False
+        if gesture != Gest.PINCH_MINOR and self.pinchminorflag:
+            self.pinchminorflag = False
+            self.scroller.release()
 
         # implementation
         if gesture == Gest.V_GEST:
-            Controller.flag = True
-            pyautogui.moveTo(x, y, duration = 0.1)
+            self.flag = True
+            self.actuator.move_to(x, y)
 
         elif gesture == Gest.FIST:
-            if not Controller.grabflag : 
-                Controller.grabflag = True
-                pyautogui.mouseDown(button = "left")
-            pyautogui.moveTo(x, y, duration = 0.1)
+            if not self.grabflag : 
+                self.grabflag = True
+                self.actuator.mouse_down()
+            self.actuator.move_to(x, y)
 
-        elif gesture == Gest.MID and Controller.flag:
-            pyautogui.click()
-            Controller.flag = False
+        elif gesture == Gest.MID and self.flag:
+            self.actuator.click()
+            self.flag = False
 
-        elif gesture == Gest.INDEX and Controller.flag:
-            pyautogui.click(button='right')
-            Controller.flag = False
+        elif gesture == Gest.INDEX and self.flag:
+            self.actuator.click(button='right')
+            self.flag = False
 
-        elif gesture == Gest.TWO_FINGER_CLOSED and Controller.flag:
-            pyautogui.doubleClick()
-            Controller.flag = False
+        elif gesture == Gest.TWO_FINGER_CLOSED and self.flag:
+            self.actuator.double_click()
+            self.flag = False
 
         elif gesture == Gest.PINCH_MINOR:
-            if Controller.pinchminorflag == False:
-                Controller.pinch_control_init(hand_result)
-                Controller.pinchminorflag = True
-            Controller.pinch_control(hand_result,Controller.scrollHorizontal, Controller.scrollVertical)
+            if self.pinchminorflag == False:
+                self.pinch_control_init(hand_result)
+                self.pinchminorflag = True
+            if self.scroll_mode == 'momentum':
+                self.scroll_control(hand_result)
+            else:
+                self.pinch_control(hand_result,self.scrollHorizontal, self.scrollVertical)
         
         elif gesture == Gest.PINCH_MAJOR:
-            if Controller.pinchmajorflag == False:
-                Controller.pinch_control_init(hand_result)
-                Controller.pinchmajorflag = True
-            Controller.pinch_control(hand_result,Controller.changesystembrightness, Controller.changesystemvolume)
+            if self.pinchmajorflag == False:
+                self.pinch_control_init(hand_result)
+                self.pinchmajorflag = True
+            self.pinch_control(hand_result,self.changesystembrightness, self.changesystemvolume)
+
+# Recognition and controls of one user
+class GestureSession:
+    """
+    Everything between the hand landmarks of one camera and the input
+    actions of one user: hand tracking, the recognizer of every tracked
+    hand, custom gestures and the Controller acting on them. Sessions share
+    no state, so several can be fed side by side in one process, each with
+    the HandFrames of its own frames through process_results.
+    """
+
+    def __init__(self, controller=None, smoothing=False, debounce_scale=1.0, dom_hand=True,
+                 custom_gesture_manager=None, metrics=None):
+        """
+        'controller' acts on the gestures, a new Controller by default,
+        'smoothing' filters the landmarks of every hand before recognition,
+        'debounce_scale' scales the gesture confirm windows,
+        'dom_hand' True makes the right hand the major one,
+        'custom_gesture_manager' matches the custom gestures, sessions can
+        share one, 'metrics' (PipelineMetrics) times the stages.
+        """
+        self.controller = controller if controller is not None else Controller()
+        self.dom_hand = dom_hand
+        self.custom_gesture_manager = (custom_gesture_manager if custom_gesture_manager is not None
+                                       else CustomGestureManager())
+        self.metrics = metrics if metrics is not None else PipelineMetrics()
+        self.hr_major = None
+        self.hr_minor = None
+
+        # recognition state per tracked hand, keyed by hand ID
+        self.tracker = HandTracker()
+        self.landmark_filter = LandmarkFilter() if smoothing else None
+        self.confirm_ms = {gesture: GESTURE_CONFIRM_MS.get(gesture, DEFAULT_CONFIRM_MS) * debounce_scale
+                           for gesture in Gest}
+        self.reset_hands()
 
-# Main Gesture Controller Class
-class GestureController:
-    gc_mode = 0
-    cap = None
-    CAM_HEIGHT = None
-    CAM_WIDTH = None
-    hr_major = None
-    hr_minor = None
-    dom_hand = True
-
-    def __init__(self):
-        """Initialize with custom gesture support"""
-        GestureController.gc_mode = 1
-        GestureController.cap = cv2.VideoCapture(0)
-        GestureController.CAM_HEIGHT = GestureController.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
-        GestureController.CAM_WIDTH = GestureController.cap.get(cv2.CAP_PROP_FRAME_WIDTH)
-        
-        # Add custom gesture manager
-        self.custom_gesture_manager = CustomGestureManager()
-        print("Custom Gesture Manager initialized!")
-        self.custom_gesture_manager.list_gestures()
-    
-    @classmethod
-    def classify_hands(cls, results):
+        # Cooldown variables to prevent rapid gesture execution
+        self.last_custom_gesture_time = 0
+        self.gesture_cooldown = 1.0  # 1 second cooldown between custom gestures
+        self.custom_gesture_text = None
+
+    def start(self):
+        """Starts the threads of the controller"""
+        self.controller.start()
+        return self
+
+    def stop(self):
+        self.controller.stop()
+
+    def reset(self):
+        """Forgets hands and gesture state, custom gestures can fire at once"""
+        self.reset_hands()
+        self.controller.reset()
+        self.last_custom_gesture_time = -self.gesture_cooldown
+
+    def reset_hands(self):
+        """Forgets all tracked hands and their recognition state"""
+        self.tracker.reset()
+        self.hand_recogs = {}
+        # stand-ins for a role with no hand in view
+        self.no_hand = {role: HandRecog(role, self.confirm_ms) for role in (HLabel.MAJOR, HLabel.MINOR)}
+        self.handmajor = self.no_hand[HLabel.MAJOR]
+        self.handminor = self.no_hand[HLabel.MINOR]
+
+    def hand_recog(self, hand, role):
+        """HandRecog of the tracked HandFrame 'hand' in 'role' (HLabel), updated with the frame"""
+        if hand is None:
+            recog = self.no_hand[role]
+        else:
+            recog = self.hand_recogs.get(hand.hand_id)
+            if recog is None:
+                recog = self.hand_recogs[hand.hand_id] = HandRecog(role, self.confirm_ms)
+            recog.hand_label = role
+        recog.update_hand_result(hand)
+        return recog
+
+    def classify_hands(self, hands):
         """
         sets 'hr_major', 'hr_minor' based on classification(left, right) of 
-        hand obtained from mediapipe, uses 'dom_hand' to decide major and minor hand.
+        the HandFrames 'hands', uses 'dom_hand' to decide major and minor hand.
         """
         left , right = None,None
-        try:
-            handedness_dict = MessageToDict(results.multi_handedness[0])
-            if handedness_dict['classification'][0]['label'] == 'Right':
-                right = results.multi_hand_landmarks[0]
+        for hand in hands[:2]:
+            if hand.label == 'Right':
+                right = hand
             else :
-                left = results.multi_hand_landmarks[0]
-        except:
-            pass
-
-        try:
-            handedness_dict = MessageToDict(results.multi_handedness[1])
-            if handedness_dict['classification'][0]['label'] == 'Right':
-                right = results.multi_hand_landmarks[1]
-            else :
-                left = results.multi_hand_landmarks[1]
-        except:
-            pass
+                left = hand
         
-        if cls.dom_hand == True:
-            cls.hr_major = right
-            cls.hr_minor = left
+        if self.dom_hand == True:
+            self.hr_major = right
+            self.hr_minor = left
         else :
-            cls.hr_major = left
-            cls.hr_minor = right
+            self.hr_major = left
+            self.hr_minor = right
+
+    def process_results(self, hands, current_time):
+        """Runs gesture recognition and controls for the HandFrames of one frame"""
+        metrics = self.metrics
+
+        # persistent hand IDs, hands missing for a moment keep their last frame
+        t = time.perf_counter()
+        hands = self.tracker.update(hands, current_time)
+        if self.landmark_filter is not None:
+            self.landmark_filter.apply(hands)
+        if len(self.hand_recogs) > len(hands):
+            live = set(self.tracker.hand_ids())
+            self.hand_recogs = {hand_id: recog for hand_id, recog in self.hand_recogs.items() if hand_id in live}
+
+        if not hands:
+            # the hands are gone for good, a drag or a scroll ends here
+            self.controller.release()
+            return
+        if all(hand.held for hand in hands):
+            # missing for a moment: keep the gesture state, act on nothing
+            return
 
-    def start(self):
-        """Main loop with custom gesture support"""
-        handmajor = HandRecog(HLabel.MAJOR)
-        handminor = HandRecog(HLabel.MINOR)
+        # Classify hands and update hand results
+        self.classify_hands(hands)
+        handmajor = self.handmajor = self.hand_recog(self.hr_major, HLabel.MAJOR)
+        handminor = self.handminor = self.hand_recog(self.hr_minor, HLabel.MINOR)
+        t = metrics.record('classify_hands', t)
+
+        # Set finger states for default gestures
+        handmajor.set_finger_state()
+        handminor.set_finger_state()
+        t = metrics.record('finger_state', t)
         
-        # Cooldown variables to prevent rapid gesture execution
-        last_custom_gesture_time = 0
-        gesture_cooldown = 1.0  # 1 second cooldown between custom gestures
+        # Check for custom gestures first (priority)
+        custom_gesture_detected = False
+        
+        # all hands against all custom gestures at once
+        for gesture_name, similarity in self.custom_gesture_manager.recognize_gestures(
+                [hand for hand in hands if not hand.held]):
+            
+            # Only execute if high confidence and cooldown has passed
+            if (gesture_name and similarity > 0.85 and 
+                (current_time - self.last_custom_gesture_time) > self.gesture_cooldown):
+                
+                # Custom gesture info shown in the preview
+                self.custom_gesture_text = f"Custom: {gesture_name} ({similarity:.2f})"
+                
+                # Execute the custom gesture action on this session's outputs
+                controller = self.controller
+                if self.custom_gesture_manager.execute_gesture_action(
+                        gesture_name, controller.input_backend(), controller.volume_actuator(),
+                        controller.brightness_actuator()):
+                    self.last_custom_gesture_time = current_time
+                    custom_gesture_detected = True
+                    break  # Only execute one custom gesture per frame
+        t = metrics.record('custom_match', t)
+        
+        # If no custom gesture detected, use default controls
+        if not custom_gesture_detected:
+            gest_name = handminor.get_gesture()
+            
+            if gest_name == Gest.PINCH_MINOR:
+                t = metrics.record('finger_state', t)
+                if not handminor.hand_result.held:
+                    self.controller.handle_controls(gest_name, handminor.hand_result)
+            else:
+                gest_name = handmajor.get_gesture()
+                motion = handmajor.get_motion()
+                if motion is not None:
+                    gest_name = motion
+                t = metrics.record('finger_state', t)
+                if handmajor.hand_result is None or not handmajor.hand_result.held:
+                    self.controller.handle_controls(gest_name, handmajor.hand_result)
+            metrics.record('controls', t)
+
+# Main Gesture Controller Class
+class GestureController:
+    """Camera or replay loop of one GestureSession"""
+
+    def __init__(self, source=0, headless=False, preview_fps=15, roi_crop=False, max_skip=1,
+                 record_path=None, replay_path=None,
+                 frame_budget_ms=50, metrics_path=None, metrics_port=None,
+                 smoothing=False, debounce_scale=1.0, cursor_hz=60,
+                 pointer_curve='legacy', pointer_smoothing='none', input_backend=None,
+                 scroll_mode='momentum', dynamic_gestures=False, replay_live=False):
+        """
+        'source' is a camera index, a video file or an image directory, None
+        opens none. The other options mirror the command line flags below;
+        'input_backend' may also be an InputBackend, None uses the process
+        wide one, and a replay only drives real outputs with 'replay_live'.
+        """
+        self.gc_mode = 1
+        self.headless = headless or preview_fps <= 0
+        volume = brightness = None
+        if replay_path is not None and not replay_live:
+            input_backend = RecordingBackend()
+            volume = LevelActuator(FakeAudioBackend(), 'volume')
+            brightness = LevelActuator(FakeBrightnessBackend(), 'brightness')
+        elif isinstance(input_backend, str):
+            input_backend = make_backend(input_backend, self.headless)
+        self.preview_fps = preview_fps
+        self.roi = LandmarkROI() if roi_crop else None
+        self.scheduler = InferenceScheduler(max_skip) if max_skip > 1 else None
+        self.metrics = PipelineMetrics(frame_budget_ms)
+        self.metrics_path = metrics_path
+        self.metrics_port = metrics_port
+        self.record_path = record_path
+        self.replay_path = replay_path
+        self.live_source = True
+        self.cap = None
+        self.cam_height = None
+        self.cam_width = None
+        if replay_path is None and source is not None:
+            self.cap, self.live_source = open_capture(source)
+            self.cam_height = self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
+            self.cam_width = self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)
+        
+        # Add custom gesture manager
+        custom_gesture_manager = CustomGestureManager()
+        print("Custom Gesture Manager initialized!")
+        custom_gesture_manager.list_gestures()
 
-        with mp_hands.Hands(max_num_hands=2, min_detection_confidence=0.5, min_tracking_confidence=0.5) as hands:
-            while GestureController.cap.isOpened() and GestureController.gc_mode:
-                success, image = GestureController.cap.read()
+        controller = Controller(CursorActuator(cursor_hz, backend=input_backend), ScrollEngine(backend=input_backend),
+                                make_pointer_filter(pointer_curve, pointer_smoothing), scroll_mode,
+                                dynamic_gestures, input_backend, volume, brightness)
+        self.session = GestureSession(controller, smoothing, debounce_scale,
+                                      custom_gesture_manager=custom_gesture_manager, metrics=self.metrics)
 
-                if not success:
-                    print("Ignoring empty camera frame.")
-                    continue
-                
-                image = cv2.cvtColor(cv2.flip(image, 1), cv2.COLOR_BGR2RGB)
-                image.flags.writeable = False
-                results = hands.process(image)
+    def stop(self):
+        """Ends the main loop or replay after the current frame"""
+        self.gc_mode = 0
+
+    def start(self):
+        """Main loop with custom gesture support"""
+        if self.replay_path is not None:
+            return self.replay()
+        if self.cap is None:
+            raise ValueError("no capture source open, feed session.process_results directly")
+
+        # Capture runs on its own thread, we always process the newest frame
+        session = self.session
+        grabber = FrameGrabber(self.cap, live=self.live_source).start()
+        recorder = TraceWriter(self.record_path) if self.record_path else None
+        buffers = FrameBuffers()
+        metrics = self.metrics
+        if self.metrics_path or self.metrics_port:
+            metrics.start_exporter(self.metrics_path, self.metrics_port)
+        controller = session.start().controller
+        actuator = controller.actuator
+        scroller = controller.scroller
+        volume = controller.volume_actuator()
+        brightness = controller.brightness_actuator()
+        preview = None
+        if not self.headless:
+            preview = PreviewRenderer('Gesture Controller - Custom Gestures Enabled', self.preview_fps).start()
+
+        frames = 0
+        start_time = time.perf_counter()
+
+        try:
+            with mp_hands.Hands(max_num_hands=2, min_detection_confidence=0.5, min_tracking_confidence=0.5) as hands:
+                while grabber.isOpened() and self.gc_mode:
+                    success, frame = grabber.read()
+
+                    if not success:
+                        if self.live_source:
+                            print("Ignoring empty camera frame.")
+                        continue
                 
-                image.flags.writeable = True
-                image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-
-                if results.multi_hand_landmarks:                   
-                    # Classify hands and update hand results
-                    GestureController.classify_hands(results)
-                    handmajor.update_hand_result(GestureController.hr_major)
-                    handminor.update_hand_result(GestureController.hr_minor)
-
-                    # Set finger states for default gestures
-                    handmajor.set_finger_state()
-                    handminor.set_finger_state()
-                    
-                    # Check for custom gestures first (priority)
-                    custom_gesture_detected = False
-                    current_time = time.time()
-                    
-                    for hand_landmarks in results.multi_hand_landmarks:
-                        gesture_name, similarity = self.custom_gesture_manager.recognize_gesture(hand_landmarks)
-                        
-                        # Only execute if high confidence and cooldown has passed
-                        if (gesture_name and similarity > 0.85 and 
-                            (current_time - last_custom_gesture_time) > gesture_cooldown):
-                            
-                            # Display custom gesture info on screen
-                            cv2.putText(image, f"Custom: {gesture_name} ({similarity:.2f})", 
-                                       (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-                            
-                            # Execute the custom gesture action
-                            if self.custom_gesture_manager.execute_gesture_action(gesture_name):
-                                last_custom_gesture_time = current_time
-                                custom_gesture_detected = True
-                                break  # Only execute one custom gesture per frame
-                    
-                    # If no custom gesture detected, use default controls
-                    if not custom_gesture_detected:
-                        gest_name = handminor.get_gesture()
-                        
-                        if gest_name == Gest.PINCH_MINOR:
-                            Controller.handle_controls(gest_name, handminor.hand_result)
+                    frame_time = grabber.read_frame_time
+                    t = metrics.begin_frame(frame_time)
+                    infer = self.scheduler is None or self.scheduler.should_infer(frame_time)
+
+                    # mirrored BGR frame, also used for the preview
+                    image = None
+                    if infer or (preview is not None and preview.wants_frame()):
+                        image = buffers.mirror(frame)
+
+                    if infer:
+                        rgb = buffers.to_rgb()
+                        t = metrics.record('color', t)
+                        if self.roi is not None:
+                            frame_hands = self.roi.process(hands, rgb, frame_time)
                         else:
-                            gest_name = handmajor.get_gesture()
-                            Controller.handle_controls(gest_name, handmajor.hand_result)
-                    
-                    # Draw hand landmarks
-                    for hand_landmarks in results.multi_hand_landmarks:
-                        mp_drawing.draw_landmarks(image, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-                        
-                        # Display instruction for custom gestures
-                        cv2.putText(image, "Custom gestures enabled", 
-                                   (10, image.shape[0] - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-                else:
-                    Controller.prev_hand = None
-                    # Display message when no hands detected
-                    cv2.putText(image, "Show hand for gesture control", 
-                               (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-                
-                cv2.imshow('Gesture Controller - Custom Gestures Enabled', image)
-                
-                # Exit on ESC key or Enter key
-                key = cv2.waitKey(5) & 0xFF
-                if key == 13 or key == 27:  # Enter or ESC key
+                            frame_hands = hand_frames(hands.process(rgb), frame_time)
+                        if self.scheduler is not None:
+                            self.scheduler.update(frame_hands, frame_time)
+                    else:
+                        t = metrics.record('color', t)
+                        frame_hands = self.scheduler.predict(frame_time)
+                    metrics.record('inference', t)
+
+                    if recorder is not None:
+                        recorder.write(frame_hands, frame_time)
+
+                    session.process_results(frame_hands, time.time())
+                    if self.scheduler is not None:
+                        self.scheduler.set_gesture_changing(
+                            session.handmajor.debouncer.pending or session.handminor.debouncer.pending)
+
+                    frames += 1
+                    if preview is not None:
+                        t = time.perf_counter()
+                        if image is not None:
+                            status_text = None
+                            if time.time() - session.last_custom_gesture_time < session.gesture_cooldown:
+                                status_text = session.custom_gesture_text
+                            preview.submit(image, frame_hands, status_text)
+                        metrics.record('render', t)
+                    metrics.end_frame()
+                    if preview is not None and preview.exit_requested:
+                        break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            # ended by ESC, the source or an error: not running any more
+            self.gc_mode = 0
+            elapsed = time.perf_counter() - start_time
+            grabber.stop()
+            session.stop()
+            if preview is not None:
+                preview.stop()
+            if self.roi is not None:
+                self.roi.close()
+            metrics.stop_exporter()
+            if recorder is not None:
+                recorder.close()
+            if self.cap is not None:
+                self.cap.release()
+
+        print(f"Capture: {grabber.frames_read} frames read, {grabber.frames_dropped} stale frames dropped")
+        if elapsed > 0:
+            print(f"Processed {frames} frames in {elapsed:.2f}s: {frames / elapsed:.1f} fps")
+        metrics.report()
+        if self.roi is not None:
+            roi_stats = self.roi.stats()
+            print(f"ROI: {roi_stats['crop_frames']} cropped, {roi_stats['full_frames']} full-frame inferences, "
+                  f"{roi_stats['crop_misses']} lost in crop")
+        actuator_stats = actuator.stats()
+        cursor_stats = actuator.model.stats()
+        input_stats = controller.input_backend().stats()
+        print(f"Input: {input_stats['backend']}, {input_stats['events']} events in {input_stats['flushes']} flushes")
+        print(f"Cursor: {actuator_stats['targets_posted']} targets, {actuator_stats['moves_sent']} moves, "
+              f"{actuator_stats['events_sent']} button events (queue depth up to {actuator_stats['max_queue']}), "
+              f"{cursor_stats['syncs']} syncs, {cursor_stats['external_moves']} mouse moves")
+        scroll_stats = scroller.stats()
+        print(f"Scroll: {scroll_stats['updates']} velocity updates, {scroll_stats['scroll_events']} scroll events, "
+              f"{scroll_stats['notches']:.1f} notches, {scroll_stats['coasts']} coasts")
+        motions = ', '.join(f"{gesture.name.lower()} {count}" for gesture, count in controller.motions.items())
+        print(f"Motions: {motions or 'none'}"
+              f"{'' if controller.dynamic_gestures else ' (no keys pressed without --dynamic-gestures)'}")
+        volume_stats = volume.stats()
+        print(f"Volume: {volume_stats['requests']} steps applied in {volume_stats['applied']} changes, "
+              f"{volume_stats['reads']} reads, {volume_stats['errors']} errors")
+        brightness_stats = brightness.stats()
+        print(f"Brightness: {brightness_stats['requests']} steps, {brightness_stats['applied']} fade steps, "
+              f"{brightness_stats['fades_replaced']} fades replaced, {brightness_stats['errors']} errors")
+        track_stats = session.tracker.stats()
+        print(f"Tracking: {track_stats['tracks_started']} hands tracked, {track_stats['held_frames']} held frames, "
+              f"{track_stats['label_corrections']} handedness corrections")
+        if self.scheduler is not None:
+            sched_stats = self.scheduler.stats()
+            print(f"Scheduler: {sched_stats['inferred_frames']} inferred, "
+                  f"{sched_stats['predicted_frames']} predicted frames")
+        if recorder is not None:
+            print(f"Recorded {recorder.frames} frames to {self.record_path}")
+
+    def replay(self):
+        """
+        Feeds a recorded landmark trace through recognition and controls as
+        fast as possible, without camera or MediaPipe inference.
+        Returns the replay statistics.
+        """
+        reader = TraceReader(self.replay_path)
+        # timestamps in the trace are relative, keep the custom gesture
+        # cooldown deterministic by running it on trace time
+        session = self.session
+        session.last_custom_gesture_time = -session.gesture_cooldown
+
+        frames = 0
+        hand_frames = 0
+        start_time = time.perf_counter()
+        try:
+            for timestamp, hands in reader:
+                if not self.gc_mode:
                     break
-        
-        GestureController.cap.release()
-        cv2.destroyAllWindows()
-
-# Add the missing import at the top
-import time
+                self.metrics.begin_frame()
+                session.process_results(hands, timestamp)
+                self.metrics.end_frame()
+                frames += 1
+                if hands:
+                    hand_frames += 1
+        finally:
+            self.gc_mode = 0
+        elapsed = time.perf_counter() - start_time
+
+        stats = {
+            'frames': frames,
+            'hand_frames': hand_frames,
+            'elapsed': elapsed,
+            'fps': frames / elapsed if elapsed > 0 else 0.0,
+            'recorded_duration': reader.duration(),
+        }
+        print(f"Replayed {frames} frames ({hand_frames} with hands) in {elapsed:.3f}s: "
+              f"{stats['fps']:.1f} fps (recorded over {stats['recorded_duration']:.1f}s)")
+        input_stats = session.controller.input_backend().stats()
+        print(f"Input: {input_stats['backend']}, {input_stats['events']} events")
+        self.metrics.report()
+        return stats
 
 # uncomment to run directly
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Gesture Controller with Custom Gestures")
+    parser.add_argument('--source', default='0', help="camera index, video file or image directory")
+    parser.add_argument('--headless', action='store_true', help="no preview window, no drawing")
+    parser.add_argument('--preview-fps', type=float, default=15, help="preview window rate, 0 disables it")
+    parser.add_argument('--roi', action='store_true', help="run inference on a crop around the tracked hands")
+    parser.add_argument('--max-skip', type=int, default=1,
+                        help="run inference on at most every N-th frame while the hand is still")
+    parser.add_argument('--frame-budget', type=float, default=50, metavar='MS',
+                        help="report frames slower than this from capture to action as stalls")
+    parser.add_argument('--metrics-file', help="keep live per-stage latencies in this JSON file")
+    parser.add_argument('--metrics-port', type=int, help="serve live per-stage latencies on localhost")
+    parser.add_argument('--smooth', action='store_true', help="filter landmark jitter before recognition")
+    parser.add_argument('--debounce-scale', type=float, default=1.0,
+                        help="scale the gesture confirm windows, e.g. 0.6 together with --smooth")
+    parser.add_argument('--cursor-hz', type=float, default=60.0,
+                        help="rate the cursor glides towards the hand at, usually the display refresh rate")
+    parser.add_argument('--input-backend', choices=['auto'] + sorted(INPUT_BACKENDS), default='auto',
+                        help="how mouse and keyboard input is injected, auto: XTest on X11, "
+                             "none when --headless without a display, else pyautogui")
+    parser.add_argument('--pointer-curve', choices=sorted(POINTER_CURVES), default='legacy',
+                        help="hand speed to cursor gain curve")
+    parser.add_argument('--pointer-smoothing', choices=('none', 'one-euro'), default='none',
+                        help="smoothing of the hand position before the gain curve")
+    parser.add_argument('--scroll', choices=('momentum', 'step'), default='momentum',
+                        help="pinch scrolling: velocity with momentum, or a fixed step every 5 stable frames")
+    parser.add_argument('--dynamic-gestures', action='store_true',
+                        help="press keys for swipes (alt+left/right, pageup/down), circles (volume) "
+                             "and push / pull (play/pause, esc)")
+    parser.add_argument('--record', metavar='TRACE', help="record hand landmarks to a trace file")
+    parser.add_argument('--replay', metavar='TRACE', help="replay a recorded trace instead of using the camera")
+    parser.add_argument('--replay-live', action='store_true',
+                        help="let --replay move the cursor and change volume / brightness, default: recorded only")
+    args = parser.parse_args()
+
     print("Starting Gesture Controller with Custom Gestures...")
-    gc1 = GestureController()
-    gc1.start()
\ No newline at end of file
+    gc1 = GestureController(source=args.source, headless=args.headless, preview_fps=args.preview_fps,
+                            roi_crop=args.roi,
+                            max_skip=args.max_skip,
+                            record_path=args.record, replay_path=args.replay,
+                            frame_budget_ms=args.frame_budget,
+                            metrics_path=args.metrics_file, metrics_port=args.metrics_port,
+                            smoothing=args.smooth, debounce_scale=args.debounce_scale,
+                            cursor_hz=args.cursor_hz,
+                            pointer_curve=args.pointer_curve, pointer_smoothing=args.pointer_smoothing,
+                            input_backend=args.input_backend, scroll_mode=args.scroll,
+                            dynamic_gestures=args.dynamic_gestures, replay_live=args.replay_live)
+    gc1.start()
@@ -6,6 +6,7 @@ import glob
 import math
 import pyautogui
 import time
+from frame_pacer import FramePacer
 
 class Marker:
     def __init__(self, dict_type = aruco.DICT_4X4_50, thresh_constant = 1):
@@ -465,8 +466,7 @@ class Mouse:
 class GestureController:
     gc_mode = 0
     pyautogui.FAILSAFE = False
-    f_start_time = 0
-    f_now_time = 0
+    pacer = None
     
     cam_width  = 0
     cam_height = 0
@@ -486,8 +486,7 @@ class GestureController:
             print("CANNOT OPEN CAMERA")
         
         GestureController.gc_mode = 1
-        GestureController.f_start_time = time.time()
-        GestureController.f_now_time = time.time()
+        GestureController.pacer = FramePacer(fps=30.0)
         
     def start(self):
         while (True):
@@ -496,10 +495,7 @@ class GestureController:
                 print('Exiting Gesture Controller')
                 break
             #fps control
-            fps = 30.0
-            GestureController.f_start_time = time.time()
-            while (GestureController.f_now_time-GestureController.f_start_time <= 1.0/fps):
-                GestureController.f_now_time = time.time()
+            GestureController.pacer.wait()
             
             #read camera
             ret, frame = GestureController.cap.read()
@@ -537,6 +533,7 @@ class GestureController:
                 break
         
         # When everything done, release the capture
+        GestureController.pacer.report()
         GestureController.cap.release()
         cv2.destroyAllWindows()
         
@@ -15,6 +15,7 @@ import wikipedia
 import subprocess
 from difflib import SequenceMatcher
 import Gesture_Controller
+from input_backend import get_backend
 #import Gesture_Controller_Gloved as Gesture_Controller
 import app
 from threading import Thread
@@ -39,6 +40,7 @@ is_listening = False  # Current listening state
 is_processing = False  # Current processing state
 wake_word = 'rohan'  # Wake word
 audio_queue = queue.Queue()  # Queue for audio processing
+gesture_controller = None  # GestureController launched by voice, if any
 
 
 # ------------------Functions----------------------
@@ -115,37 +117,36 @@ def move_cursor(direction=None, x=None, y=None):
         x: X coordinate - optional
         y: Y coordinate - optional
     """
-    current_x, current_y = pyautogui.position()
     step = 50  # pixels to move
     
     if x is not None and y is not None:
-        pyautogui.moveTo(x, y, duration=0.1)
+        get_backend().move_to(x, y)
     elif direction:
         direction = direction.lower()
         if 'up' in direction:
-            pyautogui.moveRel(0, -step, duration=0.1)
+            get_backend().move_rel(0, -step)
         elif 'down' in direction:
-            pyautogui.moveRel(0, step, duration=0.1)
+            get_backend().move_rel(0, step)
         elif 'left' in direction:
-            pyautogui.moveRel(-step, 0, duration=0.1)
+            get_backend().move_rel(-step, 0)
         elif 'right' in direction:
-            pyautogui.moveRel(step, 0, duration=0.1)
+            get_backend().move_rel(step, 0)
 
 def left_click():
     """Perform a left mouse click."""
-    pyautogui.click()
+    get_backend().click()
 
 def right_click():
     """Perform a right mouse click."""
-    pyautogui.click(button='right')
+    get_backend().click(button='right')
 
 def double_click():
     """Perform a double left click."""
-    pyautogui.doubleClick()
+    get_backend().double_click()
 
 def middle_click():
     """Perform a middle mouse click."""
-    pyautogui.click(button='middle')
+    get_backend().click(button='middle')
 
 def mouse_down(button='left'):
     """
@@ -154,7 +155,7 @@ def mouse_down(button='left'):
     Args:
         button: 'left', 'right', or 'middle'
     """
-    pyautogui.mouseDown(button=button)
+    get_backend().mouse_down(button)
 
 def mouse_up(button='left'):
     """
@@ -163,7 +164,7 @@ def mouse_up(button='left'):
     Args:
         button: 'left', 'right', or 'middle'
     """
-    pyautogui.mouseUp(button=button)
+    get_backend().mouse_up(button)
 
 def drag(start_x, start_y, end_x, end_y):
     """
@@ -175,8 +176,15 @@ def drag(start_x, start_y, end_x, end_y):
         end_x: Ending X coordinate
         end_y: Ending Y coordinate
     """
-    pyautogui.moveTo(start_x, start_y)
-    pyautogui.dragTo(end_x, end_y, duration=0.5)
+    backend = get_backend()
+    backend.move_to(start_x, start_y)
+    backend.mouse_down()
+    # intermediate moves over 0.5 s, applications ignore a drag that jumps
+    steps = 25
+    for i in range(1, steps + 1):
+        time.sleep(0.5 / steps)
+        backend.move_to(start_x + (end_x - start_x) * i / steps, start_y + (end_y - start_y) * i / steps)
+    backend.mouse_up()
 
 def scroll(direction='down', amount=3):
     """
@@ -184,22 +192,20 @@ def scroll(direction='down', amount=3):
     
     Args:
         direction: 'up' or 'down'
-        amount: Number of scroll units
+        amount: Number of wheel notches
     """
     if direction.lower() in ['up', 'down']:
         scroll_amount = amount if direction.lower() == 'down' else -amount
-        pyautogui.scroll(scroll_amount)
+        get_backend().scroll(scroll_amount)
     elif direction.lower() in ['left', 'right']:
         # Horizontal scroll
-        pyautogui.keyDown('shift')
-        scroll_amount = -amount if direction.lower() == 'right' else amount
-        pyautogui.scroll(scroll_amount)
-        pyautogui.keyUp('shift')
+        scroll_amount = amount if direction.lower() == 'right' else -amount
+        get_backend().scroll(scroll_amount, horizontal=True)
 
 # ==================== KEYBOARD FUNCTIONS ====================
 def press_key(key):
     """Press and release a key."""
-    pyautogui.press(key)
+    get_backend().press(key)
 
 def key_combination(*keys):
     """
@@ -208,35 +214,35 @@ def key_combination(*keys):
     Args:
         *keys: Variable number of keys
     """
-    pyautogui.hotkey(*keys)
+    get_backend().hotkey(*keys)
 
 def type_text(text):
     """Type text using keyboard."""
-    pyautogui.typewrite(text)
+    get_backend().write(text)
 
 def copy():
     """Copy selected text."""
-    pyautogui.hotkey('ctrl', 'c')
+    get_backend().hotkey('ctrl', 'c')
 
 def paste():
     """Paste clipboard content."""
-    pyautogui.hotkey('ctrl', 'v')
+    get_backend().hotkey('ctrl', 'v')
 
 def cut():
     """Cut selected text."""
-    pyautogui.hotkey('ctrl', 'x')
+    get_backend().hotkey('ctrl', 'x')
 
 def undo():
     """Undo last action."""
-    pyautogui.hotkey('ctrl', 'z')
+    get_backend().hotkey('ctrl', 'z')
 
 def redo():
     """Redo last action."""
-    pyautogui.hotkey('ctrl', 'y')
+    get_backend().hotkey('ctrl', 'y')
 
 def select_all():
     """Select all."""
-    pyautogui.hotkey('ctrl', 'a')
+    get_backend().hotkey('ctrl', 'a')
 
 # ==================== SYSTEM CONTROL FUNCTIONS ====================
 def open_app(app_name):
@@ -281,19 +287,19 @@ def open_app(app_name):
 
 def close_current_window():
     """Close current active window."""
-    pyautogui.hotkey('alt', 'f4')
+    get_backend().hotkey('alt', 'f4')
 
 def minimize_window():
     """Minimize current window."""
-    pyautogui.hotkey('win', 'down')
+    get_backend().hotkey('win', 'down')
 
 def maximize_window():
     """Maximize current window."""
-    pyautogui.hotkey('win', 'up')
+    get_backend().hotkey('win', 'up')
 
 def switch_window():
     """Switch to next window."""
-    pyautogui.hotkey('alt', 'tab')
+    get_backend().hotkey('alt', 'tab')
 
 # ==================== INTERNET FUNCTIONS ====================
 def google_search(query):
@@ -330,27 +336,27 @@ def open_website(url):
 # ==================== MUSIC CONTROL FUNCTIONS ====================
 def play_music():
     """Play/pause music in currently playing app."""
-    pyautogui.press('space')
+    get_backend().press('space')
 
 def next_song():
     """Skip to next song."""
-    pyautogui.press('media_next')
+    get_backend().press('media_next')
 
 def previous_song():
     """Go to previous song."""
-    pyautogui.press('media_previous')
+    get_backend().press('media_previous')
 
 def volume_up():
     """Increase volume."""
-    pyautogui.press('volumeup')
+    get_backend().press('volumeup')
 
 def volume_down():
     """Decrease volume."""
-    pyautogui.press('volumedown')
+    get_backend().press('volumedown')
 
 def mute():
     """Mute/unmute volume."""
-    pyautogui.press('volumemute')
+    get_backend().press('volumemute')
 
 # ==================== UTILITY FUNCTIONS ====================
 def take_screenshot():
@@ -371,182 +377,182 @@ def get_date():
 # ==================== BROWSER CONTROL FUNCTIONS ====================
 def browser_back():
     """Go back in browser history."""
-    pyautogui.hotkey('alt', 'left')
+    get_backend().hotkey('alt', 'left')
 
 def browser_forward():
     """Go forward in browser history."""
-    pyautogui.hotkey('alt', 'right')
+    get_backend().hotkey('alt', 'right')
 
 def browser_refresh():
     """Refresh current page."""
-    pyautogui.hotkey('ctrl', 'r')
+    get_backend().hotkey('ctrl', 'r')
 
 def browser_new_tab():
     """Open new tab in browser."""
-    pyautogui.hotkey('ctrl', 't')
+    get_backend().hotkey('ctrl', 't')
 
 def browser_close_tab():
     """Close current tab in browser."""
-    pyautogui.hotkey('ctrl', 'w')
+    get_backend().hotkey('ctrl', 'w')
 
 def browser_next_tab():
     """Switch to next tab."""
-    pyautogui.hotkey('ctrl', 'tab')
+    get_backend().hotkey('ctrl', 'tab')
 
 def browser_previous_tab():
     """Switch to previous tab."""
-    pyautogui.hotkey('ctrl', 'shift', 'tab')
+    get_backend().hotkey('ctrl', 'shift', 'tab')
 
 def browser_home():
     """Go to browser home page."""
-    pyautogui.hotkey('alt', 'home')
+    get_backend().hotkey('alt', 'home')
 
 def browser_search_bar():
     """Focus on browser search bar."""
-    pyautogui.hotkey('ctrl', 'l')
+    get_backend().hotkey('ctrl', 'l')
 
 # ==================== FILE OPERATION FUNCTIONS ====================
 def save_file():
     """Save current file."""
-    pyautogui.hotkey('ctrl', 's')
+    get_backend().hotkey('ctrl', 's')
 
 def open_file():
     """Open file dialog."""
-    pyautogui.hotkey('ctrl', 'o')
+    get_backend().hotkey('ctrl', 'o')
 
 def new_file():
     """Create new file."""
-    pyautogui.hotkey('ctrl', 'n')
+    get_backend().hotkey('ctrl', 'n')
 
 def print_file():
     """Print current file."""
-    pyautogui.hotkey('ctrl', 'p')
+    get_backend().hotkey('ctrl', 'p')
 
 # ==================== TEXT FORMATTING FUNCTIONS ====================
 def bold_text():
     """Make text bold."""
-    pyautogui.hotkey('ctrl', 'b')
+    get_backend().hotkey('ctrl', 'b')
 
 def italic_text():
     """Make text italic."""
-    pyautogui.hotkey('ctrl', 'i')
+    get_backend().hotkey('ctrl', 'i')
 
 def underline_text():
     """Underline text."""
-    pyautogui.hotkey('ctrl', 'u')
+    get_backend().hotkey('ctrl', 'u')
 
 def strikethrough_text():
     """Strikethrough text."""
-    pyautogui.hotkey('ctrl', 'shift', 'x')
+    get_backend().hotkey('ctrl', 'shift', 'x')
 
 # ==================== WINDOW MANAGEMENT FUNCTIONS ====================
 def snap_window_left():
     """Snap window to left half of screen."""
-    pyautogui.hotkey('win', 'left')
+    get_backend().hotkey('win', 'left')
 
 def snap_window_right():
     """Snap window to right half of screen."""
-    pyautogui.hotkey('win', 'right')
+    get_backend().hotkey('win', 'right')
 
 def center_window():
     """Center window on screen."""
-    pyautogui.hotkey('win', 'up')
+    get_backend().hotkey('win', 'up')
 
 def task_view():
     """Open Windows Task View."""
-    pyautogui.hotkey('win', 'tab')
+    get_backend().hotkey('win', 'tab')
 
 def show_desktop():
     """Show desktop (minimize all windows)."""
-    pyautogui.hotkey('win', 'd')
+    get_backend().hotkey('win', 'd')
 
 def lock_screen():
     """Lock the screen."""
-    pyautogui.hotkey('win', 'l')
+    get_backend().hotkey('win', 'l')
 
 def screenshot_region():
     """Take screenshot of selected region."""
-    pyautogui.hotkey('win', 'shift', 's')
+    get_backend().hotkey('win', 'shift', 's')
 
 # ==================== VIRTUAL DESKTOP FUNCTIONS ====================
 def new_desktop():
     """Create new virtual desktop."""
-    pyautogui.hotkey('win', 'ctrl', 'd')
+    get_backend().hotkey('win', 'ctrl', 'd')
 
 def close_desktop():
     """Close current virtual desktop."""
-    pyautogui.hotkey('win', 'ctrl', 'f4')
+    get_backend().hotkey('win', 'ctrl', 'f4')
 
 def switch_desktop_right():
     """Switch to right virtual desktop."""
-    pyautogui.hotkey('win', 'ctrl', 'right')
+    get_backend().hotkey('win', 'ctrl', 'right')
 
 def switch_desktop_left():
     """Switch to left virtual desktop."""
-    pyautogui.hotkey('win', 'ctrl', 'left')
+    get_backend().hotkey('win', 'ctrl', 'left')
 
 # ==================== SEARCH & QUICK ACCESS FUNCTIONS ====================
 def open_start_menu():
     """Open Windows Start menu."""
-    pyautogui.press('win')
+    get_backend().press('win')
 
 def open_search():
     """Open Windows Search."""
-    pyautogui.hotkey('win', 's')
+    get_backend().hotkey('win', 's')
 
 def open_run():
     """Open Run dialog."""
-    pyautogui.hotkey('win', 'r')
+    get_backend().hotkey('win', 'r')
 
 def open_settings():
     """Open Windows Settings."""
-    pyautogui.hotkey('win', 'i')
+    get_backend().hotkey('win', 'i')
 
 def open_task_manager():
     """Open Task Manager."""
-    pyautogui.hotkey('ctrl', 'shift', 'esc')
+    get_backend().hotkey('ctrl', 'shift', 'esc')
 
 def open_action_center():
     """Open Windows Action Center."""
-    pyautogui.hotkey('win', 'a')
+    get_backend().hotkey('win', 'a')
 
 def open_notifications():
     """Open notification panel."""
-    pyautogui.hotkey('win', 'n')
+    get_backend().hotkey('win', 'n')
 
 # ==================== TEXT EDITING ADVANCED FUNCTIONS ====================
 def find_text():
     """Open find dialog."""
-    pyautogui.hotkey('ctrl', 'f')
+    get_backend().hotkey('ctrl', 'f')
 
 def find_replace():
     """Open find and replace dialog."""
-    pyautogui.hotkey('ctrl', 'h')
+    get_backend().hotkey('ctrl', 'h')
 
 def save_as():
     """Save file with new name."""
-    pyautogui.hotkey('ctrl', 'shift', 's')
+    get_backend().hotkey('ctrl', 'shift', 's')
 
 # ==================== EMAIL FUNCTIONS ====================
 def new_email():
     """Compose new email (works in most email clients)."""
-    pyautogui.hotkey('ctrl', 'n')
+    get_backend().hotkey('ctrl', 'n')
 
 def send_email():
     """Send email (works in most email clients)."""
-    pyautogui.hotkey('ctrl', 'enter')
+    get_backend().hotkey('ctrl', 'enter')
 
 def reply_email():
     """Reply to email."""
-    pyautogui.press('r')
+    get_backend().press('r')
 
 def reply_all():
     """Reply all to email."""
-    pyautogui.press('shift', 'r')
+    get_backend().hotkey('shift', 'r')
 
 def forward_email():
     """Forward email."""
-    pyautogui.press('f')
+    get_backend().press('f')
 
 # ==================== POWER FUNCTIONS ====================
 def shutdown():
@@ -979,7 +985,7 @@ def record_audio_single(phrase_time_limit=4):
 
 # Executes Commands (input: string)
 def respond(voice_data):
-    global file_exp_status, files, is_awake, path, is_processing
+    global file_exp_status, files, is_awake, path, is_processing, gesture_controller
     
     if not voice_data:
         return
@@ -1050,8 +1056,8 @@ def respond(voice_data):
         update_status("Sleeping")
 
     elif ('exit' in voice_data) or ('terminate' in voice_data) or ('quit' in voice_data):
-        if Gesture_Controller.GestureController.gc_mode:
-            Gesture_Controller.GestureController.gc_mode = 0
+        if gesture_controller is not None and gesture_controller.gc_mode:
+            gesture_controller.stop()
         reply("Shutting down...")
         update_status("Shutting Down...")
         app.ChatBot.close()
@@ -1060,19 +1066,19 @@ def respond(voice_data):
     # DYNAMIC CONTROLS
     elif 'launch gesture recognition' in voice_data or 'start gesture' in voice_data:
         update_status("Launching Gesture Control...")
-        if Gesture_Controller.GestureController.gc_mode:
+        if gesture_controller is not None and gesture_controller.gc_mode:
             reply('Gesture recognition is already active')
         else:
-            gc = Gesture_Controller.GestureController()
-            t = Thread(target=gc.start, daemon=True)
+            gesture_controller = Gesture_Controller.GestureController()
+            t = Thread(target=gesture_controller.start, daemon=True)
             t.start()
             reply('Launched Successfully')
         update_status("Idle")
 
     elif ('stop gesture recognition' in voice_data) or ('top gesture recognition' in voice_data):
         update_status("Stopping Gesture Control...")
-        if Gesture_Controller.GestureController.gc_mode:
-            Gesture_Controller.GestureController.gc_mode = 0
+        if gesture_controller is not None and gesture_controller.gc_mode:
+            gesture_controller.stop()
             reply('Gesture recognition stopped')
         else:
             reply('Gesture recognition is already inactive')
@@ -0,0 +1,210 @@
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+from level_actuator import FakeLevelBackend, LevelActuator
+
+# Master volume backends: get_level() / set_level(level) on a 0.0 - 1.0
+# scale, with the device handle opened once and kept. All system volume
+# changes go through the process wide LevelActuator of get_volume().
+
+
+class PycawBackend:
+    """
+    Windows Core Audio through pycaw. The IAudioEndpointVolume of the
+    default speakers is activated once per thread and kept; every
+    'check_interval' seconds the default device ID is compared, and the
+    endpoint is activated again when it changed or a call failed.
+    """
+
+    name = 'pycaw'
+
+    def __init__(self, check_interval=2.0):
+        from ctypes import POINTER, cast
+        from comtypes import CLSCTX_ALL
+        from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+        self.cast = cast
+        self.POINTER = POINTER
+        self.CLSCTX_ALL = CLSCTX_ALL
+        self.AudioUtilities = AudioUtilities
+        self.IAudioEndpointVolume = IAudioEndpointVolume
+        self.check_interval = check_interval
+        self.endpoint = None
+        self.device_id = None
+        self.owner = None
+        self.check_time = None
+        self.acquisitions = 0
+
+    def thread_init(self):
+        # COM has to be initialized on every thread that uses it
+        import comtypes
+        comtypes.CoInitialize()
+
+    def _acquire(self, devices=None):
+        if devices is None:
+            devices = self.AudioUtilities.GetSpeakers()
+        interface = devices.Activate(self.IAudioEndpointVolume._iid_, self.CLSCTX_ALL, None)
+        self.endpoint = self.cast(interface, self.POINTER(self.IAudioEndpointVolume))
+        self.device_id = getattr(devices, 'GetId', lambda: None)()
+        self.owner = threading.get_ident()
+        self.check_time = time.perf_counter()
+        self.acquisitions += 1
+
+    def _endpoint(self):
+        # COM pointers belong to the thread that activated them
+        if self.endpoint is None or self.owner != threading.get_ident():
+            self._acquire()
+        elif time.perf_counter() - self.check_time >= self.check_interval:
+            devices = self.AudioUtilities.GetSpeakers()
+            if getattr(devices, 'GetId', lambda: None)() != self.device_id:
+                self._acquire(devices)
+            self.check_time = time.perf_counter()
+        return self.endpoint
+
+    def _call(self, method, *args):
+        try:
+            return getattr(self._endpoint(), method)(*args)
+        except Exception:
+            # device removed or audio service restarted, one retry with a new endpoint
+            self.endpoint = None
+            return getattr(self._endpoint(), method)(*args)
+
+    def get_level(self):
+        return self._call('GetMasterVolumeLevelScalar')
+
+    def set_level(self, level):
+        self._call('SetMasterVolumeLevelScalar', level, None)
+
+
+class PulseAudioBackend:
+    """
+    PulseAudio / PipeWire default sink. Keeps one pulsectl connection and
+    sink when pulsectl is installed, looking the default sink up again
+    every 'check_interval' seconds and after errors; otherwise runs pactl
+    on @DEFAULT_SINK@.
+    """
+
+    name = 'pulseaudio'
+
+    def __init__(self, check_interval=2.0):
+        self.check_interval = check_interval
+        self.sink = None
+        self.check_time = None
+        self.acquisitions = 0
+        try:
+            import pulsectl
+            self.pulse = pulsectl.Pulse('gesture-controller')
+        except ImportError:
+            self.pulse = None
+            if shutil.which('pactl') is None:
+                raise RuntimeError("neither pulsectl nor pactl is available")
+
+    def _sink(self):
+        if self.sink is None or time.perf_counter() - self.check_time >= self.check_interval:
+            name = self.pulse.server_info().default_sink_name
+            if self.sink is None or self.sink.name != name:
+                self.sink = self.pulse.get_sink_by_name(name)
+                self.acquisitions += 1
+            self.check_time = time.perf_counter()
+        return self.sink
+
+    def _retry(self, fn):
+        try:
+            return fn()
+        except Exception:
+            self.sink = None
+            return fn()
+
+    def get_level(self):
+        if self.pulse is None:
+            out = subprocess.run(['pactl', 'get-sink-volume', '@DEFAULT_SINK@'],
+                                 capture_output=True, text=True, check=True).stdout
+            return int(re.search(r'(\d+)%', out).group(1)) / 100.0
+        # the sink object holds the volume of the time it was looked up
+        return self._retry(lambda: self.pulse.sink_info(self._sink().index).volume.value_flat)
+
+    def set_level(self, level):
+        if self.pulse is None:
+            subprocess.run(['pactl', 'set-sink-volume', '@DEFAULT_SINK@', f'{round(level * 100)}%'], check=True)
+            return
+        self._retry(lambda: self.pulse.volume_set_all_chans(self._sink(), level))
+
+
+class AlsaBackend:
+    """
+    ALSA mixer control 'control' (default Master). Keeps one pyalsaaudio
+    Mixer when pyalsaaudio is installed, otherwise runs amixer; volumes are
+    on amixer's perceptual (-M) scale.
+    """
+
+    name = 'alsa'
+
+    def __init__(self, control='Master'):
+        self.control = control
+        try:
+            import alsaaudio
+            self.alsaaudio = alsaaudio
+            self.mixer = alsaaudio.Mixer(control)
+        except ImportError:
+            self.mixer = None
+            if shutil.which('amixer') is None:
+                raise RuntimeError("neither pyalsaaudio nor amixer is available")
+
+    def get_level(self):
+        if self.mixer is None:
+            out = subprocess.run(['amixer', '-M', 'get', self.control],
+                                 capture_output=True, text=True, check=True).stdout
+            return int(re.search(r'\[(\d+)%\]', out).group(1)) / 100.0
+        # pending mixer events refresh the cached values
+        self.mixer.handleevents()
+        return self.mixer.getvolume()[0] / 100.0
+
+    def set_level(self, level):
+        if self.mixer is None:
+            subprocess.run(['amixer', '-q', '-M', 'set', self.control, f'{round(level * 100)}%'], check=True)
+            return
+        self.mixer.setvolume(round(level * 100))
+
+
+class FakeAudioBackend(FakeLevelBackend):
+    """Volume kept in memory, for benchmarks and machines without audio control"""
+
+
+def default_audio_backend():
+    """Volume backend of this platform: pycaw on Windows, PulseAudio or ALSA on Linux"""
+    if sys.platform == 'win32':
+        return PycawBackend()
+    if sys.platform.startswith('linux'):
+        try:
+            return PulseAudioBackend()
+        except Exception:
+            return AlsaBackend()
+    raise RuntimeError(f"no volume control for {sys.platform}")
+
+
+_volume = None
+
+
+def get_volume():
+    """The process wide volume LevelActuator, created on first use"""
+    global _volume
+    if _volume is None:
+        try:
+            backend = default_audio_backend()
+        except Exception as e:
+            print(f"Volume control unavailable ({e}), volume gestures have no effect")
+            backend = FakeAudioBackend()
+        _volume = LevelActuator(backend, 'volume')
+    return _volume
+
+
+def set_audio_backend(backend):
+    """Replaces the volume backend, returns the new volume LevelActuator"""
+    global _volume
+    if _volume is not None:
+        _volume.stop(force=True)
+    _volume = LevelActuator(backend, 'volume')
+    return _volume
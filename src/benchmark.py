@@ -0,0 +1,1637 @@
+"""
+Micro-benchmarks for the gesture pipeline.
+
+Run from the src directory, e.g.
+    python benchmark.py frame-path
+    python benchmark.py gesture-latency --repeats 50
+    python benchmark.py hand-recog
+    python benchmark.py landmark-filter --trace session.gvtr
+    python benchmark.py cursor-actuator
+    python benchmark.py cursor-queries
+    python benchmark.py pointer-filter --trace session.gvtr
+    python benchmark.py input-backends --inject
+    python benchmark.py volume-actuator --rate 30
+    python benchmark.py brightness-actuator --device-ms 20
+    python benchmark.py scroll-engine --fps 15 30 60
+    python benchmark.py parallel-sessions --sessions 1 4 16
+    python benchmark.py custom-gestures --gestures 10 100 1000 10000
+    python benchmark.py landmark-roi --source clip.mp4
+"""
+import argparse
+import contextlib
+import io
+import math
+import sys
+import time
+import tracemalloc
+import types
+
+import cv2
+import numpy as np
+
+
+def measure_frames(frame_fn, frames, warmup=10):
+    """
+    Runs 'frame_fn' once per frame and returns (seconds per frame,
+    peak bytes allocated per frame)
+    """
+    for _ in range(warmup):
+        frame_fn()
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        frame_fn()
+    per_frame = (time.perf_counter() - start) / frames
+
+    tracemalloc.start()
+    peak = 0
+    for _ in range(min(frames, 100)):
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        frame_fn()
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    return per_frame, peak
+
+
+def bench_frame_path(args):
+    """Image preparation of one frame: mirror, RGB for inference, BGR for display"""
+    from frame_source import FrameBuffers
+
+    frame = np.random.randint(0, 256, (args.height, args.width, 3), dtype=np.uint8)
+
+    def allocating_path():
+        # per-frame path before preallocated buffers
+        image = cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB)
+        image.flags.writeable = False
+        image.flags.writeable = True
+        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        return image
+
+    buffers = FrameBuffers()
+
+    def buffered_path():
+        image = buffers.mirror(frame)
+        buffers.to_rgb()
+        return image
+
+    print(f"Frame path, {args.width}x{args.height}, {args.frames} frames")
+    for name, fn in (('allocating', allocating_path), ('preallocated', buffered_path)):
+        per_frame, peak = measure_frames(fn, args.frames)
+        print(f"  {name:<13} {per_frame * 1e3:7.3f} ms/frame  {peak / 1024:9.1f} KiB allocated/frame")
+
+
+class InputRecorder:
+    """Collects the input and system events injected by the stub backends"""
+
+    def __init__(self, realistic=False):
+        self.events = []
+        # sleep like pyautogui does (call duration + PAUSE after every call)
+        self.realistic = realistic
+        self.pause = 0.1
+        self.position = (960, 540)
+        self.screen = (1920, 1080)
+        self.brightness = 50
+        self.volume = 0.5
+        # display queries (pyautogui.size / position) and their simulated round trip
+        self.queries = 0
+        self.round_trip = 0.0
+
+    def emit(self, name, *args, duration=0.0, pause=True):
+        if self.realistic:
+            time.sleep(duration + (self.pause if pause else 0.0))
+        self.events.append((time.perf_counter(), name, args))
+
+    def query(self, value):
+        self.queries += 1
+        if self.round_trip:
+            time.sleep(self.round_trip)
+        return value
+
+
+def install_input_stubs(recorder):
+    """
+    Replaces pyautogui and screen_brightness_control with stubs and the
+    volume backend with a fake one, all recording every call in
+    'recorder'. Must run before Gesture_Controller is imported.
+    """
+    gui = types.ModuleType('pyautogui')
+    gui.FAILSAFE = False
+    gui.PAUSE = recorder.pause
+    gui.size = lambda: recorder.query(recorder.screen)
+    gui.position = lambda: recorder.query(recorder.position)
+
+    def moveTo(x=None, y=None, duration=0.0, *args, _pause=True, **kwargs):
+        recorder.position = (x, y)
+        recorder.emit('moveTo', x, y, duration=duration, pause=_pause)
+
+    def make(name):
+        return lambda *args, _pause=True, **kwargs: recorder.emit(name, *args, *kwargs.values(), pause=_pause)
+
+    gui.moveTo = moveTo
+    for name in ('mouseDown', 'mouseUp', 'click', 'doubleClick', 'scroll', 'hscroll',
+                 'keyDown', 'keyUp', 'press', 'hotkey', 'write', 'typewrite', 'moveRel', 'dragTo'):
+        setattr(gui, name, make(name))
+
+    sbc = types.ModuleType('screen_brightness_control')
+
+    def get_brightness(display=None):
+        # one value for a given display, a list for all displays
+        return recorder.brightness if display is not None else [recorder.brightness]
+
+    def set_brightness(value, display=None):
+        recorder.brightness = value
+        recorder.emit('set_brightness', value)
+
+    def fade_brightness(value, start=None, display=None):
+        recorder.brightness = value
+        recorder.emit('fade_brightness', value)
+
+    sbc.get_brightness = get_brightness
+    sbc.set_brightness = set_brightness
+    sbc.fade_brightness = fade_brightness
+
+    sys.modules.update({
+        'pyautogui': gui,
+        'screen_brightness_control': sbc,
+    })
+    # all input through the stub, never a real XTest / uinput device
+    import input_backend
+    input_backend.set_backend('pyautogui')
+
+    import audio_control
+
+    class RecordedVolume(audio_control.FakeAudioBackend):
+        def get_level(self):
+            return recorder.volume
+
+        def set_level(self, level):
+            recorder.volume = level
+            recorder.emit('set_volume', level)
+
+    audio_control.set_audio_backend(RecordedVolume())
+
+    import brightness_control
+    brightness_control.set_brightness_backend(brightness_control.ScreenBrightnessBackend())
+
+
+# x of the finger bases (landmarks 5, 9, 13, 17) of the scripted hand
+FINGER_BASES = {5: 0.44, 9: 0.50, 13: 0.56, 17: 0.62}
+
+
+def hand_pose(up=(), spread=False, pinch=False, lift=0.0, shift=0.0, scale=1.0):
+    """
+    (21, 3) landmarks of a scripted hand. 'up' lists the extended fingers by
+    base landmark, 'spread' opens index and middle into a V, 'pinch' puts
+    the thumb tip on the index tip, 'lift' / 'shift' move the whole hand,
+    'scale' grows it around the palm center as if it came closer.
+    """
+    lm = np.zeros((21, 3))
+    lm[0] = (0.53, 0.80, 0.0)
+    lm[1:5, 0] = np.linspace(0.50, 0.38, 4)
+    lm[1:5, 1] = np.linspace(0.76, 0.62, 4)
+    for base, x in FINGER_BASES.items():
+        tip_x = x
+        if spread and base == 5:
+            tip_x -= 0.06
+        elif spread and base == 9:
+            tip_x += 0.06
+        tip_y = 0.40 if base in up else 0.66
+        lm[base:base + 4, 0] = np.linspace(x, tip_x, 4)
+        lm[base:base + 4, 1] = np.linspace(0.60, tip_y, 4)
+    if pinch:
+        lm[4] = lm[8]
+    if scale != 1.0:
+        lm[:, :2] = lm[9, :2] + (lm[:, :2] - lm[9, :2]) * scale
+    lm[:, 0] += shift
+    lm[:, 1] -= lift
+    return lm
+
+
+class Scenario:
+    """
+    Scripted frame sequence: 'segments' are (pose kwargs or None for no
+    hand, frame count). The pose onset is the first frame of segment
+    'pose_segment', the event onset the first frame of 'event_segment'.
+    """
+
+    def __init__(self, name, event, segments, gesture=None, label='Right',
+                 pose_segment=1, event_segment=1, custom=None):
+        self.name = name
+        self.event = event
+        self.segments = segments
+        self.gesture = gesture
+        self.label = label
+        self.pose_segment = pose_segment
+        self.event_segment = event_segment
+        self.custom = custom
+
+    def onset(self, segment):
+        return sum(count for _, count in self.segments[:segment])
+
+    def frames(self):
+        for pose, count in self.segments:
+            for _ in range(count):
+                yield None if pose is None else hand_pose(**pose)
+
+
+def gesture_scenarios(Gest, DynGest):
+    idle = (None, 5)
+    v_gest = {'up': (5, 9), 'spread': True}
+    pinch = {'up': (9, 13, 17), 'pinch': True}
+    custom_pose = {'up': (5, 17)}
+    open_hand = {'up': (5, 9, 13, 17)}
+    # one frame per step of a motion of the open hand
+    swipe = [(dict(open_hand, shift=-0.15 + 0.04 * k), 1) for k in range(1, 10)]
+    circle = [(dict(open_hand, shift=0.1 * math.sin(k * math.pi / 10), lift=0.1 - 0.1 * math.cos(k * math.pi / 10)), 1)
+              for k in range(1, 25)]
+    push = [(dict(open_hand, scale=1.0 + 0.05 * k), 1) for k in range(1, 10)]
+    return [
+        Scenario('v_move', 'moveTo', [idle, (v_gest, 20)], Gest.V_GEST),
+        Scenario('fist_drag', 'mouseDown', [idle, ({}, 20)], Gest.FIST),
+        Scenario('click', 'click', [idle, (v_gest, 10), ({'up': (9,)}, 20)], Gest.MID,
+                 pose_segment=2, event_segment=2),
+        Scenario('pinch_scroll', 'scroll', [idle, (pinch, 10), (dict(pinch, lift=0.06), 20)],
+                 Gest.PINCH_MINOR, label='Left', event_segment=2),
+        Scenario('pinch_brightness', 'set_brightness', [idle, (pinch, 10), (dict(pinch, shift=0.06), 20)],
+                 Gest.PINCH_MAJOR, event_segment=2),
+        Scenario('pinch_volume', 'set_volume', [idle, (pinch, 10), (dict(pinch, lift=0.06), 20)],
+                 Gest.PINCH_MAJOR, event_segment=2),
+        Scenario('custom', 'hotkey', [idle, (custom_pose, 10)],
+                 custom={'pose': custom_pose, 'action_type': 'keyboard', 'action_value': 'press:ctrl+c'}),
+        Scenario('swipe_right', 'hotkey', [idle, (dict(open_hand, shift=-0.15), 10)] + swipe,
+                 DynGest.SWIPE_RIGHT, event_segment=2),
+        Scenario('circle_ccw', 'hotkey', [idle, (open_hand, 10)] + circle, DynGest.CIRCLE_CCW, event_segment=2),
+        Scenario('push', 'hotkey', [idle, (open_hand, 10)] + push, DynGest.PUSH, event_segment=2),
+    ]
+
+
+def bench_gesture_latency(args):
+    """Gesture-to-action latency of scripted landmark sequences, with stub input backends"""
+    recorder = InputRecorder(realistic=args.realistic)
+    install_input_stubs(recorder)
+
+    from Gesture_Controller import DynGest, Gest, GestureController
+    from hand_frame import HandFrame
+
+    # the swipe / circle / push scenarios time the key press
+    gc = GestureController(source=None, dynamic_gestures=True)
+    session = gc.session
+    manager = session.custom_gesture_manager
+    rng = np.random.default_rng(args.seed)
+    frame_interval = 1.0 / args.fps
+
+    print(f"Gesture-to-action latency, {args.repeats} runs per scenario at {args.fps:g} fps, "
+          f"landmark noise {args.noise:g}{', realistic pyautogui timing' if args.realistic else ''}")
+    print(f"  {'scenario':<18}{'gesture':<19}{'confirm':>8}{'frames':>8}"
+          f"{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}  (ms)")
+
+    for scenario in gesture_scenarios(Gest, DynGest):
+        manager.gestures_db = {}
+        if scenario.custom is not None:
+            template = HandFrame(hand_pose(**scenario.custom['pose']).astype(np.float32))
+            manager.set_gesture('benchmark', {
+                'features': manager.extract_landmark_features(template),
+                'action_type': scenario.custom['action_type'],
+                'action_value': scenario.custom['action_value'],
+                'threshold': 0.85,
+            })
+
+        pose_onset = scenario.onset(scenario.pose_segment)
+        event_onset = scenario.onset(scenario.event_segment)
+        latencies = []
+        event_frames = []
+        confirm_frames = []
+        missed = 0
+
+        # the custom gesture actions print what they executed, keep them out of the table
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(args.repeats):
+                session.reset()
+                # every run starts from mid levels, a saturated level emits no event
+                recorder.volume = 0.5
+                recorder.brightness = 50
+                session.controller.volume_actuator().resync()
+                session.controller.brightness_actuator().resync()
+
+                found = None
+                confirmed = None
+                for index, landmarks in enumerate(scenario.frames()):
+                    if landmarks is None:
+                        hands = []
+                    else:
+                        landmarks = landmarks + rng.normal(0.0, args.noise, landmarks.shape)
+                        hands = [HandFrame(landmarks.astype(np.float32), scenario.label, 0.98,
+                                           index * frame_interval)]
+
+                    first_event = len(recorder.events)
+                    start = time.perf_counter()
+                    session.process_results(hands, index * frame_interval)
+
+                    hand = session.handminor if scenario.label == 'Left' else session.handmajor
+                    if (confirmed is None and scenario.gesture is not None
+                            and index >= pose_onset and hand.ori_gesture == scenario.gesture):
+                        confirmed = index - pose_onset + 1
+                    if found is None and index >= event_onset:
+                        for event_time, name, _ in recorder.events[first_event:]:
+                            if name == scenario.event:
+                                found = index - event_onset
+                                latencies.append(found * frame_interval + event_time - start)
+                                break
+                del recorder.events[:]
+
+                if found is None:
+                    missed += 1
+                else:
+                    event_frames.append(found + 1)
+                if confirmed is not None:
+                    confirm_frames.append(confirmed)
+
+        gesture = scenario.gesture.name if scenario.gesture is not None else 'custom'
+        confirm = f"{np.median(confirm_frames):.0f}" if confirm_frames else '-'
+        if latencies:
+            ms = np.array(latencies) * 1000
+            p50, p95, p99 = np.percentile(ms, (50, 95, 99))
+            print(f"  {scenario.name:<18}{gesture:<19}{confirm:>8}{np.median(event_frames):>8.0f}"
+                  f"{ms.mean():>9.1f}{p50:>9.1f}{p95:>9.1f}{p99:>9.1f}"
+                  f"{f'  {missed} missed' if missed else ''}")
+        else:
+            print(f"  {scenario.name:<18}{gesture:<19}{confirm:>8}{'-':>8}  no '{scenario.event}' event")
+    print("  confirm: frames from pose onset until HandRecog reports the gesture,")
+    print("  frames: frames from onset until the injected event, latency includes processing time")
+
+
+class PlainLandmark:
+    __slots__ = ('x', 'y', 'z')
+
+    def __init__(self, x, y, z):
+        self.x = x
+        self.y = y
+        self.z = z
+
+
+class PlainLandmarkList:
+    """Plain object with the attributes of a MediaPipe landmark list (landmark[i].x/y/z)"""
+
+    __slots__ = ('landmark',)
+
+    def __init__(self, coords):
+        self.landmark = [PlainLandmark(x, y, z) for x, y, z in coords]
+
+
+def landmark_list_class():
+    """
+    (description, class) of the NormalizedLandmarkList message MediaPipe
+    returns. Without MediaPipe an identical message type is built with
+    protobuf, (description, None) if protobuf is missing as well.
+    """
+    try:
+        from mediapipe.framework.formats import landmark_pb2
+        return 'landmark_pb2 messages', landmark_pb2.NormalizedLandmarkList
+    except ImportError:
+        pass
+    try:
+        from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
+    except ImportError:
+        return 'PlainLandmarkList objects', None
+
+    field = descriptor_pb2.FieldDescriptorProto
+    proto = descriptor_pb2.FileDescriptorProto(name='benchmark_landmark.proto', package='benchmark', syntax='proto2')
+    landmark = proto.message_type.add(name='NormalizedLandmark')
+    for number, name in enumerate(('x', 'y', 'z', 'visibility', 'presence'), 1):
+        landmark.field.add(name=name, number=number, type=field.TYPE_FLOAT, label=field.LABEL_OPTIONAL)
+    landmark_list = proto.message_type.add(name='NormalizedLandmarkList')
+    landmark_list.field.add(name='landmark', number=1, type=field.TYPE_MESSAGE, label=field.LABEL_REPEATED,
+                            type_name='.benchmark.NormalizedLandmark')
+    pool = descriptor_pool.DescriptorPool()
+    pool.Add(proto)
+    descriptor = pool.FindMessageTypeByName('benchmark.NormalizedLandmarkList')
+    return 'protobuf messages (MediaPipe layout)', message_factory.GetMessageClass(descriptor)
+
+
+def legacy_hand_recog(HandRecog, Gest, HLabel):
+    """HandRecog computing its features one landmark attribute at a time, as before"""
+
+    class LegacyHandRecog(HandRecog):
+        def __init__(self, hand_label):
+            super().__init__(hand_label)
+            self.frame_count = 0
+
+        def update_hand_result(self, hand_result):
+            self.hand_result = hand_result
+
+        def get_signed_dist(self, point):
+            sign = -1
+            if self.hand_result.landmark[point[0]].y < self.hand_result.landmark[point[1]].y:
+                sign = 1
+            dist = (self.hand_result.landmark[point[0]].x - self.hand_result.landmark[point[1]].x)**2
+            dist += (self.hand_result.landmark[point[0]].y - self.hand_result.landmark[point[1]].y)**2
+            dist = math.sqrt(dist)
+            return dist*sign
+
+        def get_dist(self, point):
+            dist = (self.hand_result.landmark[point[0]].x - self.hand_result.landmark[point[1]].x)**2
+            dist += (self.hand_result.landmark[point[0]].y - self.hand_result.landmark[point[1]].y)**2
+            dist = math.sqrt(dist)
+            return dist
+
+        def get_dz(self, point):
+            return abs(self.hand_result.landmark[point[0]].z - self.hand_result.landmark[point[1]].z)
+
+        def set_finger_state(self):
+            if self.hand_result == None:
+                return
+            points = [[8,5,0],[12,9,0],[16,13,0],[20,17,0]]
+            self.finger = 0
+            for point in points:
+                dist = self.get_signed_dist(point[:2])
+                dist2 = self.get_signed_dist(point[1:])
+                try:
+                    ratio = round(dist/dist2,1)
+                except:
+                    ratio = round(dist/0.01,1)
+                self.finger = self.finger << 1
+                if ratio > 0.5 :
+                    self.finger = self.finger | 1
+
+        def get_gesture(self):
+            if self.hand_result == None:
+                return Gest.PALM
+            if self.finger in [Gest.LAST3,Gest.LAST4] and self.get_dist([8,4]) < 0.05:
+                if self.hand_label == HLabel.MINOR :
+                    current_gesture = Gest.PINCH_MINOR
+                else:
+                    current_gesture = Gest.PINCH_MAJOR
+            elif Gest.FIRST2 == self.finger :
+                ratio = self.get_dist([8,12])/self.get_dist([5,9])
+                if ratio > 1.7:
+                    current_gesture = Gest.V_GEST
+                elif self.get_dz([8,12]) < 0.1:
+                    current_gesture = Gest.TWO_FINGER_CLOSED
+                else:
+                    current_gesture = Gest.MID
+            else:
+                current_gesture = self.finger
+            if current_gesture == self.prev_gesture:
+                self.frame_count += 1
+            else:
+                self.frame_count = 0
+            self.prev_gesture = current_gesture
+            if self.frame_count > 4 :
+                self.ori_gesture = current_gesture
+            return self.ori_gesture
+
+    return LegacyHandRecog
+
+
+def bench_hand_recog(args):
+    """Per-hand cost of HandRecog (landmark conversion, finger state and gesture), legacy vs current"""
+    install_input_stubs(InputRecorder())
+
+    from Gesture_Controller import Gest, HandRecog, HLabel
+    from hand_frame import HandFrame
+
+    source, landmark_list = landmark_list_class()
+    if args.plain_objects:
+        source, landmark_list = 'PlainLandmarkList objects', None
+
+    def make_hand(coords):
+        if landmark_list is None:
+            return PlainLandmarkList(coords)
+        hand = landmark_list()
+        for x, y, z in coords:
+            hand.landmark.add(x=x, y=y, z=z)
+        return hand
+
+    rng = np.random.default_rng(args.seed)
+    poses = [{}, {'up': (5, 9), 'spread': True}, {'up': (5, 9)}, {'up': (9,)},
+             {'up': (9, 13, 17), 'pinch': True}, {'up': (5, 9, 13, 17)}, {'up': (5, 17)}]
+    hands = []
+    for i in range(args.hands):
+        landmarks = hand_pose(**poses[i % len(poses)]) + rng.normal(0.0, args.noise, (21, 3))
+        hands.append(make_hand(landmarks.tolist()))
+
+    # the current HandRecog reads HandFrames, building them is part of its cost
+    kinds = [('legacy', legacy_hand_recog(HandRecog, Gest, HLabel), lambda hand: hand),
+             ('current', HandRecog, HandFrame.from_landmarks)]
+    gestures = {}
+    costs = {}
+    for name, cls, convert in kinds:
+        recog = cls(HLabel.MAJOR)
+        out = []
+        for hand in hands:
+            recog.update_hand_result(convert(hand))
+            recog.set_finger_state()
+            recog.get_gesture()
+            out.append((recog.finger, recog.prev_gesture))
+        gestures[name] = out
+
+        best = float('inf')
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            for hand in hands:
+                recog.update_hand_result(convert(hand))
+                recog.set_finger_state()
+                recog.get_gesture()
+            best = min(best, time.perf_counter() - start)
+        costs[name] = best / len(hands)
+
+    mismatches = sum(a != b for a, b in zip(gestures['legacy'], gestures['current']))
+    print(f"HandRecog per hand over {len(hands)} hands ({source}), best of {args.repeats}:")
+    for name, _, _ in kinds:
+        print(f"  {name:<10}{costs[name] * 1e6:>8.2f} us")
+    print(f"  speedup   {costs['legacy'] / costs['current']:>8.2f}x, "
+          f"{mismatches} hands with a different finger state / gesture "
+          f"(finger ratio hysteresis)")
+
+
+# poses of the synthetic debounce trace: open hand, fist, V, middle finger, index finger
+TRACE_POSES = [{'up': (5, 9, 13, 17)}, {}, {'up': (5, 9), 'spread': True}, {'up': (9,)}, {'up': (5,)}]
+
+
+def write_pose_trace(path, seconds, fps, noise, seed):
+    """
+    Writes a trace of one hand switching between TRACE_POSES every 0.6 -
+    1.5 s, with 4 frame transitions, slow drift and landmark noise. Returns
+    (pose index, in transition) of every frame.
+    """
+    from hand_frame import HandFrame
+    from landmark_trace import TraceWriter
+
+    rng = np.random.default_rng(seed)
+    frames = int(seconds * fps)
+    truth = []
+    with TraceWriter(path) as writer:
+        pose = 0
+        current = hand_pose(**TRACE_POSES[pose])
+        while len(truth) < frames:
+            nxt = int(rng.integers(len(TRACE_POSES) - 1))
+            pose = nxt + 1 if nxt >= pose else nxt
+            target = hand_pose(**TRACE_POSES[pose])
+            hold = int(rng.uniform(0.6, 1.5) * fps)
+            steps = [current + (target - current) * (k + 1) / 5 for k in range(4)] + [target] * hold
+            for k, landmarks in enumerate(steps):
+                i = len(truth)
+                coords = landmarks + rng.normal(0.0, noise, landmarks.shape)
+                coords[:, 0] += 0.05 * math.sin(i / fps)
+                writer.write([HandFrame(coords.astype(np.float32), 'Right', 0.97)], writer.start_time + i / fps)
+                truth.append((pose, k < 4))
+            current = target
+    return truth[:frames]
+
+
+def run_debounce(reader, HandRecog, HLabel, confirm_ms=None, smoothing=False):
+    """(timestamps, raw gestures, confirmed gestures) of the first hand of every trace frame"""
+    from hand_tracker import HandTracker
+    from landmark_filter import LandmarkFilter
+
+    tracker = HandTracker()
+    landmark_filter = LandmarkFilter() if smoothing else None
+    recog = HandRecog(HLabel.MAJOR, confirm_ms)
+    times, raw, confirmed = [], [], []
+    for timestamp, hands in reader:
+        hands = tracker.update(hands, timestamp)
+        if landmark_filter is not None:
+            landmark_filter.apply(hands)
+        recog.update_hand_result(hands[0] if hands else None)
+        recog.set_finger_state()
+        recog.get_gesture()
+        times.append(timestamp)
+        raw.append(recog.prev_gesture)
+        confirmed.append(recog.ori_gesture)
+    return times, raw, confirmed
+
+
+def debounce_stats(times, raw, confirmed, reference_raw, truth, min_hold):
+    """
+    Flicker, misfires and time-to-confirm of one debounce run. 'truth' is
+    the scripted gesture and transition flag of every frame, or None for a
+    recorded trace, where confirmation is timed from the first frame the
+    unfiltered raw gesture shows the confirmed one.
+    """
+    duration = times[-1] - times[0] if len(times) > 1 else 0.0
+    flips = sum(1 for i in range(1, len(raw)) if raw[i] != raw[i - 1])
+    commits = [i for i in range(1, len(confirmed)) if confirmed[i] != confirmed[i - 1]]
+
+    misfires = sum(1 for a, b in zip(commits, commits[1:]) if times[b] - times[a] < min_hold)
+    wrong = 0
+    delays = []
+    previous = 0
+    for i in commits:
+        gesture = confirmed[i]
+        if truth is not None:
+            target, _ = truth[i]
+            if gesture != target:
+                wrong += 1
+            elif i > 0:
+                # onset: first frame of the scripted pose after its transition
+                onset = i
+                while onset > 0 and truth[onset - 1][0] == target:
+                    onset -= 1
+                while onset < i and truth[onset][1]:
+                    onset += 1
+                delays.append(max(0.0, times[i] - times[onset]))
+        else:
+            onset = next((j for j in range(previous + 1, i + 1) if reference_raw[j] == gesture), i)
+            delays.append(times[i] - times[onset])
+        previous = i
+
+    delays = np.array(delays) * 1000 if delays else np.zeros(1)
+    return {
+        'flips_per_s': flips / duration if duration > 0 else 0.0,
+        'commits': len(commits),
+        'misfires': misfires,
+        'wrong': wrong,
+        'confirm_mean': float(delays.mean()),
+        'confirm_p95': float(np.percentile(delays, 95)),
+    }
+
+
+def bench_landmark_filter(args):
+    """Misfires and time-to-confirm of the gesture debounce with and without landmark smoothing, on a trace"""
+    import os
+    import tempfile
+
+    install_input_stubs(InputRecorder())
+    from Gesture_Controller import DEFAULT_CONFIRM_MS, GESTURE_CONFIRM_MS, Gest, HandRecog, HLabel
+    from hand_frame import HandFrame
+    from landmark_trace import TraceReader
+
+    truth = None
+    path = args.trace
+    if path is None:
+        fd, path = tempfile.mkstemp(suffix='.gvtr')
+        os.close(fd)
+        truth = write_pose_trace(path, args.seconds, args.fps, args.noise, args.seed)
+    try:
+        reader = TraceReader(path)
+        if truth is not None:
+            # gestures the scripted poses are recognized as without noise
+            gestures = []
+            for pose in TRACE_POSES:
+                recog = HandRecog(HLabel.MAJOR)
+                recog.update_hand_result(HandFrame(hand_pose(**pose).astype(np.float32), timestamp=0.0))
+                recog.set_finger_state()
+                recog.get_gesture()
+                gestures.append(recog.prev_gesture)
+            truth = [(gestures[pose], transition) for pose, transition in truth]
+        _, reference_raw, _ = run_debounce(reader, HandRecog, HLabel)
+
+        source = f"a synthetic trace, landmark noise {args.noise:g}" if truth is not None else path
+        print(f"Gesture debounce on {len(reader)} frames ({reader.duration():.0f} s) of {source}")
+        print(f"  {'filter':<10}{'windows':>8}{'raw flips/s':>13}{'commits':>9}{'misfires':>10}"
+              f"{'wrong':>7}{'confirm ms':>12}{'p95':>7}")
+        for smoothing in (False, True):
+            for scale in args.scales:
+                confirm_ms = {gesture: GESTURE_CONFIRM_MS.get(gesture, DEFAULT_CONFIRM_MS) * scale for gesture in Gest}
+                times, raw, confirmed = run_debounce(reader, HandRecog, HLabel, confirm_ms, smoothing)
+                stats = debounce_stats(times, raw, confirmed, reference_raw, truth, args.min_hold)
+                wrong = stats['wrong'] if truth is not None else '-'
+                print(f"  {'one-euro' if smoothing else 'none':<10}{scale:>8.2f}{stats['flips_per_s']:>13.1f}"
+                      f"{stats['commits']:>9}{stats['misfires']:>10}{wrong:>7}"
+                      f"{stats['confirm_mean']:>12.0f}{stats['confirm_p95']:>7.0f}")
+        print(f"  windows: confirm window scale, misfires: confirmed gestures replaced within "
+              f"{args.min_hold * 1000:.0f} ms,")
+        print("  wrong: confirmed gestures other than the scripted pose, confirm: pose onset to confirmation")
+    finally:
+        if args.trace is None:
+            os.remove(path)
+
+def cursor_script(seconds, fps):
+    """
+    Per frame of a scripted pointer session: the cursor target and the
+    button call of that frame (a drag and a click, as pyautogui / input
+    backend names) or None
+    """
+    frames = int(seconds * fps)
+    buttons = {frames // 4: ('mouseDown', 'mouse_down'), frames // 2: ('mouseUp', 'mouse_up'),
+               3 * frames // 4: ('click', 'click')}
+    for i in range(frames):
+        angle = 2 * math.pi * i / frames
+        yield (960 + 400 * math.cos(angle), 540 + 300 * math.sin(angle)), buttons.get(i)
+
+
+def bench_cursor_actuator(args):
+    """Vision loop time spent on cursor control, blocking pyautogui calls vs the cursor actuator thread"""
+    recorder = InputRecorder(realistic=True)
+    recorder.pause = args.pause
+    install_input_stubs(recorder)
+    import pyautogui
+    from cursor_actuator import CursorActuator
+
+    frame_interval = 1.0 / args.fps
+    print(f"Cursor control over {args.seconds:g} s of pointer movement at {args.fps:g} fps "
+          f"(stub pyautogui sleeps like pyautogui, PAUSE {args.pause:g} s)")
+    print(f"  {'mode':<10}{'mean ms':>9}{'max ms':>9}{'loop fps':>10}{'moves':>8}{'buttons':>9}  button positions")
+
+    for mode in ('blocking', 'actuator'):
+        del recorder.events[:]
+        recorder.position = (960, 540)
+        actuator = CursorActuator(args.cursor_hz).start() if mode == 'actuator' else None
+        posted = []
+        call_times = []
+        start = time.perf_counter()
+        deadline = start
+        for target, button in cursor_script(args.seconds, args.fps):
+            t = time.perf_counter()
+            if actuator is None:
+                # what Controller.handle_controls did before the actuator
+                pyautogui.moveTo(*target, duration=0.1)
+                if button is not None:
+                    getattr(pyautogui, button[0])(button='left')
+            else:
+                actuator.move_to(*target)
+                if button is not None:
+                    actuator.post(button[1], button='left')
+            if button is not None:
+                posted.append((button[0], (round(target[0]), round(target[1]))))
+            call_times.append(time.perf_counter() - t)
+
+            deadline += frame_interval
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                deadline = time.perf_counter()
+        loop_fps = len(call_times) / (time.perf_counter() - start)
+        if actuator is not None:
+            actuator.flush()
+            actuator.stop()
+
+        # every button event must run in posting order, right after the cursor reached its target
+        executed = []
+        position = None
+        for _, name, event_args in recorder.events:
+            if name == 'moveTo':
+                position = (round(event_args[0]), round(event_args[1]))
+            else:
+                executed.append((name, position))
+        correct = 'correct' if executed == posted else f"wrong: posted {posted}, executed {executed}"
+
+        ms = np.array(call_times) * 1000
+        moves = sum(1 for _, name, _ in recorder.events if name == 'moveTo')
+        print(f"  {mode:<10}{ms.mean():>9.2f}{ms.max():>9.2f}{loop_fps:>10.1f}{moves:>8}{len(executed):>9}  {correct}")
+    print("  mean / max ms: time per frame the vision loop spends in cursor calls")
+
+def bench_cursor_queries(args):
+    """Display queries per frame of the pointer path, per-frame pyautogui.size / position vs the cached cursor model"""
+    recorder = InputRecorder()
+    recorder.round_trip = args.round_trip_ms / 1000.0
+    install_input_stubs(recorder)
+    import pyautogui
+    from Gesture_Controller import Controller
+    from cursor_actuator import CursorActuator
+    from hand_frame import HandFrame
+
+    def legacy_get_position(hand):
+        # Controller.get_position before the cursor model
+        x, y = hand.coords[9, :2].tolist()
+        sx, sy = pyautogui.size()
+        x_old, y_old = pyautogui.position()
+        return x_old + (x * sx - x_old) * 0.5, y_old + (y * sy - y_old) * 0.5
+
+    frames = int(args.seconds * args.fps)
+    frame_interval = 1.0 / args.fps
+    base = hand_pose(up=(5, 9), spread=True).astype(np.float32)
+    print(f"Pointer path over {args.seconds:g} s at {args.fps:g} fps, {args.round_trip_ms:g} ms per display query, "
+          f"the mouse moves the cursor once half way")
+    print(f"  {'mode':<10}{'queries/frame':>14}{'path ms':>9}{'mouse move seen':>17}")
+
+    for mode in ('per-frame', 'cached'):
+        recorder.position = (960, 540)
+        recorder.queries = 0
+        actuator = None
+        if mode == 'cached':
+            actuator = CursorActuator(args.cursor_hz).start()
+            controller = Controller(actuator)
+        call_times = []
+        seen = None
+        external = None
+        deadline = time.perf_counter()
+        for i in range(frames):
+            angle = 2 * math.pi * i / frames
+            coords = base.copy()
+            coords[:, 0] += np.float32(0.1 * math.cos(angle))
+            coords[:, 1] += np.float32(0.1 * math.sin(angle))
+            hand = HandFrame(coords)
+            if i == frames // 2:
+                # the user grabs the mouse
+                if actuator is not None:
+                    actuator.flush()
+                external = (200, 200)
+                recorder.position = external
+
+            t = time.perf_counter()
+            if actuator is None:
+                x, y = legacy_get_position(hand)
+                pyautogui.moveTo(round(x), round(y), _pause=False)
+            else:
+                x_old, y_old = actuator.position()
+                x, y = controller.get_position(hand)
+                actuator.move_to(x, y)
+            call_times.append(time.perf_counter() - t)
+            if external is not None and seen is None and actuator is not None and (x_old, y_old) == external:
+                seen = (i - frames // 2) * frame_interval * 1000
+
+            deadline += frame_interval
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        if actuator is not None:
+            actuator.stop()
+
+        ms = np.array(call_times) * 1000
+        if actuator is None:
+            seen_text = 'next frame'
+        else:
+            seen_text = f"after {seen:.0f} ms" if seen is not None else 'never'
+        print(f"  {mode:<10}{recorder.queries / frames:>14.2f}{ms.mean():>9.3f}{seen_text:>17}")
+    print("  queries/frame: pyautogui.size / position calls from all threads, path ms: vision loop time per frame")
+
+def write_pointer_trace(path, seconds, fps, noise, seed):
+    """
+    Writes a trace of a V gesture hand alternately holding still (0.6 -
+    1.5 s) and moving smoothly to a new point (0.3 - 0.8 s), with landmark
+    noise. The motion depends on 'seed' only, not on 'fps'. Returns the
+    still flag of every frame, settled holds only.
+    """
+    from hand_frame import HandFrame
+    from landmark_trace import TraceWriter
+
+    motion_rng = np.random.default_rng(seed)
+    noise_rng = np.random.default_rng(seed + 1)
+    base = hand_pose(up=(5, 9), spread=True)
+    base -= base[9]
+    segments = []
+    point = np.array([0.5, 0.5])
+    total = 0.0
+    while total < seconds:
+        hold = motion_rng.uniform(0.6, 1.5)
+        move = motion_rng.uniform(0.3, 0.8)
+        target = motion_rng.uniform(0.3, 0.7, 2)
+        segments.append((total, hold, move, point, target))
+        total += hold + move
+        point = target
+
+    still = []
+    with TraceWriter(path) as writer:
+        segment = 0
+        for i in range(int(seconds * fps)):
+            t = i / fps
+            while segments[segment][0] + segments[segment][1] + segments[segment][2] <= t:
+                segment += 1
+            start, hold, move, a, b = segments[segment]
+            tau = (t - start - hold) / move
+            if tau <= 0:
+                position = a
+            else:
+                # minimum jerk profile
+                position = a + (b - a) * (10 * tau ** 3 - 15 * tau ** 4 + 6 * tau ** 5)
+            coords = base.copy()
+            coords[:, :2] += position
+            coords += noise_rng.normal(0.0, noise, coords.shape)
+            writer.write([HandFrame(coords.astype(np.float32), 'Right', 0.97)], writer.start_time + t)
+            # the first 0.2 s of a hold still show the end of the motion
+            still.append(tau <= 0 and t - start >= 0.2)
+    return np.array(still)
+
+
+class LegacyFramePointer:
+    """The per-frame acceleration of Controller.get_position before PointerFilter, for comparison"""
+
+    def __init__(self):
+        self.prev = None
+
+    def reset(self):
+        self.prev = None
+
+    def update(self, position, size, now=None):
+        x, y = int(position[0] * size[0]), int(position[1] * size[1])
+        if self.prev is None:
+            self.prev = x, y
+        dx, dy = x - self.prev[0], y - self.prev[1]
+        self.prev = x, y
+        distsq = dx ** 2 + dy ** 2
+        if distsq <= 25:
+            ratio = 0
+        elif distsq <= 900:
+            ratio = 0.07 * distsq ** 0.5
+        else:
+            ratio = 2.1
+        return dx * ratio, dy * ratio
+
+
+def run_pointer(reader, pointer_filter, size):
+    """Hand and cursor positions (px) of the first hand of every trace frame, the cursor starting at 0"""
+    pointer_filter.reset()
+    hand = []
+    cursor = []
+    x = y = 0.0
+    for timestamp, hands in reader:
+        if hands:
+            position = hands[0].coords[9, :2].tolist()
+            dx, dy = pointer_filter.update(position, size, timestamp)
+            x += dx
+            y += dy
+            hand.append((position[0] * size[0], position[1] * size[1]))
+        else:
+            pointer_filter.reset()
+            hand.append(hand[-1] if hand else (0.0, 0.0))
+        cursor.append((x, y))
+    return np.array(hand), np.array(cursor)
+
+
+def pointer_stats(times, hand, cursor, still, max_lag=15):
+    """
+    Jitter: cursor travel per second while the hand holds still (px/s).
+    Lag: shift of the cursor speed behind the hand speed with the highest
+    correlation (ms). Travel: total cursor path (px).
+    """
+    hand_speed = np.hypot(*np.diff(hand, axis=0).T)
+    cursor_step = np.hypot(*np.diff(cursor, axis=0).T)
+    dt = np.diff(times)
+    still = still[1:]
+    still_time = dt[still].sum()
+    jitter = cursor_step[still].sum() / still_time if still_time > 0 else 0.0
+
+    # correlate on smoothed speeds so landmark noise does not dominate
+    kernel = np.ones(5) / 5
+    h = np.convolve(hand_speed, kernel, 'same')
+    c = np.convolve(cursor_step, kernel, 'same')
+    h -= h.mean()
+    c -= c.mean()
+    scores = [np.dot(h[:len(h) - shift], c[shift:]) for shift in range(max_lag + 1)]
+    best = int(np.argmax(scores))
+    shift = float(best)
+    if 0 < best < max_lag:
+        # parabola through the peak for a sub-frame estimate
+        left, mid, right = scores[best - 1:best + 2]
+        curvature = left - 2 * mid + right
+        if curvature < 0:
+            shift += 0.5 * (left - right) / curvature
+    lag = max(0.0, shift) * float(np.median(dt)) * 1000
+    return jitter, lag, float(cursor_step.sum())
+
+
+def bench_pointer_filter(args):
+    """Jitter against lag of the pointer filters on a recorded or synthetic trace, and their frame rate dependence"""
+    import os
+    import tempfile
+
+    from landmark_trace import TraceReader
+    from pointer_filter import POINTER_CURVES, make_pointer_filter
+
+    size = (1920, 1080)
+    configs = [('legacy-frame', LegacyFramePointer)]
+    for curve in POINTER_CURVES:
+        for smoothing in ('none', 'one-euro'):
+            configs.append((f"{curve}/{smoothing}", lambda curve=curve, smoothing=smoothing:
+                            make_pointer_filter(curve, smoothing)))
+
+    def evaluate(path, still):
+        reader = TraceReader(path)
+        times = np.array([t for t, _ in reader])
+        results = {}
+        for name, make in configs:
+            hand, cursor = run_pointer(reader, make(), size)
+            if still is None:
+                # hand still: moving average of the hand position barely moves
+                kernel = np.ones(9) / 9
+                smooth = np.stack([np.convolve(hand[:, k], kernel, 'same') for k in range(2)], axis=1)
+                speed = np.hypot(*np.gradient(smooth, times, axis=0).T)
+                still = speed < args.still_speed
+            results[name] = pointer_stats(times, hand, cursor, still)
+        return results, len(reader)
+
+    def synthetic(fps):
+        fd, path = tempfile.mkstemp(suffix='.gvtr')
+        os.close(fd)
+        try:
+            still = write_pointer_trace(path, args.seconds, fps, args.noise, args.seed)
+            return evaluate(path, still)[0]
+        finally:
+            os.remove(path)
+
+    if args.trace is not None:
+        results, frames = evaluate(args.trace, None)
+        travel = {}
+        print(f"Pointer filters on {frames} frames of {args.trace}")
+    else:
+        results = synthetic(args.fps)
+        travel = {fps: synthetic(fps) for fps in args.fps_list}
+        print(f"Pointer filters on {args.seconds:g} s of synthetic hand motion at {args.fps:g} fps, "
+              f"landmark noise {args.noise:g}")
+    fps_header = ''.join(f"{f'@{fps:g}fps':>9}" for fps in args.fps_list) if travel else ''
+    print(f"  {'filter':<24}{'jitter px/s':>12}{'lag ms':>8}{'travel px':>11}{fps_header}")
+    for name, _ in configs:
+        jitter, lag, path = results[name]
+        line = f"  {name:<24}{jitter:>12.1f}{lag:>8.0f}{path:>11.0f}"
+        for fps in travel:
+            line += f"{travel[fps][name][2] / path if path else 0.0:>9.2f}"
+        print(line)
+    print("  jitter: cursor travel while the hand holds still, lag: cursor speed behind hand speed,")
+    if travel:
+        print(f"  @fps: cursor travel for the same motion at that frame rate relative to {args.fps:g} fps")
+
+def input_workload(backend, actions):
+    """
+    Runs 'actions' input actions on 'backend' (pointer moves, key presses,
+    modifier hotkeys, vertical and horizontal scroll ticks that cancel
+    out) and returns the seconds each action took
+    """
+    x, y = backend.position()
+    steps = [
+        lambda: backend.move_to(x + 1, y),
+        lambda: backend.move_to(x, y),
+        lambda: backend.press('shift'),
+        lambda: backend.hotkey('shift', 'ctrl'),
+        lambda: backend.scroll(1),
+        lambda: backend.scroll(-1),
+        lambda: backend.scroll(1, horizontal=True),
+        lambda: backend.scroll(-1, horizontal=True),
+    ]
+    times = []
+    for i in range(actions):
+        t = time.perf_counter()
+        steps[i % len(steps)]()
+        times.append(time.perf_counter() - t)
+    return times
+
+
+def bench_input_backends(args):
+    """Events per second and per-action latency of the input backends"""
+    recorder = InputRecorder(realistic=True)
+    recorder.pause = args.pause
+    install_input_stubs(recorder)
+    from input_backend import INPUT_BACKENDS, PyAutoGUIBackend
+
+    print(f"Input backends, {args.actions} actions each (moves, key presses, hotkeys, scroll ticks)")
+    print(f"  {'backend':<22}{'events/s':>10}{'events':>8}{'flushes':>9}{'p50 us':>9}{'p95 us':>9}")
+    candidates = [('pyautogui+PAUSE', lambda: PyAutoGUIBackend(pause=True), min(args.actions, 40))]
+    candidates += [(name, cls, args.actions) for name, cls in INPUT_BACKENDS.items()]
+    for name, make, actions in candidates:
+        if name in ('xtest', 'uinput') and not args.inject:
+            print(f"  {name:<26}skipped, sends real input: pass --inject")
+            continue
+        try:
+            backend = make()
+        except Exception as e:
+            print(f"  {name:<26}unavailable: {e}")
+            continue
+        start = time.perf_counter()
+        times = input_workload(backend, actions)
+        elapsed = time.perf_counter() - start
+        if hasattr(backend, 'close'):
+            backend.close()
+        us = np.array(times) * 1e6
+        p50, p95 = np.percentile(us, (50, 95))
+        stub = ' (stub)' if name.startswith('pyautogui') else ''
+        print(f"  {name + stub:<22}{backend.events / elapsed:>10.0f}{backend.events:>8}{backend.flushes:>9}"
+              f"{p50:>9.1f}{p95:>9.1f}")
+    print(f"  pyautogui runs on a stub that only sleeps like pyautogui (PAUSE {args.pause:g} s after every call),")
+    print("  events: primitive input events, flushes: writes to the display server / kernel")
+
+def level_steps(args):
+    """Random pinch steps of a benchmark run and the level they end at from 0.5"""
+    rng = np.random.default_rng(args.seed)
+    steps = rng.choice([-0.02, 0.02, 0.04], int(args.seconds * args.rate))
+    expected = 0.5
+    for delta in steps:
+        expected = min(1.0, max(0.0, expected + delta))
+    return steps, expected
+
+
+def run_level_steps(steps, rate, step):
+    """Calls step(delta) for every step at 'rate' steps/s, returns the time of every call in ms"""
+    call_times = []
+    deadline = time.perf_counter()
+    for delta in steps:
+        t = time.perf_counter()
+        step(delta)
+        call_times.append(time.perf_counter() - t)
+        deadline += 1.0 / rate
+        delay = deadline - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    return np.array(call_times) * 1000
+
+
+def level_row(mode, ms, backend, expected):
+    final = 'ok' if abs(backend.level - expected) < 1e-6 else f"{backend.level:.2f}"
+    print(f"  {mode:<10}{ms.mean():>9.2f}{ms.max():>9.2f}{backend.sets:>13}{final:>8}")
+
+
+def bench_volume_actuator(args):
+    """Vision thread time per volume step: reacquiring the endpoint per step, a cached endpoint, the coalescing actuator"""
+    from audio_control import FakeAudioBackend
+    from level_actuator import LevelActuator
+
+    steps, expected = level_steps(args)
+    print(f"{len(steps)} volume steps at {args.rate:g} steps/s, {args.device_ms:g} ms per device call, "
+          f"{args.acquire_ms:g} ms to acquire the endpoint")
+    print(f"  {'mode':<10}{'mean ms':>9}{'max ms':>9}{'device sets':>13}{'final':>8}")
+    for mode in ('reacquire', 'cached', 'actuator'):
+        backend = FakeAudioBackend(0.5, args.device_ms / 1000.0)
+        actuator = LevelActuator(backend, 'volume')
+        if mode == 'actuator':
+            actuator.start()
+
+        def reacquire(delta):
+            # GetSpeakers / Activate / cast, read and write on every step
+            time.sleep(args.acquire_ms / 1000.0)
+            backend.set_level(min(1.0, max(0.0, backend.get_level() + delta)))
+
+        ms = run_level_steps(steps, args.rate, reacquire if mode == 'reacquire' else actuator.nudge)
+        actuator.flush(5.0)
+        actuator.stop()
+        level_row(mode, ms, backend, expected)
+    print(f"  final: volume after all steps, ok if it is the expected {expected:.2f}")
+
+
+def bench_brightness_actuator(args):
+    """Vision thread time per brightness step: blocking get / fade_brightness per step vs the fading actuator"""
+    from brightness_control import FakeBrightnessBackend
+    from level_actuator import LevelActuator
+
+    steps, expected = level_steps(args)
+    print(f"{len(steps)} brightness steps at {args.rate:g} steps/s, {args.device_ms:g} ms per device call, "
+          f"fades in 1% steps every 10 ms")
+    print(f"  {'mode':<10}{'mean ms':>9}{'max ms':>9}{'device sets':>13}{'final':>8}")
+    for mode in ('blocking', 'actuator'):
+        backend = FakeBrightnessBackend(0.5, args.device_ms / 1000.0)
+        actuator = LevelActuator(backend, 'brightness', fade_step=0.01, fade_interval=0.01)
+        if mode == 'actuator':
+            actuator.start()
+
+        def blocking(delta):
+            # get_brightness, then fade_brightness(start=get_brightness()) to the end
+            target = min(1.0, max(0.0, backend.get_level() + delta))
+            start = backend.get_level()
+            count = max(1, round(abs(target - start) * 100))
+            for i in range(1, count + 1):
+                backend.set_level(start + (target - start) * i / count)
+                if i < count:
+                    time.sleep(0.01)
+
+        ms = run_level_steps(steps, args.rate, blocking if mode == 'blocking' else actuator.nudge)
+        actuator.flush(10.0)
+        actuator.stop()
+        level_row(mode, ms, backend, expected)
+    if actuator.stats()['fades_replaced']:
+        print(f"  {actuator.stats()['fades_replaced']} fades replaced by a newer target")
+    print(f"  final: brightness after all steps, ok if it is the expected {expected:.2f}")
+
+class StepScroll:
+    """Controller.pinch_control with scrollVertical: one notch after 5 frames at a stable pinch level"""
+
+    def __init__(self, backend, threshold=0.3):
+        self.backend = backend
+        self.threshold = threshold
+        self.prev = 0
+        self.count = 0
+
+    def update(self, level, now):
+        if self.count == 5:
+            self.count = 0
+            self.backend.scroll(1 if self.prev > 0.0 else -1)
+        if abs(level) > self.threshold:
+            if abs(self.prev - level) < self.threshold:
+                self.count += 1
+            else:
+                self.prev = level
+                self.count = 0
+
+    def release(self):
+        pass
+
+
+def pinch_scroll_velocity(level, threshold=0.3, speed=15.0, top=40.0):
+    """Controller.scroll_velocity: notches/s for a pinch level"""
+    excess = abs(level) - threshold
+    return math.copysign(min(top, speed * excess), level) if excess > 0 else 0.0
+
+
+class MomentumScroll:
+    """Controller.scroll_control on a running ScrollEngine"""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def update(self, level, now):
+        self.engine.set_velocity(pinch_scroll_velocity(level), 0.0, now)
+
+    def release(self):
+        self.engine.release()
+
+
+def bench_scroll_engine(args):
+    """Pinch scrolling: a fixed step every 5 stable frames vs the momentum scroll engine"""
+    from input_backend import RecordingBackend
+    from scroll_engine import ScrollEngine
+
+    rng = np.random.default_rng(args.seed)
+    print(f"Pinch {args.level:g} above its start for {args.hold:g}s (ramp 0.25s), then released; "
+          f"landmark noise {args.noise:g}")
+    print(f"  {'mode':<10}{'fps':>5}{'events':>8}{'notches':>9}{'first ms':>10}{'max gap ms':>12}{'coast ms':>10}")
+    for mode in ('step', 'momentum'):
+        for fps in args.fps:
+            backend = RecordingBackend()
+            engine = None
+            if mode == 'step':
+                scroll = StepScroll(backend)
+            else:
+                engine = ScrollEngine(backend=backend).start()
+                scroll = MomentumScroll(engine)
+
+            start = time.perf_counter()
+            onset = release = None
+            frame = 0
+            while True:
+                t = frame / fps
+                if t > args.hold + 1.0:
+                    break
+                delay = start + t - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                now = time.perf_counter()
+                if t < args.hold:
+                    # pinch level as Controller.getpinchylv: rounded tenths of the frame
+                    y = args.level / 10 * min(1.0, t / 0.25) + rng.normal(0, args.noise)
+                    level = round(y * 10, 1)
+                    if onset is None and abs(level) > 0.3:
+                        onset = now
+                    scroll.update(level, now)
+                elif release is None:
+                    release = now
+                    scroll.release()
+                frame += 1
+            if engine is not None:
+                engine.stop()
+
+            wheel = [(t, args_[0]) for t, name, args_ in backend.log if name == 'wheel']
+            times = np.array([t for t, _ in wheel])
+            notches = sum(amount for _, amount in wheel) / backend.wheel_resolution
+            first = (times[0] - onset) * 1000 if len(times) else float('nan')
+            held = times[(times > onset) & (times < release)] if len(times) else times
+            gap = np.diff(held).max() * 1000 if len(held) > 1 else float('nan')
+            coast = (times[-1] - release) * 1000 if len(times) and times[-1] > release else 0.0
+            print(f"  {mode:<10}{fps:>5g}{len(wheel):>8}{notches:>9.1f}{first:>10.1f}{gap:>12.1f}{coast:>10.1f}")
+    print("  notches: total scroll in wheel notches, first: pinch past the dead zone to the first event,")
+    print("  max gap: longest pause between scroll events while pinching, coast: scrolling after the release")
+
+def bench_parallel_sessions(args):
+    """Throughput of independent GestureSessions fed from one thread and from a thread each"""
+    import threading
+
+    install_input_stubs(InputRecorder())
+    import input_backend
+    input_backend.set_backend(input_backend.NullBackend())
+    from Gesture_Controller import Controller, DynGest, Gest, GestureSession
+    from custom_gesture_manager import CustomGestureManager
+    from hand_frame import HandFrame
+
+    # one manager for all sessions, matching needs no per-session state
+    manager = CustomGestureManager()
+    manager.gestures_db = {}
+    scenarios = [scenario for scenario in gesture_scenarios(Gest, DynGest) if scenario.custom is None]
+    frame_interval = 1.0 / args.fps
+
+    def script(index):
+        # every session runs the scenarios from a different one on, with its own noise
+        rng = np.random.default_rng(args.seed + index)
+        order = scenarios[index % len(scenarios):] + scenarios[:index % len(scenarios)]
+        frames = []
+        while len(frames) < args.frames:
+            for scenario in order:
+                for landmarks in scenario.frames():
+                    if landmarks is not None:
+                        landmarks = (landmarks + rng.normal(0.0, args.noise, landmarks.shape)).astype(np.float32)
+                    frames.append((landmarks, scenario.label))
+        return frames[:args.frames]
+
+    def run(session, frames, gestures, call_times, first=0):
+        for index, (landmarks, label) in enumerate(frames, first):
+            timestamp = index * frame_interval
+            hands = [] if landmarks is None else [HandFrame(landmarks, label, 0.98, timestamp)]
+            t = time.perf_counter()
+            session.process_results(hands, timestamp)
+            call_times.append(time.perf_counter() - t)
+            gestures.append((session.handmajor.ori_gesture, session.handminor.ori_gesture))
+
+    print(f"{args.frames} frames per session of the scripted gestures, landmark noise {args.noise:g}")
+    print(f"  {'sessions':>8}  {'fed from':<10}{'frames/s':>10}{'per session':>13}{'p95 ms':>9}{'isolated':>10}")
+    for count in args.sessions:
+        scripts = [script(index) for index in range(count)]
+        reference = None
+        for mode in ('one thread', 'threads'):
+            sessions = [GestureSession(Controller(dynamic_gestures=True), custom_gesture_manager=manager)
+                        for _ in range(count)]
+            gestures = [[] for _ in range(count)]
+            call_times = [[] for _ in range(count)]
+            start = time.perf_counter()
+            if mode == 'one thread':
+                # round robin, one frame of every session in turn
+                for index in range(args.frames):
+                    for session, frames, seen, times in zip(sessions, scripts, gestures, call_times):
+                        run(session, frames[index:index + 1], seen, times, index)
+            else:
+                threads = [threading.Thread(target=run, args=job)
+                           for job in zip(sessions, scripts, gestures, call_times)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            elapsed = time.perf_counter() - start
+
+            # a session's gestures must not depend on the other sessions
+            if reference is None:
+                reference = gestures
+            isolated = 'yes' if gestures == reference else 'NO'
+            ms = np.concatenate([np.array(times) for times in call_times]) * 1000
+            total = count * args.frames / elapsed
+            print(f"  {count:>8}  {mode:<10}{total:>10.0f}{total / count:>13.0f}"
+                  f"{np.percentile(ms, 95):>9.3f}{isolated:>10}")
+    print("  frames/s: all sessions together, p95 ms: process_results per frame,")
+    print("  isolated: every session recognized the same gestures as when fed round robin")
+
+def legacy_recognize(manager, hand):
+    """CustomGestureManager.recognize_gesture before the template matrix: one gesture at a time"""
+    current_features = manager.landmark_features(hand)
+    best_match = None
+    highest_similarity = 0
+    for gesture_name, gesture_data in manager.gestures_db.items():
+        similarity = manager.calculate_similarity(current_features, gesture_data['features'])
+        if similarity > gesture_data['threshold'] and similarity > highest_similarity:
+            highest_similarity = similarity
+            best_match = gesture_name
+    return best_match, highest_similarity
+
+
+def bench_custom_gestures(args):
+    """Custom gesture matching per frame, a Python loop over the gestures vs one matrix product"""
+    install_input_stubs(InputRecorder())
+    from custom_gesture_manager import CustomGestureManager
+    from hand_frame import HandFrame
+
+    rng = np.random.default_rng(args.seed)
+    manager = CustomGestureManager()
+    poses = [hand_pose(up=up) for up in ((), (5,), (5, 9), (9, 13, 17), (5, 17), (5, 9, 13, 17))]
+
+    def template(index):
+        pose = poses[index % len(poses)] + rng.normal(0.0, 0.03, (21, 3))
+        return {
+            'features': manager.extract_landmark_features(HandFrame(pose.astype(np.float32))),
+            'action_type': 'keyboard',
+            'action_value': 'press:f13',
+            'threshold': 0.85 + 0.1 * rng.random(),
+        }
+
+    print(f"{args.hands} hands per frame, {args.frames} frames per size")
+    print(f"  {'gestures':>8}{'loop ms':>10}{'matrix ms':>11}{'speedup':>9}{'same':>6}"
+          f"{'rebuild ms':>12}{'add ms':>8}{'delete ms':>11}")
+    for count in args.gestures:
+        manager.gestures_db = {f"g{index}": template(index) for index in range(count)}
+        t = time.perf_counter()
+        manager.rebuild_templates()
+        rebuild = time.perf_counter() - t
+
+        t = time.perf_counter()
+        for index in range(args.updates):
+            manager.set_gesture(f"new{index}", template(index))
+        add = (time.perf_counter() - t) / args.updates
+        t = time.perf_counter()
+        for index in range(args.updates):
+            manager.remove_gesture(f"new{index}")
+        delete = (time.perf_counter() - t) / args.updates
+
+        frames = [[HandFrame((poses[rng.integers(len(poses))] + rng.normal(0.0, 0.01, (21, 3))).astype(np.float32))
+                   for _ in range(args.hands)] for _ in range(args.frames)]
+        # the loop is slow at large sizes, time fewer frames
+        loop_frames = frames[:max(1, min(args.frames, 20000 // count))]
+        t = time.perf_counter()
+        loop = [[legacy_recognize(manager, hand) for hand in hands] for hands in loop_frames]
+        loop_ms = (time.perf_counter() - t) / len(loop_frames) * 1000
+        t = time.perf_counter()
+        matrix = [manager.recognize_gestures(hands) for hands in frames]
+        matrix_ms = (time.perf_counter() - t) / len(frames) * 1000
+
+        same = all(a[0] == b[0] and abs(a[1] - b[1]) < 1e-4
+                   for loop_hands, matrix_hands in zip(loop, matrix) for a, b in zip(loop_hands, matrix_hands))
+        print(f"  {count:>8}{loop_ms:>10.3f}{matrix_ms:>11.3f}{loop_ms / matrix_ms:>8.0f}x{'yes' if same else 'NO':>6}"
+              f"{rebuild * 1000:>12.2f}{add * 1000:>8.3f}{delete * 1000:>11.3f}")
+    print("  ms: matching all hands of one frame, same: the matrix picked the loop's gesture for every hand,")
+    print("  rebuild: packing all templates, add / delete: one gesture in place")
+
+class TimedHands:
+    """Wraps a MediaPipe Hands instance, keeps the duration of every 'process' call"""
+
+    def __init__(self, hands):
+        self.hands = hands
+        self.times = []
+
+    def process(self, image):
+        t = time.perf_counter()
+        results = self.hands.process(image)
+        self.times.append(time.perf_counter() - t)
+        return results
+
+
+def bench_landmark_roi(args):
+    """Hand landmark inference on ROI crops vs the full frame, on the same frames of a video or image directory"""
+    import mediapipe as mp
+    from frame_source import FrameBuffers, open_capture
+    from hand_frame import hand_frames
+    from landmark_roi import LandmarkROI
+
+    cap, _ = open_capture(args.source)
+    buffers = FrameBuffers()
+    frames = []
+    while len(frames) < args.frames:
+        success, frame = cap.read()
+        if not success:
+            break
+        buffers.mirror(frame)
+        image = buffers.to_rgb().copy()
+        image.flags.writeable = False
+        frames.append(image)
+    cap.release()
+    if not frames:
+        print(f"No frames in {args.source}")
+        return
+
+    def tracking():
+        return mp.solutions.hands.Hands(max_num_hands=2, min_detection_confidence=0.5, min_tracking_confidence=0.5)
+
+    def warm_up(hands, size):
+        # the first call loads the model, run it on an empty image
+        hands.process(np.zeros((size[0], size[1], 3), dtype=np.uint8))
+        hands.times.clear()
+
+    with tracking() as hands:
+        full = TimedHands(hands)
+        warm_up(full, frames[0].shape)
+        full_found = sum(bool(hand_frames(full.process(image))) for image in frames)
+
+    with tracking() as hands, mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=2,
+                                                       min_detection_confidence=0.5) as static:
+        crop = TimedHands(hands)
+        detector = TimedHands(static)
+        warm_up(crop, (args.out_size, args.out_size))
+        warm_up(detector, frames[0].shape)
+        roi = LandmarkROI(out_size=args.out_size, detector=detector)
+        per_frame = []
+        roi_found = 0
+        for image in frames:
+            t = time.perf_counter()
+            roi_found += bool(roi.process(crop, image))
+            per_frame.append(time.perf_counter() - t)
+
+    height, width = frames[0].shape[:2]
+    print(f"Hand landmark inference on {len(frames)} frames ({width}x{height}) of {args.source}, "
+          f"crops {args.out_size}x{args.out_size}")
+    print(f"  {'inference':<26}{'calls':>7}{'mean ms':>9}{'p50':>8}{'p95':>8}{'hands found':>13}")
+    rows = (
+        ('full frame (tracking)', full.times, f"{full_found}/{len(frames)}"),
+        ('roi: crop (tracking)', crop.times, ''),
+        ('roi: full frame (static)', detector.times, ''),
+        ('roi: per frame', per_frame, f"{roi_found}/{len(frames)}"),
+    )
+    for name, times, found in rows:
+        if not times:
+            print(f"  {name:<26}{0:>7}")
+            continue
+        ms = np.array(times) * 1000
+        p50, p95 = np.percentile(ms, (50, 95))
+        print(f"  {name:<26}{len(ms):>7}{ms.mean():>9.2f}{p50:>8.2f}{p95:>8.2f}{found:>13}")
+    stats = roi.stats()
+    print(f"  roi: {stats['crop_frames']} cropped, {stats['full_frames']} full-frame inferences, "
+          f"{stats['crop_misses']} lost in crop; per frame includes cropping and the full-frame retries")
+
+
+BENCHMARKS = {
+    'frame-path': bench_frame_path,
+    'gesture-latency': bench_gesture_latency,
+    'hand-recog': bench_hand_recog,
+    'landmark-filter': bench_landmark_filter,
+    'cursor-actuator': bench_cursor_actuator,
+    'cursor-queries': bench_cursor_queries,
+    'pointer-filter': bench_pointer_filter,
+    'input-backends': bench_input_backends,
+    'volume-actuator': bench_volume_actuator,
+    'brightness-actuator': bench_brightness_actuator,
+    'scroll-engine': bench_scroll_engine,
+    'parallel-sessions': bench_parallel_sessions,
+    'custom-gestures': bench_custom_gestures,
+    'landmark-roi': bench_landmark_roi,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='benchmark', required=True)
+
+    p = sub.add_parser('frame-path', help=bench_frame_path.__doc__)
+    p.add_argument('--frames', type=int, default=500)
+    p.add_argument('--width', type=int, default=640)
+    p.add_argument('--height', type=int, default=480)
+
+    p = sub.add_parser('gesture-latency', help=bench_gesture_latency.__doc__)
+    p.add_argument('--repeats', type=int, default=20)
+    p.add_argument('--fps', type=float, default=30.0, help="simulated camera rate")
+    p.add_argument('--noise', type=float, default=0.002, help="landmark noise (normalized units)")
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('--realistic', action='store_true',
+                   help="make the pyautogui stub sleep like pyautogui (duration + PAUSE)")
+
+    p = sub.add_parser('hand-recog', help=bench_hand_recog.__doc__)
+    p.add_argument('--hands', type=int, default=1000)
+    p.add_argument('--plain-objects', action='store_true',
+                   help="feed PlainLandmarkList objects instead of protobuf messages")
+    p.add_argument('--repeats', type=int, default=5)
+    p.add_argument('--noise', type=float, default=0.01, help="landmark noise (normalized units)")
+    p.add_argument('--seed', type=int, default=0)
+
+    p = sub.add_parser('landmark-filter', help=bench_landmark_filter.__doc__)
+    p.add_argument('--trace', help="recorded trace (Gesture_Controller.py --record), default: synthetic poses")
+    p.add_argument('--seconds', type=float, default=120.0, help="length of the synthetic trace")
+    p.add_argument('--fps', type=float, default=30.0, help="frame rate of the synthetic trace")
+    p.add_argument('--noise', type=float, default=0.015, help="landmark noise of the synthetic trace")
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('--scales', type=float, nargs='+', default=[1.0, 0.6], help="confirm window scales to compare")
+    p.add_argument('--min-hold', type=float, default=0.3,
+                   help="confirmed gestures replaced sooner than this (s) count as misfires")
+
+    p = sub.add_parser('cursor-actuator', help=bench_cursor_actuator.__doc__)
+    p.add_argument('--seconds', type=float, default=3.0)
+    p.add_argument('--fps', type=float, default=30.0, help="simulated camera rate")
+    p.add_argument('--cursor-hz', type=float, default=60.0, help="actuator glide rate")
+    p.add_argument('--pause', type=float, default=0.1, help="pyautogui.PAUSE of the stub")
+
+    p = sub.add_parser('cursor-queries', help=bench_cursor_queries.__doc__)
+    p.add_argument('--seconds', type=float, default=3.0)
+    p.add_argument('--fps', type=float, default=30.0, help="simulated camera rate")
+    p.add_argument('--cursor-hz', type=float, default=60.0, help="actuator glide rate")
+    p.add_argument('--round-trip-ms', type=float, default=0.5, help="simulated display server round trip")
+
+    p = sub.add_parser('pointer-filter', help=bench_pointer_filter.__doc__)
+    p.add_argument('--trace', help="recorded trace (Gesture_Controller.py --record), default: synthetic motion")
+    p.add_argument('--seconds', type=float, default=60.0, help="length of the synthetic trace")
+    p.add_argument('--fps', type=float, default=30.0, help="frame rate of the synthetic trace")
+    p.add_argument('--fps-list', type=float, nargs='+', default=[15.0, 60.0],
+                   help="frame rates to compare the cursor travel of the synthetic motion at")
+    p.add_argument('--noise', type=float, default=0.002, help="landmark noise of the synthetic trace")
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('--still-speed', type=float, default=60.0,
+                   help="hand speed (px/s) below which a recorded hand counts as still")
+
+    p = sub.add_parser('input-backends', help=bench_input_backends.__doc__)
+    p.add_argument('--actions', type=int, default=2000)
+    p.add_argument('--pause', type=float, default=0.1, help="pyautogui.PAUSE of the stub")
+    p.add_argument('--inject', action='store_true',
+                   help="also run the XTest and uinput backends, which move the real cursor and press shift / ctrl")
+
+    p = sub.add_parser('volume-actuator', help=bench_volume_actuator.__doc__)
+    p.add_argument('--seconds', type=float, default=3.0)
+    p.add_argument('--rate', type=float, default=6.0, help="volume steps per second (pinch: every 5th frame)")
+    p.add_argument('--device-ms', type=float, default=2.0, help="simulated time per volume get / set")
+    p.add_argument('--acquire-ms', type=float, default=5.0, help="simulated time to acquire the endpoint")
+    p.add_argument('--seed', type=int, default=0)
+
+    p = sub.add_parser('brightness-actuator', help=bench_brightness_actuator.__doc__)
+    p.add_argument('--seconds', type=float, default=3.0)
+    p.add_argument('--rate', type=float, default=6.0, help="brightness steps per second (pinch: every 5th frame)")
+    p.add_argument('--device-ms', type=float, default=5.0, help="simulated time per brightness get / set")
+    p.add_argument('--seed', type=int, default=0)
+
+    p = sub.add_parser('scroll-engine', help=bench_scroll_engine.__doc__)
+    p.add_argument('--fps', type=float, nargs='+', default=[15.0, 30.0])
+    p.add_argument('--level', type=float, default=0.8, help="pinch displacement in tenths of the frame")
+    p.add_argument('--hold', type=float, default=1.5, help="seconds the pinch is held")
+    p.add_argument('--noise', type=float, default=0.003, help="landmark noise, fraction of the frame")
+    p.add_argument('--seed', type=int, default=0)
+
+    p = sub.add_parser('parallel-sessions', help=bench_parallel_sessions.__doc__)
+    p.add_argument('--sessions', type=int, nargs='+', default=[1, 2, 4, 8])
+    p.add_argument('--frames', type=int, default=600, help="frames per session")
+    p.add_argument('--fps', type=float, default=30.0)
+    p.add_argument('--noise', type=float, default=0.002)
+    p.add_argument('--seed', type=int, default=0)
+
+    p = sub.add_parser('custom-gestures', help=bench_custom_gestures.__doc__)
+    p.add_argument('--gestures', type=int, nargs='+', default=[10, 100, 1000, 10000])
+    p.add_argument('--hands', type=int, default=2, help="hands per frame")
+    p.add_argument('--frames', type=int, default=200)
+    p.add_argument('--updates', type=int, default=20, help="gestures added and deleted per size")
+    p.add_argument('--seed', type=int, default=0)
+
+    p = sub.add_parser('landmark-roi', help=bench_landmark_roi.__doc__)
+    p.add_argument('--source', required=True, help="video file or image directory with hands in view")
+    p.add_argument('--frames', type=int, default=300)
+    p.add_argument('--out-size', type=int, default=256, help="side of the crop the model sees")
+
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+from level_actuator import FakeLevelBackend, LevelActuator
+
+# Screen brightness on a 0.0 - 1.0 scale. All brightness changes go
+# through the process wide LevelActuator of get_brightness(), which fades
+# on its own thread instead of blocking in sbcontrol.fade_brightness.
+
+
+class ScreenBrightnessBackend:
+    """screen_brightness_control on one display (WMI on Windows, sysfs / ddcutil on Linux)"""
+
+    name = 'screen_brightness_control'
+
+    def __init__(self, display=0):
+        import screen_brightness_control
+        self.sbc = screen_brightness_control
+        self.display = display
+
+    def get_level(self):
+        value = self.sbc.get_brightness(display=self.display)
+        # a list of one value with newer versions
+        if isinstance(value, list):
+            value = value[0]
+        return value / 100.0
+
+    def set_level(self, level):
+        self.sbc.set_brightness(round(level * 100), display=self.display)
+
+
+class FakeBrightnessBackend(FakeLevelBackend):
+    """Brightness kept in memory, for benchmarks and machines without brightness control"""
+
+
+_brightness = None
+
+
+def _actuator(backend):
+    # 1% steps every 10 ms, like sbcontrol.fade_brightness
+    return LevelActuator(backend, 'brightness', fade_step=0.01, fade_interval=0.01)
+
+
+def get_brightness():
+    """The process wide brightness LevelActuator, created on first use"""
+    global _brightness
+    if _brightness is None:
+        try:
+            backend = ScreenBrightnessBackend()
+        except Exception as e:
+            print(f"Brightness control unavailable ({e}), brightness gestures have no effect")
+            backend = FakeBrightnessBackend()
+        _brightness = _actuator(backend)
+    return _brightness
+
+
+def set_brightness_backend(backend):
+    """Replaces the brightness backend, returns the new brightness LevelActuator"""
+    global _brightness
+    if _brightness is not None:
+        _brightness.stop(force=True)
+    _brightness = _actuator(backend)
+    return _brightness
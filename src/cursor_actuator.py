@@ -0,0 +1,198 @@
+import collections
+import math
+import threading
+import time
+
+from cursor_model import CursorModel
+from input_backend import get_backend
+
+
+class CursorActuator:
+    """
+    Moves the cursor and presses mouse buttons on its own thread, so the
+    vision loop never waits on input injection.
+
+    The loop only posts targets with 'move_to': the actuator keeps the
+    latest one and glides the cursor towards it at 'rate_hz' (the display
+    refresh rate), covering 95% of the way in 'glide' seconds, one
+    move of the input backend per step. Targets posted faster than
+    the cursor moves simply replace each other.
+
+    Button presses, releases and clicks go through an ordered queue instead.
+    Each event remembers the target at the time it was posted, and the
+    cursor jumps there before the event runs, so a drag presses and releases
+    where the hand was, never at a point of the glide in between.
+
+    Until 'start' is called every call runs synchronously on the caller's
+    thread, which keeps replays and benchmarks deterministic.
+
+    Commanded moves are recorded in 'model' (a CursorModel); while idle the
+    thread keeps it in sync with the real cursor, so reading the cursor
+    position or screen size costs the vision loop no display round trip.
+    Input goes to 'backend' (an InputBackend), by default the process wide
+    one at the time of each call.
+    """
+
+    def __init__(self, rate_hz=60.0, glide=0.1, model=None, backend=None):
+        self.interval = 1.0 / rate_hz
+        # time constant of the exponential approach, 3 of them reach 95%
+        self.tau = glide / 3.0
+        self.cond = threading.Condition()
+        self.events = collections.deque()
+        self.target = None      # latest posted position
+        self.cursor = None      # position of the last moveTo sent, float
+        self.running = False
+        self.thread = None
+        self.backend = backend
+        self.model = model if model is not None else CursorModel(backend=backend)
+
+        self.targets_posted = 0
+        self.moves_sent = 0
+        self.events_sent = 0
+        self.max_queue = 0
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="CursorActuator", daemon=True)
+        self.thread.start()
+        return self
+
+    def move_to(self, x, y):
+        """Posts a new cursor target (screen pixels), never blocks"""
+        x, y = self.model.clamp(x, y)
+        self.targets_posted += 1
+        if self.thread is None:
+            self.target = (x, y)
+            self._move(x, y)
+            return
+        with self.cond:
+            self.target = (x, y)
+            self.cond.notify()
+
+    def mouse_down(self, button='left'):
+        self.post('mouse_down', button=button)
+
+    def mouse_up(self, button='left'):
+        self.post('mouse_up', button=button)
+
+    def click(self, button='left'):
+        self.post('click', button=button)
+
+    def double_click(self):
+        self.post('double_click')
+
+    def post(self, name, **kwargs):
+        """Queues the input backend call 'name' at the current target"""
+        if self.thread is None:
+            self._execute((name, kwargs, self.target))
+            return
+        with self.cond:
+            self.events.append((name, kwargs, self.target))
+            self.max_queue = max(self.max_queue, len(self.events))
+            self.cond.notify()
+
+    def position(self):
+        """Where the cursor is headed: the latest target while gliding, else the real cursor position"""
+        target = self.target
+        if self._pending_move(target):
+            return target
+        return self.model.cursor_position()
+
+    def _pending_move(self, target):
+        # True while the cursor has not reached 'target' yet
+        if target is None:
+            return False
+        cursor = self.cursor
+        return cursor is None or (round(cursor[0]), round(cursor[1])) != (round(target[0]), round(target[1]))
+
+    def _has_work(self):
+        return bool(self.events) or not self.running or self._pending_move(self.target)
+
+    def _backend(self):
+        return self.backend if self.backend is not None else get_backend()
+
+    def _move(self, x, y):
+        self.cursor = (x, y)
+        self.moves_sent += 1
+        # one step for CursorModel.sync, which must not see the move unrecorded
+        with self.model.lock:
+            self._backend().move_to(x, y)
+            self.model.moved(x, y)
+
+    def _execute(self, event):
+        name, kwargs, at = event
+        backend = self._backend()
+        # the jump to the event position and the event go out together
+        with backend.batch():
+            if self._pending_move(at):
+                self._move(*at)
+            self.events_sent += 1
+            getattr(backend, name)(**kwargs)
+
+    def _run(self):
+        last_step = None
+        while True:
+            with self.cond:
+                busy = self.cond.wait_for(self._has_work, self.model.sync_interval / 2)
+                if not self.running and not self.events:
+                    break
+                event = self.events.popleft() if self.events else None
+                target = self.target
+
+            if not busy:
+                # idle, check the cursor for mouse moves off the vision loop
+                self.model.cursor_position()
+                continue
+            if event is not None:
+                self._execute(event)
+                continue
+
+            now = time.perf_counter()
+            if last_step is None or now - last_step > 4 * self.interval:
+                # first step after idling covers one interval and starts from
+                # the tracked cursor, which may have been moved by the mouse
+                last_step = now - self.interval
+                self.cursor = self.model.cursor_position(now)
+            delay = last_step + self.interval - now
+            if delay > 0:
+                # an event or a stop request ends the wait early
+                with self.cond:
+                    if self.cond.wait_for(lambda: self.events or not self.running, delay):
+                        continue
+                now = time.perf_counter()
+                target = self.target
+
+            x, y = self.cursor
+            a = 1.0 - math.exp(-(now - last_step) / self.tau)
+            x += (target[0] - x) * a
+            y += (target[1] - y) * a
+            if abs(target[0] - x) < 1.0 and abs(target[1] - y) < 1.0:
+                x, y = target
+            last_step = now
+            self._move(x, y)
+
+    def flush(self, timeout=1.0):
+        """Waits until all queued events ran and the cursor reached the target, True if it did"""
+        deadline = time.perf_counter() + timeout
+        while self.thread is not None and (self.events or self._pending_move(self.target)):
+            if time.perf_counter() > deadline:
+                return False
+            time.sleep(self.interval / 4)
+        return True
+
+    def stop(self):
+        """Stops the thread after running the queued events, so no button is left pressed"""
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        if self.thread is not None:
+            self.thread.join(timeout=2.0)
+        self.thread = None
+
+    def stats(self):
+        return {
+            'targets_posted': self.targets_posted,
+            'moves_sent': self.moves_sent,
+            'events_sent': self.events_sent,
+            'max_queue': self.max_queue,
+        }
@@ -0,0 +1,107 @@
+import threading
+import time
+
+from input_backend import get_backend
+
+
+class CursorModel:
+    """
+    Screen size and cursor position without a round trip to the display
+    server per frame.
+
+    The screen size is cached and refreshed every 'geometry_interval'
+    seconds, on 'invalidate' (display configuration changes) and when the
+    real cursor turns up outside the cached screen. The cursor position is
+    the one last commanded through 'moved'; 'sync' compares it with the real
+    cursor at most every 'sync_interval' seconds and adopts the real one
+    when they differ by more than 'tolerance' pixels, i.e. when the mouse
+    moved the cursor. Both are read from 'backend' (an InputBackend), by
+    default the process wide one.
+
+    The model is shared by the vision thread and the cursor actuator
+    thread; a caller that moves the cursor holds 'lock' across the move and
+    'moved', so 'sync' never sees the real cursor ahead of the record.
+    """
+
+    def __init__(self, geometry_interval=5.0, sync_interval=0.5, tolerance=2, backend=None):
+        self.geometry_interval = geometry_interval
+        self.sync_interval = sync_interval
+        self.tolerance = tolerance
+        self.backend = backend
+        self.size = None
+        self.size_time = None
+        self.position = None
+        self.sync_time = None
+        self.lock = threading.RLock()
+
+        self.geometry_refreshes = 0
+        self.syncs = 0
+        self.external_moves = 0
+
+    def screen_size(self, now=None):
+        """(width, height) of the screen, cached"""
+        if now is None:
+            now = time.perf_counter()
+        with self.lock:
+            if self.size is None or now - self.size_time >= self.geometry_interval:
+                self.refresh_geometry(now)
+            return self.size
+
+    def refresh_geometry(self, now=None):
+        with self.lock:
+            self.size = tuple(self._backend().size())
+            self.size_time = time.perf_counter() if now is None else now
+            self.geometry_refreshes += 1
+
+    def _backend(self):
+        return self.backend if self.backend is not None else get_backend()
+
+    def invalidate(self):
+        """Re-reads the screen size on the next use, call when the display configuration changed"""
+        self.size = None
+
+    def clamp(self, x, y):
+        """(x, y) moved onto the screen, where the system would put the cursor"""
+        w, h = self.screen_size()
+        return min(max(x, 0), w - 1), min(max(y, 0), h - 1)
+
+    def cursor_position(self, now=None):
+        """Cursor position, the last commanded one between syncs"""
+        if now is None:
+            now = time.perf_counter()
+        with self.lock:
+            if self.position is None or now - self.sync_time >= self.sync_interval:
+                self.sync(now)
+            return self.position
+
+    def moved(self, x, y):
+        """Records a cursor move that was just commanded"""
+        with self.lock:
+            self.position = (x, y)
+
+    def sync(self, now=None):
+        """Compares the tracked position with the real cursor, True if the mouse moved it"""
+        with self.lock:
+            x, y = self._backend().position()
+            self.sync_time = time.perf_counter() if now is None else now
+            self.syncs += 1
+
+            external = False
+            if self.position is not None:
+                tx, ty = self.position
+                external = abs(x - tx) > self.tolerance or abs(y - ty) > self.tolerance
+                if external:
+                    self.external_moves += 1
+            if external or self.position is None:
+                self.position = (x, y)
+            if self.size is not None and not (0 <= x < self.size[0] and 0 <= y < self.size[1]):
+                # the cursor left the cached screen, a display was added or resized
+                self.invalidate()
+            return external
+
+    def stats(self):
+        return {
+            'geometry_refreshes': self.geometry_refreshes,
+            'syncs': self.syncs,
+            'external_moves': self.external_moves,
+        }
@@ -5,13 +5,34 @@ import numpy as np
 import mediapipe as mp
 from datetime import datetime
 
+from hand_frame import HandFrame, landmarks_to_array
+from input_backend import get_backend
+from audio_control import get_volume
+from brightness_control import get_brightness
+
+# length of the landmark features of a gesture: 21 landmarks, x y z
+FEATURE_SIZE = 63
+
 class CustomGestureManager:
     """
     Allows users to create and manage custom gestures with associated actions
+
+    The template features of all gestures are kept unit length in one
+    float32 (N, 63) matrix, their thresholds in a parallel vector, so all
+    hands of a frame are scored against all gestures with one matrix
+    product. Gestures created or deleted through the manager update the
+    matrix in place; a gestures_db replaced or grown / shrunk from outside
+    is packed again on the next recognition.
     """
     
     def __init__(self):
         self.gestures_db = {}
+        # template matrix rows in use, their gesture names and name -> row
+        self.template_matrix = np.zeros((0, FEATURE_SIZE), dtype=np.float32)
+        self.template_thresholds = np.zeros(0, dtype=np.float32)
+        self.template_names = []
+        self.template_rows = {}
+        self.templates_db = None
         self.current_gesture = None
         self.recording = False
         self.gesture_samples = []
@@ -28,6 +49,74 @@ class CustomGestureManager:
         except FileNotFoundError:
             self.gestures_db = {}
             print("No existing gestures found. Starting fresh.")
+        self.rebuild_templates()
+
+    def rebuild_templates(self):
+        """Packs the features of all gestures in gestures_db into the template matrix"""
+        count = len(self.gestures_db)
+        self.template_matrix = np.zeros((max(count, 16), FEATURE_SIZE), dtype=np.float32)
+        self.template_thresholds = np.full(len(self.template_matrix), np.inf, dtype=np.float32)
+        self.template_names = []
+        self.template_rows = {}
+        for gesture_name in self.gestures_db:
+            self._store_template(gesture_name)
+        self.templates_db = self.gestures_db
+
+    def _store_template(self, gesture_name):
+        # row of the gesture, appended when it is new
+        row = self.template_rows.get(gesture_name)
+        if row is None:
+            row = len(self.template_names)
+            if row == len(self.template_matrix):
+                # grow by doubling, rows past the used ones stay zero
+                matrix = np.zeros((2 * row, FEATURE_SIZE), dtype=np.float32)
+                matrix[:row] = self.template_matrix
+                thresholds = np.full(2 * row, np.inf, dtype=np.float32)
+                thresholds[:row] = self.template_thresholds
+                self.template_matrix, self.template_thresholds = matrix, thresholds
+            self.template_names.append(gesture_name)
+            self.template_rows[gesture_name] = row
+
+        gesture_data = self.gestures_db[gesture_name]
+        features = np.asarray(gesture_data['features'], dtype=np.float32)
+        norm = np.linalg.norm(features) if features.shape == (FEATURE_SIZE,) else 0
+        if norm == 0:
+            # never matches, like a template of the wrong length or all zeros
+            self.template_matrix[row] = 0
+        else:
+            self.template_matrix[row] = features / norm
+        self.template_thresholds[row] = gesture_data['threshold']
+
+    def _drop_template(self, gesture_name):
+        # the last row moves into the freed one
+        row = self.template_rows.pop(gesture_name)
+        last = len(self.template_names) - 1
+        if row != last:
+            moved = self.template_names[last]
+            self.template_matrix[row] = self.template_matrix[last]
+            self.template_thresholds[row] = self.template_thresholds[last]
+            self.template_names[row] = moved
+            self.template_rows[moved] = row
+        self.template_names.pop()
+        self.template_matrix[last] = 0
+        self.template_thresholds[last] = np.inf
+
+    def set_gesture(self, gesture_name, gesture_data):
+        """Adds or replaces a gesture in gestures_db and the template matrix, without saving"""
+        self._sync_templates()
+        self.gestures_db[gesture_name] = gesture_data
+        self._store_template(gesture_name)
+
+    def remove_gesture(self, gesture_name):
+        """Removes a gesture from gestures_db and the template matrix, without saving"""
+        self._sync_templates()
+        del self.gestures_db[gesture_name]
+        self._drop_template(gesture_name)
+
+    def _sync_templates(self):
+        # gestures_db replaced, or gestures added / removed from outside
+        if self.templates_db is not self.gestures_db or len(self.template_names) != len(self.gestures_db):
+            self.rebuild_templates()
     
     def save_gestures(self):
         """Save custom gestures to JSON file"""
@@ -35,21 +124,14 @@ class CustomGestureManager:
             json.dump(self.gestures_db, f, indent=4)
         print(f"Saved {len(self.gestures_db)} gestures to custom_gestures.json")
     
-    def extract_landmark_features(self, hand_landmarks):
+    def landmark_features(self, hand):
+        """Landmark coordinates relative to the wrist as a flat (63,) array"""
+        coords = hand.coords if isinstance(hand, HandFrame) else landmarks_to_array(hand)
+        return (coords - coords[0]).ravel()
+
+    def extract_landmark_features(self, hand):
         """Extract normalized landmark features for gesture recognition"""
-        features = []
-        
-        # Get all landmark coordinates relative to wrist
-        wrist = hand_landmarks.landmark[0]
-        
-        for landmark in hand_landmarks.landmark:
-            # Normalize coordinates relative to wrist
-            x = landmark.x - wrist.x
-            y = landmark.y - wrist.y
-            z = landmark.z - wrist.z
-            features.extend([x, y, z])
-        
-        return features
+        return self.landmark_features(hand).tolist()
     
     def calculate_similarity(self, features1, features2):
         """Calculate similarity between two gesture feature sets"""
@@ -102,41 +184,62 @@ class CustomGestureManager:
         # Store the average features
         avg_features = np.mean(self.gesture_samples, axis=0).tolist()
         
-        self.gestures_db[self.current_gesture['name']] = {
+        self.set_gesture(self.current_gesture['name'], {
             'features': avg_features,
             'action_type': self.current_gesture['action_type'],
             'action_value': self.current_gesture['action_value'],
             'threshold': self.current_gesture['threshold'],
             'created_at': datetime.now().isoformat()
-        }
+        })
         
         self.save_gestures()
         self.recording = False
         print(f"Gesture '{self.current_gesture['name']}' created successfully!")
         return True
     
-    def recognize_gesture(self, hand_landmarks):
-        """Recognize if current hand landmarks match any custom gesture"""
-        if not self.gestures_db:
-            return None, 0
-        
-        current_features = self.extract_landmark_features(hand_landmarks)
-        best_match = None
-        highest_similarity = 0
-        
-        for gesture_name, gesture_data in self.gestures_db.items():
-            similarity = self.calculate_similarity(current_features, gesture_data['features'])
-            
-            if similarity > gesture_data['threshold'] and similarity > highest_similarity:
-                highest_similarity = similarity
-                best_match = gesture_name
-        
-        return best_match, highest_similarity
+    def recognize_gesture(self, hand):
+        """Recognize if the current hand (HandFrame or MediaPipe landmarks) matches any custom gesture"""
+        return self.recognize_gestures([hand])[0]
+
+    def recognize_gestures(self, hands):
+        """
+        (gesture name or None, similarity) of every hand (HandFrame or
+        MediaPipe landmarks): the gesture most similar to the hand among
+        those it is more similar to than their threshold
+        """
+        self._sync_templates()
+        count = len(self.template_names)
+        if not count or not hands:
+            return [(None, 0)] * len(hands)
+
+        features = np.stack([self.landmark_features(hand) for hand in hands]).astype(np.float32, copy=False)
+        norms = np.linalg.norm(features, axis=1, keepdims=True)
+        norms[norms == 0] = np.inf
+        # cosine similarity of every hand to every template in one product
+        similarity = (features / norms) @ self.template_matrix[:count].T
+        thresholds = np.maximum(self.template_thresholds[:count], 0)
+        similarity[similarity <= thresholds] = -np.inf
+        best = similarity.argmax(axis=1)
+
+        matches = []
+        for index, row in enumerate(best.tolist()):
+            value = similarity[index, row]
+            if value == -np.inf:
+                matches.append((None, 0))
+            else:
+                matches.append((self.template_names[row], float(value)))
+        return matches
     
-    def execute_gesture_action(self, gesture_name):
-        """Execute the action associated with a recognized gesture"""
+    def execute_gesture_action(self, gesture_name, backend=None, volume=None, brightness=None):
+        """
+        Execute the action associated with a recognized gesture, on the given
+        input backend and volume / brightness actuators, by default the
+        process wide ones
+        """
         if gesture_name not in self.gestures_db:
             return False
+        if backend is None:
+            backend = get_backend()
         
         gesture_data = self.gestures_db[gesture_name]
         action_type = gesture_data['action_type']
@@ -144,11 +247,11 @@ class CustomGestureManager:
         
         try:
             if action_type == "keyboard":
-                self._execute_keyboard_action(action_value)
+                self._execute_keyboard_action(action_value, backend)
             elif action_type == "mouse":
-                self._execute_mouse_action(action_value)
+                self._execute_mouse_action(action_value, backend)
             elif action_type == "system":
-                self._execute_system_action(action_value)
+                self._execute_system_action(action_value, volume, brightness)
             elif action_type == "custom":
                 self._execute_custom_action(action_value)
             
@@ -159,43 +262,39 @@ class CustomGestureManager:
             print(f"Error executing action for {gesture_name}: {e}")
             return False
     
-    def _execute_keyboard_action(self, action_value):
+    def _execute_keyboard_action(self, action_value, backend):
         """Execute keyboard-related actions"""
-        import pyautogui
-        
         if action_value.startswith("press:"):
             keys = action_value.replace("press:", "").split("+")
-            pyautogui.hotkey(*keys)
+            backend.hotkey(*keys)
         elif action_value.startswith("type:"):
             text = action_value.replace("type:", "")
-            pyautogui.write(text)
+            backend.write(text)
     
-    def _execute_mouse_action(self, action_value):
+    def _execute_mouse_action(self, action_value, backend):
         """Execute mouse-related actions"""
-        import pyautogui
-        
         if action_value == "click_left":
-            pyautogui.click()
+            backend.click()
         elif action_value == "click_right":
-            pyautogui.click(button='right')
+            backend.click(button='right')
         elif action_value == "double_click":
-            pyautogui.doubleClick()
+            backend.double_click()
         elif action_value == "scroll_up":
-            pyautogui.scroll(100)
+            backend.scroll(1)
         elif action_value == "scroll_down":
-            pyautogui.scroll(-100)
+            backend.scroll(-1)
     
-    def _execute_system_action(self, action_value):
+    def _execute_system_action(self, action_value, volume=None, brightness=None):
         """Execute system-related actions - FIXED VERSION"""
         try:
             if action_value == "volume_up":
-                self._change_volume(10)
+                self._change_volume(10, volume)
             elif action_value == "volume_down":
-                self._change_volume(-10)
+                self._change_volume(-10, volume)
             elif action_value == "brightness_up":
-                self._change_brightness(10)
+                self._change_brightness(10, brightness)
             elif action_value == "brightness_down":
-                self._change_brightness(-10)
+                self._change_brightness(-10, brightness)
             else:
                 print(f"Unknown system action: {action_value}")
         except Exception as e:
@@ -205,46 +304,24 @@ class CustomGestureManager:
         """Execute custom Python code or functions"""
         print(f"Custom action executed: {action_value}")
     
-    def _change_volume(self, delta):
+    def _change_volume(self, delta, volume=None):
         """Change system volume"""
         try:
-            from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
-            from ctypes import cast, POINTER
-            from comtypes import CLSCTX_ALL
-            
-            devices = AudioUtilities.GetSpeakers()
-            interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
-            volume = cast(interface, POINTER(IAudioEndpointVolume))
-            
-            current_volume = volume.GetMasterVolumeLevelScalar()
-            new_volume = max(0.0, min(1.0, current_volume + delta/100.0))
-            volume.SetMasterVolumeLevelScalar(new_volume, None)
-            print(f"Volume changed to {int(new_volume * 100)}%")
+            # applied off this thread, None until the current volume is known
+            new_volume = (volume if volume is not None else get_volume()).nudge(delta/100.0)
+            if new_volume is not None:
+                print(f"Volume changed to {int(new_volume * 100)}%")
             
         except Exception as e:
             print(f"Error changing volume: {e}")
     
-    def _change_brightness(self, delta):
-        """Change system brightness - FIXED VERSION"""
+    def _change_brightness(self, delta, brightness=None):
+        """Change system brightness"""
         try:
-            import screen_brightness_control as sbc
-            
-            current_brightness = sbc.get_brightness()
-            
-            # Handle different return types from sbc.get_brightness()
-            if isinstance(current_brightness, list):
-                # If it returns a list, take the first value
-                current = current_brightness[0] if current_brightness else 50
-            elif isinstance(current_brightness, int):
-                # If it returns a single integer
-                current = current_brightness
-            else:
-                # Default fallback
-                current = 50
-            
-            new_brightness = max(0, min(100, current + delta))
-            sbc.set_brightness(new_brightness)
-            print(f"Brightness changed from {current}% to {new_brightness}%")
+            # faded off this thread, None until the current brightness is known
+            new_brightness = (brightness if brightness is not None else get_brightness()).nudge(delta/100.0)
+            if new_brightness is not None:
+                print(f"Brightness changed to {round(new_brightness * 100)}%")
             
         except Exception as e:
             print(f"Error changing brightness: {e}")
@@ -262,7 +339,7 @@ class CustomGestureManager:
     def delete_gesture(self, gesture_name):
         """Delete a custom gesture"""
         if gesture_name in self.gestures_db:
-            del self.gestures_db[gesture_name]
+            self.remove_gesture(gesture_name)
             self.save_gestures()
             print(f"Gesture '{gesture_name}' deleted.")
         else:
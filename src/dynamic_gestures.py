@@ -0,0 +1,181 @@
+import math
+from enum import IntEnum
+
+
+# Dynamic gesture events, numbered after the static Gest values so both
+# can be passed to Controller.handle_controls
+class DynGest(IntEnum):
+    SWIPE_LEFT = 40
+    SWIPE_RIGHT = 41
+    SWIPE_UP = 42
+    SWIPE_DOWN = 43
+    CIRCLE_CW = 44
+    CIRCLE_CCW = 45
+    PUSH = 46
+    PULL = 47
+
+
+class DynamicGestureRecognizer:
+    """
+    Recognizes hand motions (swipes, circles, push / pull) of one hand.
+
+    Keeps the last 'capacity' samples of the hand (time, palm position and
+    hand size) in a ring buffer covering at most 'window'
+    seconds. Net displacement, path length, accumulated turning angle and
+    size change over the window are updated incrementally as samples enter
+    and leave, together with a smoothed velocity, so every frame costs O(1)
+    regardless of the history length.
+
+    Motions are only tracked while the static gesture is one of
+    'active_gestures' (the open hand in the controller, so moving the cursor
+    never swipes). After an event the history is cleared and nothing fires for
+    'cooldown' seconds.
+    """
+
+    # palm center and the landmarks spanning the hand size
+    POINT = 9
+    SIZE_FROM = 0
+    SIZE_TO = 9
+
+    def __init__(self, active_gestures, capacity=64, window=0.8, cooldown=0.6,
+                 swipe_dist=0.25, swipe_straightness=0.8, swipe_speed=0.8,
+                 circle_turn=1.7 * math.pi, circle_path=0.3, push_scale=1.3, min_step=0.003):
+        self.active_gestures = frozenset(active_gestures)
+        self.capacity = capacity
+        self.window = window
+        self.cooldown = cooldown
+        self.swipe_dist = swipe_dist
+        self.swipe_straightness = swipe_straightness
+        self.swipe_speed = swipe_speed
+        self.circle_turn = circle_turn
+        self.circle_path = circle_path
+        self.log_push_scale = math.log(push_scale)
+        self.min_step = min_step
+
+        # ring buffer, per sample k: segment length / turning angle of the
+        # step from sample k-1 to sample k
+        self.t = [0.0] * capacity
+        self.x = [0.0] * capacity
+        self.y = [0.0] * capacity
+        self.log_size = [0.0] * capacity
+        self.seg = [0.0] * capacity
+        self.turn = [0.0] * capacity
+        self.oldest = 0
+        self.count = 0
+
+        # running features over the samples in the buffer
+        self.path = 0.0
+        self.turning = 0.0
+        self.heading = None  # direction of the last step longer than min_step
+        self.vx = 0.0
+        self.vy = 0.0
+        self.last_event_time = -math.inf
+        self.events = 0
+
+    def reset(self):
+        self.count = 0
+        self.path = 0.0
+        self.turning = 0.0
+        self.heading = None
+        self.vx = 0.0
+        self.vy = 0.0
+
+    def _evict(self):
+        # the step into the new oldest sample and the turn at the sample after
+        # it no longer lie inside the window
+        cap = self.capacity
+        if self.count >= 2:
+            self.path -= self.seg[(self.oldest + 1) % cap]
+        if self.count >= 3:
+            self.turning -= self.turn[(self.oldest + 2) % cap]
+        self.oldest = (self.oldest + 1) % cap
+        self.count -= 1
+
+    def update(self, hand, gesture, now=None):
+        """
+        Adds the HandFrame 'hand' with its static 'gesture', returns a DynGest
+        when a motion completes with this frame, None otherwise
+        """
+        if hand is None or gesture not in self.active_gestures:
+            if self.count:
+                self.reset()
+            return None
+        if now is None:
+            now = hand.timestamp
+
+        x, y = hand.coords[self.POINT, :2].tolist()
+        sx, sy = (hand.coords[self.SIZE_FROM, :2] - hand.coords[self.SIZE_TO, :2]).tolist()
+        log_size = math.log(max(math.hypot(sx, sy), 1e-6))
+
+        cap = self.capacity
+        while self.count and (self.count == cap or now - self.t[self.oldest] > self.window):
+            self._evict()
+
+        seg = turn = 0.0
+        if self.count:
+            last = (self.oldest + self.count - 1) % cap
+            dx = x - self.x[last]
+            dy = y - self.y[last]
+            seg = math.hypot(dx, dy)
+            dt = now - self.t[last]
+            if dt > 0:
+                self.vx = 0.5 * self.vx + 0.5 * dx / dt
+                self.vy = 0.5 * self.vy + 0.5 * dy / dt
+            if seg >= self.min_step:
+                heading = math.atan2(dy, dx)
+                if self.heading is not None:
+                    # signed change of direction, wrapped to (-pi, pi]
+                    turn = (heading - self.heading + math.pi) % (2 * math.pi) - math.pi
+                self.heading = heading
+
+        i = (self.oldest + self.count) % cap
+        self.t[i] = now
+        self.x[i] = x
+        self.y[i] = y
+        self.log_size[i] = log_size
+        self.seg[i] = seg
+        self.turn[i] = turn
+        self.count += 1
+        self.path += seg
+        self.turning += turn
+
+        if now - self.last_event_time < self.cooldown:
+            return None
+        event = self._classify(i)
+        if event is not None:
+            self.last_event_time = now
+            self.events += 1
+            self.reset()
+        return event
+
+    def _classify(self, newest):
+        if self.count < 3:
+            return None
+        oldest = self.oldest
+        dx = self.x[newest] - self.x[oldest]
+        dy = self.y[newest] - self.y[oldest]
+        dist = math.hypot(dx, dy)
+
+        # image y grows downwards: a positive turning sum is clockwise on screen
+        if abs(self.turning) >= self.circle_turn and self.path >= self.circle_path and dist < 0.5 * self.path:
+            return DynGest.CIRCLE_CW if self.turning > 0 else DynGest.CIRCLE_CCW
+
+        if (dist >= self.swipe_dist and dist >= self.swipe_straightness * self.path
+                and math.hypot(self.vx, self.vy) >= self.swipe_speed):
+            if abs(dx) >= abs(dy):
+                return DynGest.SWIPE_RIGHT if dx > 0 else DynGest.SWIPE_LEFT
+            return DynGest.SWIPE_DOWN if dy > 0 else DynGest.SWIPE_UP
+
+        # the hand grows on screen when pushed towards the camera
+        growth = self.log_size[newest] - self.log_size[oldest]
+        if abs(growth) >= self.log_push_scale and dist < self.swipe_dist / 2:
+            return DynGest.PUSH if growth > 0 else DynGest.PULL
+        return None
+
+    def stats(self):
+        return {
+            'samples': self.count,
+            'path': self.path,
+            'turning': self.turning,
+            'events': self.events,
+        }
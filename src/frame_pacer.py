@@ -0,0 +1,99 @@
+import collections
+import time
+
+
+class FramePacer:
+    """
+    Paces a frame loop to a target rate by sleeping until the next frame
+    deadline instead of spinning on the clock.
+
+    A frame whose work is still running at its deadline counts as a missed
+    deadline; the schedule then restarts from the current time rather than
+    bursting to catch up. When most of the last 'window' frames miss their
+    deadline the target rate drops towards the achieved rate (not below
+    'min_fps'), and it recovers step by step towards 'fps' once frames fit
+    comfortably in the budget again.
+    """
+
+    def __init__(self, fps=30.0, min_fps=5.0, window=30, miss_ratio=0.8, headroom=0.6):
+        self.max_fps = fps
+        self.min_fps = min_fps
+        self.target_fps = fps
+        self.interval = 1.0 / fps
+        self.window = window
+        self.miss_ratio = miss_ratio
+        self.headroom = headroom
+
+        self.deadline = None
+        self.frame_start = None
+        self.cpu_start = None
+        self.recent_misses = collections.deque(maxlen=window)
+        self.recent_work = collections.deque(maxlen=window)
+
+        self.start_time = None
+        self.frames = 0
+        self.missed = 0
+        self.cpu_time = 0.0
+        self.adaptations = 0
+
+    def wait(self):
+        """Ends the current frame and sleeps until the next one is due"""
+        now = time.perf_counter()
+        cpu_now = time.thread_time()
+
+        if self.deadline is None:
+            self.start_time = now
+            self.deadline = now
+        else:
+            self.frames += 1
+            self.cpu_time += cpu_now - self.cpu_start
+            self.recent_work.append(now - self.frame_start)
+            self.deadline += self.interval
+            missed = now > self.deadline
+            self.recent_misses.append(missed)
+            if missed:
+                self.missed += 1
+                self.deadline = now
+            self._adapt()
+
+        delay = self.deadline - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+        self.frame_start = time.perf_counter()
+        self.cpu_start = time.thread_time()
+
+    def _adapt(self):
+        if len(self.recent_misses) < self.window:
+            return
+        work = sum(self.recent_work) / len(self.recent_work)
+
+        if sum(self.recent_misses) >= self.miss_ratio * self.window and self.target_fps > self.min_fps:
+            # consistently overrunning, run at the rate the pipeline sustains
+            self._set_target(max(self.min_fps, min(self.target_fps * 0.9, 1.0 / work)))
+        elif work < self.headroom * (1.0 / self.max_fps) and self.target_fps < self.max_fps:
+            self._set_target(min(self.max_fps, self.target_fps * 1.1))
+
+    def _set_target(self, fps):
+        self.target_fps = fps
+        self.interval = 1.0 / fps
+        self.adaptations += 1
+        self.recent_misses.clear()
+        self.recent_work.clear()
+
+    def stats(self):
+        elapsed = time.perf_counter() - self.start_time if self.start_time is not None else 0.0
+        return {
+            'frames': self.frames,
+            'achieved_fps': self.frames / elapsed if elapsed > 0 else 0.0,
+            'target_fps': self.target_fps,
+            'missed_deadlines': self.missed,
+            'cpu_ms_per_frame': self.cpu_time / self.frames * 1000 if self.frames else 0.0,
+            'adaptations': self.adaptations,
+        }
+
+    def report(self):
+        s = self.stats()
+        print(f"Frame pacing: {s['frames']} frames at {s['achieved_fps']:.1f} fps "
+              f"(target {s['target_fps']:.1f}), {s['missed_deadlines']} missed deadlines, "
+              f"{s['cpu_ms_per_frame']:.2f} ms CPU per frame")
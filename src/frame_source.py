@@ -0,0 +1,204 @@
+import os
+import threading
+import time
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+class ImageDirCapture:
+    """
+    Minimal cv2.VideoCapture look-alike that reads the images of a directory
+    in sorted order.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.files = sorted(os.path.join(path, f) for f in os.listdir(path)
+                            if f.lower().endswith(IMAGE_EXTENSIONS))
+        self.index = 0
+        self.opened = True
+        self.width = 0
+        self.height = 0
+        if self.files:
+            first = cv2.imread(self.files[0])
+            if first is not None:
+                self.height, self.width = first.shape[:2]
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self, image=None):
+        while self.opened and self.index < len(self.files):
+            image = cv2.imread(self.files[self.index])
+            self.index += 1
+            if image is not None:
+                return True, image
+        return False, None
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return self.width
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self.height
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return len(self.files)
+        return 0
+
+    def release(self):
+        self.opened = False
+
+
+def open_capture(source=0):
+    """
+    Opens a frame source, 'source' is a camera index, a video file or a
+    directory of images. Returns (capture, is_live).
+    """
+    if isinstance(source, int) or (isinstance(source, str) and source.isdigit()):
+        return cv2.VideoCapture(int(source)), True
+    if os.path.isdir(source):
+        return ImageDirCapture(source), False
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"Frame source not found: {source}")
+    return cv2.VideoCapture(source), False
+
+
+class FrameBuffers:
+    """
+    Preallocated buffers for the per-frame image path: the mirrored BGR frame,
+    which is also drawn on for display, and the RGB frame handed to inference.
+    No image is allocated once the buffers exist.
+    """
+
+    def __init__(self):
+        self.bgr = None
+        self.rgb = None
+
+    def mirror(self, frame):
+        """Flips 'frame' horizontally into the BGR buffer"""
+        if self.bgr is None or self.bgr.shape != frame.shape:
+            self.bgr = np.empty_like(frame)
+            self.rgb = np.empty_like(frame)
+        return cv2.flip(frame, 1, dst=self.bgr)
+
+    def to_rgb(self):
+        """Converts the mirrored BGR buffer into the read-only RGB buffer"""
+        self.rgb.flags.writeable = True
+        cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB, dst=self.rgb)
+        # to improve performance, mark the image as not writeable to pass by reference
+        self.rgb.flags.writeable = False
+        return self.rgb
+
+
+class FrameGrabber:
+    """
+    Reads frames from a capture device on a background thread and keeps only
+    the newest one in a single slot. The consumer always gets the latest frame,
+    older unread frames are dropped and counted, so a slow inference stage never
+    works on frames that queued up in the camera driver's buffer.
+
+    For recorded sources ('live' False) no frame is dropped, the capture thread
+    waits for the consumer instead and stops at the end of the stream.
+    """
+
+    def __init__(self, cap, live=True):
+        self.cap = cap
+        self.live = live
+        self.cond = threading.Condition()
+        self.frame = None
+        self.frame_time = 0.0
+        self.read_frame_time = 0.0
+        self.frame_id = 0
+        self.consumed_id = 0
+        self.frames_read = 0
+        self.frames_dropped = 0
+        self.failed_reads = 0
+        self.running = False
+        self.thread = None
+        # three frame buffers reused by cap.read: one being written by the
+        # capture thread, one waiting in the slot, one held by the consumer
+        self.buffers = [None, None, None]
+        self.slot_index = None
+        self.consumer_index = None
+
+    def start(self):
+        """Start the capture thread"""
+        if self.running:
+            return self
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="FrameGrabber", daemon=True)
+        self.thread.start()
+        return self
+
+    def _run(self):
+        while self.running and self.cap.isOpened():
+            with self.cond:
+                index = next(i for i in range(3) if i != self.slot_index and i != self.consumer_index)
+            success, frame = self.cap.read(self.buffers[index])
+            if not success:
+                if not self.live:
+                    break
+                self.failed_reads += 1
+                time.sleep(0.005)
+                continue
+
+            with self.cond:
+                if not self.live:
+                    self.cond.wait_for(lambda: self.frame_id == self.consumed_id or not self.running)
+                    if not self.running:
+                        break
+                # the previous frame was never picked up by the consumer
+                if self.frame_id > self.consumed_id:
+                    self.frames_dropped += 1
+                self.buffers[index] = frame
+                self.slot_index = index
+                self.frame = frame
+                self.frame_time = time.perf_counter()
+                self.frame_id += 1
+                self.frames_read += 1
+                self.cond.notify_all()
+
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+
+    def isOpened(self):
+        """True while frames are or will become available"""
+        with self.cond:
+            return self.running or self.frame_id > self.consumed_id
+
+    def read(self, timeout=1.0):
+        """
+        Wait for a frame newer than the last one returned and hand it over.
+        Returns (success, frame) like cv2.VideoCapture.read. The frame buffer
+        is reused by the capture thread once the next frame is read.
+        """
+        with self.cond:
+            self.cond.wait_for(lambda: self.frame_id > self.consumed_id or not self.running, timeout)
+            if self.frame_id == self.consumed_id:
+                return False, None
+            frame = self.frame
+            self.frame = None
+            self.consumer_index = self.slot_index
+            self.slot_index = None
+            self.read_frame_time = self.frame_time
+            self.consumed_id = self.frame_id
+            self.cond.notify_all()
+            return True, frame
+
+    def stop(self):
+        """Stop the capture thread, the capture device itself is left open"""
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2.0)
+        self.thread = None
+
+    def stats(self):
+        return {
+            'frames_read': self.frames_read,
+            'frames_dropped': self.frames_dropped,
+            'failed_reads': self.failed_reads,
+        }
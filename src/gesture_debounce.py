@@ -0,0 +1,73 @@
+class GestureDebouncer:
+    """
+    Confirms a hand's gesture on elapsed time instead of a frame count.
+
+    A new gesture is committed once it has been observed without
+    interruption for its confirm window, and the committed gesture has been
+    absent for at least its release window. Both windows are in milliseconds
+    and can be set per gesture value with 'confirm_ms' / 'release_ms'
+    ({gesture: ms}), gestures not listed use the defaults.
+
+    Leaving one of the 'fast_release' gestures commits once the new gesture
+    was observed confidently in 'fast_release_frames' consecutive frames,
+    without waiting for either window; a single confident frame never
+    commits, so a one-frame flicker cannot end the gesture.
+    """
+
+    def __init__(self, initial, default_confirm_ms=120.0, default_release_ms=0.0,
+                 confirm_ms=None, release_ms=None, fast_release=(), fast_release_frames=2):
+        self.default_confirm = default_confirm_ms / 1000.0
+        self.default_release = default_release_ms / 1000.0
+        self.confirm = {gesture: ms / 1000.0 for gesture, ms in (confirm_ms or {}).items()}
+        self.release = {gesture: ms / 1000.0 for gesture, ms in (release_ms or {}).items()}
+        self.fast_release = frozenset(fast_release)
+        self.fast_release_frames = max(2, fast_release_frames)
+
+        self.committed = initial
+        self.committed_seen = None  # last time the committed gesture was observed
+        self.candidate = None
+        self.candidate_since = None
+        self.confident_frames = 0   # consecutive confident frames of the candidate
+        self.commits = 0
+        self.fast_commits = 0
+
+    def update(self, gesture, now, confident=False):
+        """Feeds the gesture observed at 'now' (seconds), returns the committed gesture"""
+        if gesture == self.committed:
+            self.committed_seen = now
+            self.candidate = None
+            return self.committed
+
+        if gesture != self.candidate:
+            self.candidate = gesture
+            self.candidate_since = now
+            self.confident_frames = 0
+        self.confident_frames = self.confident_frames + 1 if confident else 0
+
+        if self.confident_frames >= self.fast_release_frames and self.committed in self.fast_release:
+            self.fast_commits += 1
+            return self._commit(gesture, now)
+
+        confirm = self.confirm.get(gesture, self.default_confirm)
+        release = self.release.get(self.committed, self.default_release)
+        absent_since = self.candidate_since if self.committed_seen is None else self.committed_seen
+        if now - self.candidate_since >= confirm and now - absent_since >= release:
+            return self._commit(gesture, now)
+        return self.committed
+
+    def _commit(self, gesture, now):
+        self.committed = gesture
+        self.committed_seen = now
+        self.candidate = None
+        self.commits += 1
+        return gesture
+
+    @property
+    def pending(self):
+        """True while a gesture other than the committed one is being confirmed"""
+        return self.candidate is not None
+
+    def reset(self, gesture):
+        self.committed = gesture
+        self.committed_seen = None
+        self.candidate = None
@@ -0,0 +1,51 @@
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+def landmarks_to_array(hand_landmarks):
+    """(21,3) float32 array of a hand's landmark coordinates"""
+    return np.array([(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark], dtype=np.float32)
+
+
+class HandFrame:
+    """
+    One detected hand of one frame: the (21, 3) float32 landmark
+    coordinates in normalized image units, the handedness label ('Left' /
+    'Right') and score, the time the frame was captured and the persistent
+    ID HandTracker gave the hand (None until tracked).
+
+    Built once per hand right after inference (or replay / prediction) and
+    passed to every consumer, so landmarks are converted a single time.
+    """
+
+    __slots__ = ('coords', 'label', 'score', 'timestamp', 'hand_id', 'held')
+
+    def __init__(self, coords, label='Right', score=1.0, timestamp=None):
+        self.coords = coords
+        self.label = label
+        self.score = score
+        self.timestamp = timestamp
+        self.hand_id = None
+        # True while HandTracker repeats this frame for a hand gone missing
+        self.held = False
+
+    @classmethod
+    def from_landmarks(cls, hand_landmarks, handedness=None, timestamp=None):
+        """HandFrame of a MediaPipe landmark list and its handedness classification"""
+        label, score = 'Right', 1.0
+        if handedness is not None:
+            classification = handedness.classification[0]
+            label, score = classification.label, classification.score
+        return cls(landmarks_to_array(hand_landmarks), label, score, timestamp)
+
+    def __repr__(self):
+        return f"HandFrame({self.label}, score={self.score:.2f}, timestamp={self.timestamp}, hand_id={self.hand_id})"
+
+
+def hand_frames(results, timestamp=None):
+    """HandFrames of all hands in MediaPipe results, an empty list when no hand was found"""
+    if not results.multi_hand_landmarks:
+        return []
+    handedness = results.multi_handedness or []
+    return [HandFrame.from_landmarks(hand_landmarks, handedness[i] if i < len(handedness) else None, timestamp)
+            for i, hand_landmarks in enumerate(results.multi_hand_landmarks)]
@@ -0,0 +1,113 @@
+class HandTrack:
+    """State of one tracked hand"""
+
+    __slots__ = ('hand_id', 'centroid', 'vote', 'last_seen', 'hand')
+
+    def __init__(self, hand_id, centroid, vote, now, hand):
+        self.hand_id = hand_id
+        self.centroid = centroid
+        self.vote = vote        # > 0 right hand, < 0 left hand
+        self.last_seen = now
+        self.hand = hand        # last matched HandFrame
+
+    @property
+    def label(self):
+        return 'Right' if self.vote > 0 else 'Left'
+
+
+class HandTracker:
+    """
+    Gives the hands of consecutive frames persistent IDs.
+
+    Hands are matched to the tracks of the previous frames by nearest palm
+    centroid, closest pairs first, within 'max_dist' (normalized image
+    units). A hand with no track close enough starts a new track. A track
+    that is not matched keeps its last HandFrame for up to 'grace' seconds,
+    so a hand missing from a single frame does not lose its identity; such
+    a frame is returned with 'held' set, and must not be acted on.
+
+    The handedness of a track is a vote over its frames, each frame adding
+    its handedness score (decayed by 'label_decay' per frame), so a label
+    that flips for a frame or two does not swap the hands' roles. Two tracks
+    never report the same label: the one with the weaker vote takes the
+    other one.
+    """
+
+    def __init__(self, max_dist=0.2, grace=0.25, label_decay=0.8):
+        self.max_dist = max_dist
+        self.grace = grace
+        self.label_decay = label_decay
+        self.tracks = []
+        self.next_id = 1
+        self.held_frames = 0
+        self.label_corrections = 0
+
+    def update(self, hands, now):
+        """
+        Matches the HandFrames of the frame at 'now' to the tracks, sets
+        their 'hand_id' and stable 'label', and returns the HandFrames of
+        all live tracks, including held frames of hands in their grace period
+        """
+        centroids = [hand.coords[:, :2].mean(axis=0).tolist() for hand in hands]
+
+        pairs = []
+        for i, (x, y) in enumerate(centroids):
+            for track in self.tracks:
+                tx, ty = track.centroid
+                dist = ((x - tx) ** 2 + (y - ty) ** 2) ** 0.5
+                if dist <= self.max_dist:
+                    pairs.append((dist, i, track))
+        pairs.sort(key=lambda pair: pair[0])
+
+        matched = {}
+        for _, i, track in pairs:
+            if i not in matched and track not in matched.values():
+                matched[i] = track
+
+        live = []
+        for i, hand in enumerate(hands):
+            score = hand.score if hand.label == 'Right' else -hand.score
+            track = matched.get(i)
+            if track is None:
+                track = HandTrack(self.next_id, centroids[i], score, now, hand)
+                self.next_id += 1
+                self.tracks.append(track)
+            else:
+                track.centroid = centroids[i]
+                track.vote = self.label_decay * track.vote + score
+                track.last_seen = now
+                track.hand = hand
+            live.append(track)
+
+        for track in self.tracks:
+            if track not in live and now - track.last_seen <= self.grace:
+                live.append(track)
+                self.held_frames += 1
+        self.tracks = live
+
+        labels = [track.label for track in live]
+        if len(live) == 2 and labels[0] == labels[1]:
+            weaker = 0 if abs(live[0].vote) < abs(live[1].vote) else 1
+            labels[weaker] = 'Left' if labels[weaker] == 'Right' else 'Right'
+            self.label_corrections += 1
+
+        frames = []
+        for track, label in zip(live, labels):
+            track.hand.hand_id = track.hand_id
+            track.hand.label = label
+            track.hand.held = now != track.last_seen
+            frames.append(track.hand)
+        return frames
+
+    def hand_ids(self):
+        return [track.hand_id for track in self.tracks]
+
+    def reset(self):
+        self.tracks = []
+
+    def stats(self):
+        return {
+            'tracks_started': self.next_id - 1,
+            'held_frames': self.held_frames,
+            'label_corrections': self.label_corrections,
+        }
@@ -0,0 +1,104 @@
+import numpy as np
+
+from hand_frame import HandFrame
+
+
+class InferenceScheduler:
+    """
+    Decides on which frames hand landmark inference runs, and predicts the
+    landmarks on the frames in between with a constant velocity model.
+
+    The number of frames between two inferences adapts to the hand motion:
+    up to 'max_skip' frames when the hand is still, every frame when it moves
+    fast, while the gesture is changing or when the handedness confidence is
+    low. Predictions never run further than 'max_predict_time' seconds past
+    the last inference, and inference always runs while no hand is tracked.
+    """
+
+    def __init__(self, max_skip=3, still_speed=0.05, fast_speed=0.6,
+                 min_score=0.8, max_predict_time=0.2, smoothing=0.5):
+        self.max_skip = max_skip
+        self.still_speed = still_speed    # normalized units per second
+        self.fast_speed = fast_speed
+        self.min_score = min_score
+        self.max_predict_time = max_predict_time
+        self.smoothing = smoothing
+
+        self.landmarks = None   # (n_hands, 21, 3) of the last inference
+        self.velocity = None    # (n_hands, 21, 3) per second
+        self.labels = None
+        self.scores = None
+        self.last_time = 0.0
+        self.skip = 1
+        self.frames_since_infer = 0
+        self.gesture_changing = False
+
+        self.inferred_frames = 0
+        self.predicted_frames = 0
+
+    def should_infer(self, now):
+        """True if the frame captured at 'now' has to go through inference"""
+        if (self.landmarks is None or self.gesture_changing
+                or self.frames_since_infer + 1 >= self.skip
+                or now - self.last_time > self.max_predict_time):
+            return True
+        return False
+
+    def update(self, hands, now):
+        """Stores the HandFrames of an inference run at 'now'"""
+        self.inferred_frames += 1
+        self.frames_since_infer = 0
+
+        if not hands:
+            self.landmarks = None
+            self.velocity = None
+            self.skip = 1
+            return
+
+        landmarks = np.stack([hand.coords for hand in hands])
+        labels = [hand.label for hand in hands]
+        scores = [hand.score for hand in hands]
+
+        dt = now - self.last_time
+        if self.landmarks is not None and labels == self.labels and landmarks.shape == self.landmarks.shape and dt > 0:
+            velocity = (landmarks - self.landmarks) / dt
+            if self.velocity is not None:
+                velocity = self.smoothing * velocity + (1 - self.smoothing) * self.velocity
+        else:
+            velocity = np.zeros_like(landmarks)
+
+        self.landmarks = landmarks
+        self.velocity = velocity
+        self.labels = labels
+        self.scores = scores
+        self.last_time = now
+
+        # mean 2D speed of the landmarks of the fastest hand
+        speed = float(np.linalg.norm(velocity[:, :, :2], axis=2).mean(axis=1).max())
+        if scores and min(scores) < self.min_score:
+            self.skip = 1
+        elif speed >= self.fast_speed:
+            self.skip = 1
+        elif speed <= self.still_speed:
+            self.skip = self.max_skip
+        else:
+            frac = (self.fast_speed - speed) / (self.fast_speed - self.still_speed)
+            self.skip = 1 + int(round(frac * (self.max_skip - 1)))
+
+    def predict(self, now):
+        """HandFrames extrapolated from the last inference to 'now'"""
+        self.predicted_frames += 1
+        self.frames_since_infer += 1
+        predicted = self.landmarks + self.velocity * (now - self.last_time)
+        return [HandFrame(coords, label, score, now)
+                for coords, label, score in zip(predicted, self.labels, self.scores)]
+
+    def set_gesture_changing(self, changing):
+        """While a gesture transition is being confirmed inference runs every frame"""
+        self.gesture_changing = changing
+
+    def stats(self):
+        return {
+            'inferred_frames': self.inferred_frames,
+            'predicted_frames': self.predicted_frames,
+        }
@@ -0,0 +1,630 @@
+import contextlib
+import functools
+import os
+import sys
+import threading
+import time
+
+# Input backends: every mouse and keyboard action of the controller, the
+# custom gestures and the voice assistant goes through the process wide
+# backend returned by get_backend(). Actions are built from four
+# primitives (pointer move, button, wheel, key); backends that can batch
+# send all events of one action (a hotkey, a click, a scroll with
+# modifiers) in one flush, or all events inside a 'with backend.batch()'.
+#
+# Keys use pyautogui's names ('ctrl', 'alt', 'pageup', 'volumeup', ...).
+# scroll() takes wheel notches on every backend, positive is up, and right
+# when horizontal; the _wheel primitive takes the backend's native units,
+# 'wheel_resolution' of them per notch (120 where the platform takes high
+# resolution wheel deltas, 1 where it only takes whole clicks).
+#
+# A backend is shared by the vision, cursor and scroll threads: every
+# action and every batch holds the backend's lock, so the events of one
+# action are never interleaved with another thread's and the batch depth
+# and flush are consistent.
+
+MOUSE_BUTTONS = ('left', 'middle', 'right')
+
+
+def locked(method):
+    """Runs the action with the backend's lock held"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class InputBackend:
+    """Composite actions on the primitives of a subclass, flushed once per action"""
+
+    name = 'base'
+    # native wheel units per notch, 1 when only whole clicks can be sent
+    wheel_resolution = 1
+
+    def __init__(self):
+        # reentrant: actions nest inside batches and other actions
+        self.lock = threading.RLock()
+        self.depth = 0
+        self.events = 0
+        self.flushes = 0
+        # fraction of a native wheel unit not sent yet, vertical and horizontal
+        self.wheel_remainder = [0.0, 0.0]
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Sends everything inside the block in one flush"""
+        with self.lock:
+            self.depth += 1
+            try:
+                yield self
+            finally:
+                self.depth -= 1
+                self._done()
+
+    def _done(self):
+        if not self.depth:
+            self.flushes += 1
+            self._flush()
+
+    # primitives, implemented by the backends
+    def _move(self, x, y):
+        raise NotImplementedError
+
+    def _button(self, button, down):
+        raise NotImplementedError
+
+    def _wheel(self, amount, horizontal):
+        raise NotImplementedError
+
+    def _key(self, key, down):
+        raise NotImplementedError
+
+    def _flush(self):
+        pass
+
+    def _check_key(self, key):
+        """Raises ValueError for a key the backend cannot send"""
+
+    def size(self):
+        raise NotImplementedError
+
+    def position(self):
+        raise NotImplementedError
+
+    # actions
+    @locked
+    def move_to(self, x, y):
+        self.events += 1
+        self._move(round(x), round(y))
+        self._done()
+
+    @locked
+    def move_rel(self, dx, dy):
+        x, y = self.position()
+        self.move_to(x + dx, y + dy)
+
+    @locked
+    def mouse_down(self, button='left'):
+        self.events += 1
+        self._button(button, True)
+        self._done()
+
+    @locked
+    def mouse_up(self, button='left'):
+        self.events += 1
+        self._button(button, False)
+        self._done()
+
+    @locked
+    def click(self, button='left', clicks=1):
+        for _ in range(clicks):
+            self._button(button, True)
+            self._button(button, False)
+        self.events += 2 * clicks
+        self._done()
+
+    def double_click(self, button='left'):
+        self.click(button, 2)
+
+    @locked
+    def scroll(self, notches, horizontal=False):
+        """
+        Scrolls by 'notches' wheel notches, positive up / right, fractions
+        included: the amount is rounded to the backend's wheel resolution
+        and the rest carries over to the next call. Returns the amount sent
+        in native wheel units, 0 when it all carried over.
+        """
+        axis = 1 if horizontal else 0
+        total = self.wheel_remainder[axis] + notches * self.wheel_resolution
+        amount = int(total + (0.5 if total > 0 else -0.5))
+        self.wheel_remainder[axis] = total - amount
+        if amount:
+            self.events += 1
+            self._wheel(amount, horizontal)
+            self._done()
+        return amount
+
+    @locked
+    def key_down(self, key):
+        self.events += 1
+        self._key(key, True)
+        self._done()
+
+    @locked
+    def key_up(self, key):
+        self.events += 1
+        self._key(key, False)
+        self._done()
+
+    @locked
+    def press(self, key, presses=1):
+        self._check_key(key)
+        for _ in range(presses):
+            self._key(key, True)
+            self._key(key, False)
+        self.events += 2 * presses
+        self._done()
+
+    @locked
+    def hotkey(self, *keys):
+        # resolve every key before pressing any, and release what was
+        # pressed even when a key fails, so no modifier stays held
+        for key in keys:
+            self._check_key(key)
+        pressed = []
+        try:
+            for key in keys:
+                self._key(key, True)
+                pressed.append(key)
+        finally:
+            for key in reversed(pressed):
+                self._key(key, False)
+            self.events += 2 * len(pressed)
+            self._done()
+
+    @locked
+    def write(self, text):
+        for char in text:
+            shift = char.isupper()
+            if shift:
+                self._key('shift', True)
+            self._key(char.lower(), True)
+            self._key(char.lower(), False)
+            if shift:
+                self._key('shift', False)
+            self.events += 4 if shift else 2
+        self._done()
+
+    def stats(self):
+        return {'backend': self.name, 'events': self.events, 'flushes': self.flushes}
+
+
+class PyAutoGUIBackend(InputBackend):
+    """
+    pyautogui, one call per action. With 'pause' False the calls skip
+    pyautogui.PAUSE, the sleep pyautogui adds after every call.
+    """
+
+    name = 'pyautogui'
+    # pyautogui passes wheel deltas through on Windows, clicks / lines elsewhere
+    wheel_resolution = 120 if sys.platform == 'win32' else 1
+
+    def __init__(self, pause=False):
+        super().__init__()
+        import pyautogui
+        # the gestures move the cursor into the screen corners on purpose
+        pyautogui.FAILSAFE = False
+        self.gui = pyautogui
+        self.options = {} if pause else {'_pause': False}
+
+    def _done(self):
+        # every pyautogui call is sent as it is made, nothing to flush
+        pass
+
+    def size(self):
+        return tuple(self.gui.size())
+
+    def position(self):
+        return tuple(self.gui.position())
+
+    @locked
+    def move_to(self, x, y):
+        self.events += 1
+        self.gui.moveTo(round(x), round(y), **self.options)
+
+    @locked
+    def move_rel(self, dx, dy):
+        self.events += 1
+        self.gui.moveRel(round(dx), round(dy), **self.options)
+
+    @locked
+    def mouse_down(self, button='left'):
+        self.events += 1
+        self.gui.mouseDown(button=button, **self.options)
+
+    @locked
+    def mouse_up(self, button='left'):
+        self.events += 1
+        self.gui.mouseUp(button=button, **self.options)
+
+    @locked
+    def click(self, button='left', clicks=1):
+        self.events += 2 * clicks
+        if clicks == 2:
+            self.gui.doubleClick(button=button, **self.options)
+        else:
+            self.gui.click(button=button, clicks=clicks, **self.options)
+
+    def _wheel(self, amount, horizontal):
+        if not horizontal:
+            self.gui.scroll(amount, **self.options)
+        elif sys.platform == 'win32':
+            # pyautogui has no horizontal scroll on Windows, send the
+            # horizontal wheel event (MOUSEEVENTF_HWHEEL) directly
+            import ctypes
+            ctypes.windll.user32.mouse_event(0x1000, 0, 0, int(amount), 0)
+        else:
+            self.gui.hscroll(amount, **self.options)
+
+    @locked
+    def key_down(self, key):
+        self.events += 1
+        self.gui.keyDown(key, **self.options)
+
+    @locked
+    def key_up(self, key):
+        self.events += 1
+        self.gui.keyUp(key, **self.options)
+
+    @locked
+    def press(self, key, presses=1):
+        self.events += 2 * presses
+        self.gui.press(key, presses=presses, **self.options)
+
+    @locked
+    def hotkey(self, *keys):
+        self.events += 2 * len(keys)
+        self.gui.hotkey(*keys, **self.options)
+
+    @locked
+    def write(self, text):
+        self.events += 2 * len(text)
+        self.gui.write(text, **self.options)
+
+
+# X keysym names of pyautogui key names, other names are passed to
+# XStringToKeysym as they are ('a', 'F5', 'Return', ...)
+X_KEYSYMS = {
+    'ctrl': 'Control_L', 'ctrlleft': 'Control_L', 'ctrlright': 'Control_R',
+    'shift': 'Shift_L', 'shiftleft': 'Shift_L', 'shiftright': 'Shift_R',
+    'alt': 'Alt_L', 'altleft': 'Alt_L', 'altright': 'Alt_R',
+    'win': 'Super_L', 'winleft': 'Super_L', 'winright': 'Super_R', 'command': 'Super_L',
+    'enter': 'Return', 'return': 'Return', 'esc': 'Escape', 'escape': 'Escape',
+    'tab': 'Tab', 'space': 'space', ' ': 'space', 'backspace': 'BackSpace',
+    'delete': 'Delete', 'del': 'Delete', 'insert': 'Insert',
+    'home': 'Home', 'end': 'End', 'pageup': 'Prior', 'pagedown': 'Next',
+    'up': 'Up', 'down': 'Down', 'left': 'Left', 'right': 'Right',
+    'volumeup': 'XF86AudioRaiseVolume', 'volumedown': 'XF86AudioLowerVolume',
+    'volumemute': 'XF86AudioMute', 'playpause': 'XF86AudioPlay',
+    'nexttrack': 'XF86AudioNext', 'media_next': 'XF86AudioNext',
+    'prevtrack': 'XF86AudioPrev', 'media_previous': 'XF86AudioPrev',
+    'printscreen': 'Print', 'prntscrn': 'Print', 'pgup': 'Prior', 'pgdn': 'Next',
+    'capslock': 'Caps_Lock', 'numlock': 'Num_Lock', 'scrolllock': 'Scroll_Lock',
+    'pause': 'Pause', 'apps': 'Menu', '\n': 'Return', '\t': 'Tab',
+}
+X_KEYSYMS.update((f'f{n}', f'F{n}') for n in range(1, 25))
+
+# X pointer buttons: 4 / 5 wheel up / down, 6 / 7 wheel left / right
+X_BUTTONS = {'left': 1, 'middle': 2, 'right': 3}
+
+
+class XTestBackend(InputBackend):
+    """
+    X11 XTest fake input through python-xlib (installed with pyautogui on
+    Linux). Requests are queued in the Xlib output buffer and written once
+    per action, without sleeps or round trips.
+    """
+
+    name = 'xtest'
+
+    def __init__(self, display=None):
+        super().__init__()
+        # one Display is shared by the vision, cursor and scroll threads
+        import Xlib.threaded
+        from Xlib import X, XK
+        from Xlib.display import Display
+        from Xlib.ext import xtest
+        self.X = X
+        self.XK = XK
+        self.fake_input = xtest.fake_input
+        self.display = Display(display)
+        self.root = self.display.screen().root
+        self.keycodes = {}
+
+    def size(self):
+        screen = self.display.screen()
+        return screen.width_in_pixels, screen.height_in_pixels
+
+    def position(self):
+        pointer = self.root.query_pointer()
+        return pointer.root_x, pointer.root_y
+
+    def keycode(self, key):
+        keycode = self.keycodes.get(key)
+        if keycode is None:
+            keysym = self.XK.string_to_keysym(X_KEYSYMS.get(key, key))
+            if not keysym and len(key) == 1:
+                keysym = ord(key)
+            keycode = self.display.keysym_to_keycode(keysym)
+            if not keycode:
+                raise ValueError(f"no key for {key!r}")
+            self.keycodes[key] = keycode
+        return keycode
+
+    def _move(self, x, y):
+        self.fake_input(self.display, self.X.MotionNotify, x=x, y=y)
+
+    def _button(self, button, down):
+        self.fake_input(self.display, self.X.ButtonPress if down else self.X.ButtonRelease, X_BUTTONS[button])
+
+    def _wheel(self, amount, horizontal):
+        if horizontal:
+            button = 7 if amount > 0 else 6
+        else:
+            button = 4 if amount > 0 else 5
+        for _ in range(abs(int(amount))):
+            self.fake_input(self.display, self.X.ButtonPress, button)
+            self.fake_input(self.display, self.X.ButtonRelease, button)
+
+    def _check_key(self, key):
+        self.keycode(key)
+
+    def _key(self, key, down):
+        self.fake_input(self.display, self.X.KeyPress if down else self.X.KeyRelease, self.keycode(key))
+
+    def _flush(self):
+        self.display.flush()
+
+    @locked
+    def write(self, text):
+        # shift when the character is the shifted symbol of its key
+        for char in text:
+            keysym = self.XK.string_to_keysym(X_KEYSYMS.get(char, char)) or ord(char)
+            keycode = self.display.keysym_to_keycode(keysym)
+            if not keycode:
+                continue
+            shift = self.display.keycode_to_keysym(keycode, 0) != keysym
+            if shift:
+                self._key('shift', True)
+            self.fake_input(self.display, self.X.KeyPress, keycode)
+            self.fake_input(self.display, self.X.KeyRelease, keycode)
+            if shift:
+                self._key('shift', False)
+            self.events += 4 if shift else 2
+        self._done()
+
+
+# evdev key names of pyautogui key names, single letters, digits and
+# f1 - f24 map to KEY_<upper case>
+UINPUT_KEYS = {
+    'ctrl': 'KEY_LEFTCTRL', 'ctrlleft': 'KEY_LEFTCTRL', 'ctrlright': 'KEY_RIGHTCTRL',
+    'shift': 'KEY_LEFTSHIFT', 'shiftleft': 'KEY_LEFTSHIFT', 'shiftright': 'KEY_RIGHTSHIFT',
+    'alt': 'KEY_LEFTALT', 'altleft': 'KEY_LEFTALT', 'altright': 'KEY_RIGHTALT',
+    'win': 'KEY_LEFTMETA', 'winleft': 'KEY_LEFTMETA', 'winright': 'KEY_RIGHTMETA', 'command': 'KEY_LEFTMETA',
+    'enter': 'KEY_ENTER', 'return': 'KEY_ENTER', '\n': 'KEY_ENTER', 'esc': 'KEY_ESC', 'escape': 'KEY_ESC',
+    'tab': 'KEY_TAB', '\t': 'KEY_TAB', 'space': 'KEY_SPACE', ' ': 'KEY_SPACE', 'backspace': 'KEY_BACKSPACE',
+    'delete': 'KEY_DELETE', 'del': 'KEY_DELETE', 'insert': 'KEY_INSERT',
+    'home': 'KEY_HOME', 'end': 'KEY_END', 'pageup': 'KEY_PAGEUP', 'pagedown': 'KEY_PAGEDOWN',
+    'up': 'KEY_UP', 'down': 'KEY_DOWN', 'left': 'KEY_LEFT', 'right': 'KEY_RIGHT',
+    'volumeup': 'KEY_VOLUMEUP', 'volumedown': 'KEY_VOLUMEDOWN', 'volumemute': 'KEY_MUTE',
+    'playpause': 'KEY_PLAYPAUSE', 'nexttrack': 'KEY_NEXTSONG', 'media_next': 'KEY_NEXTSONG',
+    'prevtrack': 'KEY_PREVIOUSSONG', 'media_previous': 'KEY_PREVIOUSSONG', 'printscreen': 'KEY_SYSRQ',
+    'prntscrn': 'KEY_SYSRQ', 'pgup': 'KEY_PAGEUP', 'pgdn': 'KEY_PAGEDOWN', 'capslock': 'KEY_CAPSLOCK',
+    'numlock': 'KEY_NUMLOCK', 'scrolllock': 'KEY_SCROLLLOCK', 'pause': 'KEY_PAUSE', 'apps': 'KEY_COMPOSE',
+    '-': 'KEY_MINUS', '=': 'KEY_EQUAL', '[': 'KEY_LEFTBRACE', ']': 'KEY_RIGHTBRACE', ';': 'KEY_SEMICOLON',
+    "'": 'KEY_APOSTROPHE', '`': 'KEY_GRAVE', '\\': 'KEY_BACKSLASH', ',': 'KEY_COMMA', '.': 'KEY_DOT',
+    '/': 'KEY_SLASH',
+}
+# characters typed with shift on a US layout, and their unshifted key
+UINPUT_SHIFTED = dict(zip('!@#$%^&*()_+{}:"~|<>?', '1234567890-=[];\'`\\,./'))
+
+
+class UinputBackend(InputBackend):
+    """
+    Linux uinput virtual device through python-evdev, works under X11 and
+    Wayland alike. The pointer is an absolute device spanning 'size'
+    (default: the pyautogui screen size); the wheel is high resolution,
+    120 units per notch. Events are written to the kernel
+    and committed with one SYN_REPORT per action. Needs write access to
+    /dev/uinput. Typing assumes a US keyboard layout.
+    """
+
+    name = 'uinput'
+    wheel_resolution = 120
+
+    def __init__(self, size=None):
+        super().__init__()
+        from evdev import AbsInfo, UInput, ecodes
+        self.ecodes = ecodes
+        if size is None:
+            import pyautogui
+            size = tuple(pyautogui.size())
+        self.screen = size
+        self.cursor = (size[0] // 2, size[1] // 2)
+        keys = [code for name, code in ecodes.ecodes.items() if name.startswith('KEY_') and code < 0x2ff]
+        capabilities = {
+            ecodes.EV_KEY: sorted(set(keys)) + [ecodes.BTN_LEFT, ecodes.BTN_MIDDLE, ecodes.BTN_RIGHT],
+            ecodes.EV_REL: [ecodes.REL_WHEEL, ecodes.REL_HWHEEL, ecodes.REL_WHEEL_HI_RES, ecodes.REL_HWHEEL_HI_RES],
+            ecodes.EV_ABS: [(ecodes.ABS_X, AbsInfo(0, 0, size[0] - 1, 0, 0, 0)),
+                            (ecodes.ABS_Y, AbsInfo(0, 0, size[1] - 1, 0, 0, 0))],
+        }
+        self.device = UInput(capabilities, name='gesture-controller')
+        # high resolution wheel units not sent as a whole notch yet
+        self.hi_res = [0, 0]
+        self.buttons = {'left': ecodes.BTN_LEFT, 'middle': ecodes.BTN_MIDDLE, 'right': ecodes.BTN_RIGHT}
+
+    def size(self):
+        return self.screen
+
+    def position(self):
+        # uinput cannot read the cursor back, this is the last commanded position
+        return self.cursor
+
+    def code(self, key):
+        name = UINPUT_KEYS.get(key, 'KEY_' + key.upper())
+        code = self.ecodes.ecodes.get(name)
+        if code is None:
+            raise ValueError(f"no key for {key!r}")
+        return code
+
+    def _move(self, x, y):
+        self.cursor = (x, y)
+        self.device.write(self.ecodes.EV_ABS, self.ecodes.ABS_X, x)
+        self.device.write(self.ecodes.EV_ABS, self.ecodes.ABS_Y, y)
+
+    def _button(self, button, down):
+        self.device.write(self.ecodes.EV_KEY, self.buttons[button], 1 if down else 0)
+        # a button change is committed on its own, or a click collapses
+        self.device.syn()
+
+    def _wheel(self, amount, horizontal):
+        # high resolution wheel, plus whole notches for clients that only read those
+        ecodes = self.ecodes
+        axis = 1 if horizontal else 0
+        self.device.write(ecodes.EV_REL, ecodes.REL_HWHEEL_HI_RES if horizontal else ecodes.REL_WHEEL_HI_RES,
+                          int(amount))
+        self.hi_res[axis] += int(amount)
+        notches = int(self.hi_res[axis] / 120)
+        if notches:
+            self.hi_res[axis] -= notches * 120
+            self.device.write(ecodes.EV_REL, ecodes.REL_HWHEEL if horizontal else ecodes.REL_WHEEL, notches)
+
+    def _check_key(self, key):
+        self.code(key)
+
+    def _key(self, key, down):
+        self.device.write(self.ecodes.EV_KEY, self.code(key), 1 if down else 0)
+        self.device.syn()
+
+    def _flush(self):
+        self.device.syn()
+
+    @locked
+    def write(self, text):
+        for char in text:
+            base = UINPUT_SHIFTED.get(char)
+            shift = base is not None or char.isupper()
+            key = base if base is not None else char.lower()
+            if shift:
+                self._key('shift', True)
+            self._key(key, True)
+            self._key(key, False)
+            if shift:
+                self._key('shift', False)
+            self.events += 4 if shift else 2
+        self._done()
+
+    def close(self):
+        self.device.close()
+
+
+class RecordingBackend(InputBackend):
+    """
+    Injects nothing: records every primitive as (time, name, args) in
+    'log' (unless 'record' is False) on a virtual screen of 'size', for
+    headless runs and benchmarks
+    """
+
+    name = 'recording'
+    wheel_resolution = 120
+
+    def __init__(self, size=(1920, 1080), record=True):
+        super().__init__()
+        self.screen = size
+        self.cursor = (size[0] // 2, size[1] // 2)
+        self.record = record
+        self.log = []
+
+    def size(self):
+        return self.screen
+
+    def position(self):
+        return self.cursor
+
+    def _emit(self, name, *args):
+        if self.record:
+            self.log.append((time.perf_counter(), name, args))
+
+    def _move(self, x, y):
+        self.cursor = (x, y)
+        self._emit('move', x, y)
+
+    def _button(self, button, down):
+        self._emit('button', button, down)
+
+    def _wheel(self, amount, horizontal):
+        self._emit('wheel', amount, horizontal)
+
+    def _key(self, key, down):
+        self._emit('key', key, down)
+
+    def _flush(self):
+        self._emit('flush')
+
+
+class NullBackend(RecordingBackend):
+    """Injects and records nothing"""
+
+    name = 'null'
+
+    def __init__(self, size=(1920, 1080)):
+        super().__init__(size, record=False)
+
+
+INPUT_BACKENDS = {
+    'pyautogui': PyAutoGUIBackend,
+    'xtest': XTestBackend,
+    'uinput': UinputBackend,
+    'recording': RecordingBackend,
+    'null': NullBackend,
+}
+
+
+def make_backend(name='auto', headless=False):
+    """
+    Input backend by name, 'auto' picks XTest on an X11 session where
+    python-xlib is available and pyautogui otherwise. A 'headless' run
+    without a display to inject into gets the NullBackend from 'auto'.
+    """
+    if name == 'auto':
+        if sys.platform.startswith('linux'):
+            if os.environ.get('DISPLAY'):
+                try:
+                    return XTestBackend()
+                except Exception as e:
+                    print(f"XTest input unavailable ({e}), using pyautogui")
+            elif headless:
+                return NullBackend()
+        return PyAutoGUIBackend()
+    if name not in INPUT_BACKENDS:
+        raise ValueError(f"unknown input backend {name!r}")
+    return INPUT_BACKENDS[name]()
+
+
+_backend = None
+
+
+def get_backend():
+    """The process wide input backend, created on first use"""
+    global _backend
+    if _backend is None:
+        _backend = make_backend()
+    return _backend
+
+
+def set_backend(backend):
+    """Replaces the process wide input backend (an InputBackend or a name), returns it"""
+    global _backend
+    _backend = make_backend(backend) if isinstance(backend, str) else backend
+    return _backend
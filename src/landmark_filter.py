@@ -0,0 +1,80 @@
+import math
+import numpy as np
+
+
+class OneEuroFilter:
+    """
+    One-Euro filter (Casiez et al.) over all elements of an array at once.
+
+    Each element is low-pass filtered with a cutoff frequency that rises
+    with its own filtered speed: still landmarks are smoothed strongly
+    ('min_cutoff' Hz), fast ones follow with little lag ('beta' raises the
+    cutoff per unit of speed per second).
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=10.0, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.value = None
+        self.speed = None
+        self.last_time = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        # smoothing factor of a first order low-pass at 'cutoff' Hz
+        return 1.0 / (1.0 + 1.0 / (2 * math.pi * cutoff * dt))
+
+    def __call__(self, value, now):
+        if self.value is None:
+            self.value = np.array(value, dtype=np.float32)
+            self.speed = np.zeros_like(self.value)
+            self.last_time = now
+            return self.value
+
+        dt = now - self.last_time
+        if dt <= 0:
+            return self.value
+        self.last_time = now
+
+        speed = (value - self.value) / dt
+        a_d = self._alpha(self.d_cutoff, dt)
+        self.speed = self.speed + a_d * (speed - self.speed)
+
+        cutoff = self.min_cutoff + self.beta * np.abs(self.speed)
+        self.value = self.value + self._alpha(cutoff, dt) * (value - self.value)
+        return self.value
+
+    def reset(self):
+        self.value = None
+
+
+class LandmarkFilter:
+    """
+    Smooths the landmark coordinates of tracked hands, one vectorized
+    One-Euro filter over the (21, 3) array of each hand ID.
+
+    'apply' replaces the coordinates of the HandFrames in place, so the
+    finger state, gesture and custom gesture matching all see the smoothed
+    landmarks. Hands without an ID are passed through unfiltered.
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=10.0, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.filters = {}
+
+    def apply(self, hands):
+        filters = {}
+        for hand in hands:
+            if hand.hand_id is None or hand.timestamp is None:
+                continue
+            f = self.filters.get(hand.hand_id)
+            if f is None:
+                f = OneEuroFilter(self.min_cutoff, self.beta, self.d_cutoff)
+            hand.coords = f(hand.coords, hand.timestamp)
+            filters[hand.hand_id] = f
+        # hands that left the view start from scratch when they come back
+        self.filters = filters
+        return hands
@@ -0,0 +1,126 @@
+import cv2
+import numpy as np
+
+from hand_frame import hand_frames
+
+
+class LandmarkROI:
+    """
+    Runs hand landmark inference on a crop around the hands found in the
+    previous frame instead of on the whole frame.
+
+    The crop is a square padded around the bounding box of all tracked
+    landmarks, resized to 'out_size' so the model always sees the same input
+    size. The HandFrames of the crop are mapped back to full-frame normalized
+    coordinates, so everything downstream works unchanged. Inference falls
+    back to the full frame when tracking is lost, and every
+    'full_frame_interval' frames so a hand entering the view outside the crop
+    is still picked up.
+
+    Full frames go to 'detector', a separate Hands instance in static image
+    mode (created on first use when None): the tracking instance passed to
+    'process' only ever sees the crops, so the region it tracks from one
+    frame to the next always refers to the same input size.
+    """
+
+    def __init__(self, padding=0.35, out_size=256, min_size=96, full_frame_interval=30,
+                 detector=None, max_hands=2):
+        self.padding = padding
+        self.out_size = out_size
+        self.min_size = min_size
+        self.full_frame_interval = full_frame_interval
+        self.detector = detector
+        self.own_detector = detector is None
+        self.max_hands = max_hands
+        self.region = None  # (x0, y0, side) in pixels
+        self.crop_buffer = np.empty((out_size, out_size, 3), dtype=np.uint8)
+        self.frames_since_full = 0
+        self.crop_frames = 0
+        self.full_frames = 0
+        self.crop_misses = 0
+
+    def full_frame_detector(self):
+        if self.detector is None:
+            import mediapipe as mp
+            self.detector = mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=self.max_hands,
+                                                     min_detection_confidence=0.5)
+        return self.detector
+
+    def close(self):
+        """Releases the full-frame detector if it was created here"""
+        if self.own_detector and self.detector is not None:
+            self.detector.close()
+            self.detector = None
+
+    def process(self, hands, image, timestamp=None):
+        """
+        Runs 'hands.process' on the ROI of 'image' (RGB), or the full-frame
+        detector on all of it, returns full-frame HandFrames
+        """
+        height, width = image.shape[:2]
+        frames = None
+
+        if self.region is not None and self.frames_since_full < self.full_frame_interval:
+            x0, y0, side = self.region
+            crop = image[y0:y0 + side, x0:x0 + side]
+            if side != self.out_size:
+                crop = cv2.resize(crop, (self.out_size, self.out_size), dst=self.crop_buffer,
+                                  interpolation=cv2.INTER_AREA)
+            else:
+                crop = np.ascontiguousarray(crop)
+            frames = hand_frames(hands.process(crop), timestamp)
+            if frames:
+                self.remap(frames, self.region, width, height)
+                self.crop_frames += 1
+                self.frames_since_full += 1
+            else:
+                # tracking lost inside the crop, retry on the full frame
+                self.crop_misses += 1
+                frames = None
+
+        if frames is None:
+            frames = hand_frames(self.full_frame_detector().process(image), timestamp)
+            self.full_frames += 1
+            self.frames_since_full = 0
+
+        self.region = self.region_from(frames, width, height)
+        return frames
+
+    def remap(self, frames, region, width, height):
+        """Maps crop-normalized HandFrame coordinates to full-frame normalized coordinates"""
+        x0, y0, side = region
+        sx = side / width
+        sy = side / height
+        # z uses roughly the same scale as x
+        scale = np.array([sx, sy, sx], dtype=np.float32)
+        offset = np.array([x0 / width, y0 / height, 0.0], dtype=np.float32)
+        for frame in frames:
+            frame.coords = frame.coords * scale + offset
+
+    def region_from(self, frames, width, height):
+        """Padded square crop around all detected hands, None when no hand is tracked"""
+        if not frames:
+            return None
+
+        points = np.concatenate([frame.coords[:, :2] for frame in frames])
+        x_min, y_min = points.min(axis=0).tolist()
+        x_max, y_max = points.max(axis=0).tolist()
+        x_min, x_max = x_min * width, x_max * width
+        y_min, y_max = y_min * height, y_max * height
+
+        side = max(x_max - x_min, y_max - y_min) * (1 + 2 * self.padding)
+        side = int(min(max(side, self.min_size), width, height))
+        cx = (x_min + x_max) / 2
+        cy = (y_min + y_max) / 2
+
+        # shift the square inside the frame instead of clipping it
+        x0 = int(min(max(cx - side / 2, 0), width - side))
+        y0 = int(min(max(cy - side / 2, 0), height - side))
+        return (x0, y0, side)
+
+    def stats(self):
+        return {
+            'crop_frames': self.crop_frames,
+            'full_frames': self.full_frames,
+            'crop_misses': self.crop_misses,
+        }
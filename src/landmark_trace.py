@@ -0,0 +1,136 @@
+import struct
+import time
+import numpy as np
+
+from hand_frame import HandFrame
+
+# Trace file layout:
+#   header  : magic, version, max hands, landmark scale, wall clock start time
+#   records : fixed size RECORD_DTYPE entries, one per processed camera frame
+# Records are fixed size so a trace can be opened with np.memmap and indexed
+# directly without parsing.
+TRACE_MAGIC = b'GVTR'
+TRACE_VERSION = 1
+HEADER_FORMAT = '<4sHBxfd'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+MAX_HANDS = 2
+NUM_LANDMARKS = 21
+# landmarks are stored as int16, this gives a range of +-4.0 in normalized
+# image coordinates with a resolution of ~1.2e-4 (~0.08 px on a 640 px frame)
+LANDMARK_SCALE = 8192.0
+
+# handedness labels as stored in the trace
+LABEL_LEFT = 0
+LABEL_RIGHT = 1
+LABELS = ('Left', 'Right')
+
+RECORD_DTYPE = np.dtype([
+    ('t_us', '<u8'),                                    # time since trace start
+    ('n_hands', 'u1'),
+    ('label', 'u1', (MAX_HANDS,)),
+    ('score', 'u1', (MAX_HANDS,)),                      # handedness score * 255
+    ('landmarks', '<i2', (MAX_HANDS, NUM_LANDMARKS, 3)),
+])
+
+
+class TraceWriter:
+    """
+    Records the HandFrames of every frame into a compact binary trace.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.start_time = time.perf_counter()
+        self.frames = 0
+        self.record = np.zeros(1, dtype=RECORD_DTYPE)
+        self.file = open(path, 'wb')
+        self.file.write(struct.pack(HEADER_FORMAT, TRACE_MAGIC, TRACE_VERSION, MAX_HANDS,
+                                    LANDMARK_SCALE, time.time()))
+
+    def write(self, hands, timestamp=None):
+        """Append the HandFrames of one frame, 'timestamp' is a time.perf_counter() value"""
+        if timestamp is None:
+            timestamp = time.perf_counter()
+
+        rec = self.record[0]
+        rec['t_us'] = max(0, int((timestamp - self.start_time) * 1e6))
+        rec['label'] = 0
+        rec['score'] = 0
+        rec['landmarks'] = 0
+
+        n = min(len(hands), MAX_HANDS)
+        for i in range(n):
+            hand = hands[i]
+            coords = np.round(hand.coords * LANDMARK_SCALE)
+            rec['landmarks'][i] = np.clip(coords, -32768, 32767)
+            rec['label'][i] = LABEL_RIGHT if hand.label == 'Right' else LABEL_LEFT
+            rec['score'][i] = int(round(min(max(hand.score, 0.0), 1.0) * 255))
+        rec['n_hands'] = n
+
+        self.record.tofile(self.file)
+        self.frames += 1
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TraceReader:
+    """
+    Memory-maps a trace written by TraceWriter and replays it as HandFrames.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE:
+            raise ValueError(f"{path}: not a landmark trace (file too short)")
+        magic, version, max_hands, scale, start_wall_time = struct.unpack(HEADER_FORMAT, header)
+        if magic != TRACE_MAGIC:
+            raise ValueError(f"{path}: not a landmark trace")
+        if version != TRACE_VERSION or max_hands != MAX_HANDS:
+            raise ValueError(f"{path}: unsupported trace version {version}")
+        self.scale = scale
+        self.start_wall_time = start_wall_time
+
+        try:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER_SIZE)
+        except ValueError:
+            # mmap of a zero length region is not allowed
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+
+    def __len__(self):
+        return len(self.records)
+
+    def duration(self):
+        """Recorded duration in seconds"""
+        if len(self.records) == 0:
+            return 0.0
+        return (int(self.records['t_us'][-1]) - int(self.records['t_us'][0])) / 1e6
+
+    def landmarks(self, index):
+        """(n_hands, 21, 3) float32 array of frame 'index'"""
+        rec = self.records[index]
+        return rec['landmarks'][:rec['n_hands']].astype(np.float32) / self.scale
+
+    def hands(self, index):
+        """HandFrames of frame 'index', timestamped in seconds since the trace start"""
+        rec = self.records[index]
+        n = int(rec['n_hands'])
+        timestamp = int(rec['t_us']) / 1e6
+        landmarks = self.landmarks(index)
+        return [HandFrame(landmarks[i], LABELS[rec['label'][i]], rec['score'][i] / 255.0, timestamp)
+                for i in range(n)]
+
+    def __iter__(self):
+        """Yields (timestamp in seconds, HandFrames) for every recorded frame"""
+        for i in range(len(self.records)):
+            yield int(self.records['t_us'][i]) / 1e6, self.hands(i)
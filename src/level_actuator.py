@@ -0,0 +1,237 @@
+import math
+import threading
+import time
+
+
+class LevelActuator:
+    """
+    Applies a system level (volume, brightness, 0.0 - 1.0) off the vision
+    thread.
+
+    'nudge' and 'set' only update one absolute target: deltas posted while
+    the backend is still busy add up to that target, and the thread applies
+    whatever the latest target is when it gets to it, one backend call for
+    any number of steps. The level the target builds on is the last one
+    applied, re-read from the backend when it is older than
+    'resync_interval' seconds, so changes made elsewhere are picked up.
+
+    With 'fade_step' set the thread fades to the target in steps of that
+    size every 'fade_interval' seconds; a new target posted during a fade
+    replaces it, and the next fade starts from the level reached.
+
+    'backend' provides get_level() and set_level(level), and optionally
+    thread_init(), called once on the actuator thread before the first
+    backend call. Until 'start' is called every call runs synchronously
+    and jumps straight to the target. An actuator can be shared: every
+    user calls 'start' and 'stop', the thread runs until the last one stops.
+    """
+
+    def __init__(self, backend, name='level', resync_interval=2.0, fade_step=None, fade_interval=0.01):
+        self.backend = backend
+        self.name = name
+        self.resync_interval = resync_interval
+        self.fade_step = fade_step
+        self.fade_interval = fade_interval
+        self.cond = threading.Condition()
+        self.pending_delta = 0.0
+        self.pending_level = None   # absolute level posted with 'set'
+        self.has_pending = False
+        self.applying = False
+        self.level = None           # last level read or applied
+        self.heading = None         # target of a fade that was replaced
+        self.level_time = None
+        self.running = False
+        self.thread = None
+        self.users = 0
+        self.lifecycle = threading.Lock()  # serializes start / stop
+
+        self.requests = 0
+        self.applied = 0
+        self.reads = 0
+        self.errors = 0
+        self.fades_replaced = 0
+
+    def start(self):
+        with self.lifecycle:
+            self.users += 1
+            if self.thread is None:
+                self.running = True
+                self.thread = threading.Thread(target=self._run, name=f"LevelActuator-{self.name}", daemon=True)
+                self.thread.start()
+        return self
+
+    def nudge(self, delta):
+        """Moves the target by 'delta', returns the target if the current level is known, else None"""
+        return self._post(None, delta)
+
+    def set(self, level):
+        """Sets the target to 'level'"""
+        return self._post(level, 0.0)
+
+    def target(self):
+        """Level the actuator is heading to, None if not known yet"""
+        with self.cond:
+            return self._target(self.level)
+
+    def _target(self, level):
+        # deltas build on the target of an interrupted fade, not on where it stopped
+        if self.heading is not None:
+            level = self.heading
+        if self.pending_level is not None:
+            level = self.pending_level
+        if level is None:
+            return None
+        return min(1.0, max(0.0, level + self.pending_delta))
+
+    def _post(self, level, delta):
+        self.requests += 1
+        with self.cond:
+            if level is not None:
+                self.pending_level = level
+                self.pending_delta = 0.0
+            self.pending_delta += delta
+            self.has_pending = True
+            target = self._target(self.level)
+            self.cond.notify()
+        if self.thread is None:
+            self._apply()
+            return self.level
+        return target
+
+    def _apply(self):
+        now = time.perf_counter()
+        level = self.level
+        if level is None or now - self.level_time >= self.resync_interval:
+            try:
+                level = self.backend.get_level()
+                self.reads += 1
+            except Exception as e:
+                self.errors += 1
+                print(f"Error reading {self.name}: {e}")
+                level = self.level
+
+        with self.cond:
+            target = self._target(level)
+            self.pending_level = None
+            self.pending_delta = 0.0
+            self.has_pending = False
+            self.heading = None
+            self.applying = True
+        try:
+            if target is not None:
+                if target != level:
+                    target = self._set_level(level, target)
+                self.level = target
+                self.level_time = now
+        except Exception as e:
+            self.errors += 1
+            self.level = None
+            print(f"Error setting {self.name}: {e}")
+        finally:
+            self.applying = False
+
+    def _set_level(self, level, target):
+        """Sets 'target', fading from 'level' on the thread; returns the level reached"""
+        if not self.fade_step or level is None or self.thread is None:
+            self.backend.set_level(target)
+            self.applied += 1
+            return target
+        steps = max(1, math.ceil(abs(target - level) / self.fade_step - 1e-9))
+        for i in range(1, steps + 1):
+            value = target if i == steps else level + (target - level) * i / steps
+            self.backend.set_level(value)
+            self.applied += 1
+            self.level = value
+            if i == steps:
+                break
+            with self.cond:
+                self.cond.wait_for(lambda: self.has_pending or not self.running, self.fade_interval)
+                if self.has_pending:
+                    # the newest target takes over from here
+                    self.heading = target
+                    self.fades_replaced += 1
+                    return value
+                stopping = not self.running
+            if stopping:
+                self.backend.set_level(target)
+                self.applied += 1
+                break
+        return target
+
+    def _run(self):
+        thread_init = getattr(self.backend, 'thread_init', None)
+        if thread_init is not None:
+            thread_init()
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.has_pending or not self.running)
+                if not self.has_pending:
+                    break
+            self._apply()
+
+    def resync(self):
+        """Forgets the level applied last, the next change re-reads it from the backend"""
+        with self.cond:
+            self.level = None
+            self.heading = None
+
+    def flush(self, timeout=1.0):
+        """Waits until the latest target was applied, True if it was"""
+        deadline = time.perf_counter() + timeout
+        while self.thread is not None and (self.has_pending or self.applying):
+            if time.perf_counter() > deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+    def stop(self, force=False):
+        """
+        Stops the thread after applying the last target, once every user
+        that started it has stopped; 'force' stops it regardless
+        """
+        with self.lifecycle:
+            self.users = 0 if force else max(self.users - 1, 0)
+            if self.users:
+                return
+            with self.cond:
+                self.running = False
+                self.cond.notify()
+            if self.thread is not None:
+                self.thread.join(timeout=2.0)
+            self.thread = None
+
+    def stats(self):
+        return {
+            'requests': self.requests,
+            'applied': self.applied,
+            'reads': self.reads,
+            'errors': self.errors,
+            'fades_replaced': self.fades_replaced,
+        }
+
+
+class FakeLevelBackend:
+    """
+    Level kept in memory, each call taking 'latency' seconds like a slow
+    device, for benchmarks and machines without the real control
+    """
+
+    name = 'fake'
+
+    def __init__(self, level=0.5, latency=0.0):
+        self.level = level
+        self.latency = latency
+        self.gets = 0
+        self.sets = 0
+
+    def get_level(self):
+        if self.latency:
+            time.sleep(self.latency)
+        self.gets += 1
+        return self.level
+
+    def set_level(self, level):
+        if self.latency:
+            time.sleep(self.latency)
+        self.sets += 1
+        self.level = level
@@ -0,0 +1,198 @@
+import collections
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# Stages of one frame, in pipeline order. 'total' is the time from capture to
+# the end of processing of the frame.
+STAGES = ('capture', 'color', 'inference', 'classify_hands', 'finger_state',
+          'custom_match', 'controls', 'render', 'total')
+
+
+class RollingLatency:
+    """
+    Latency samples of one stage. Percentiles are taken over a rolling window
+    of the last 'window' samples, count / mean / max over the whole run.
+    """
+
+    def __init__(self, window=1024):
+        self.samples = np.zeros(window, dtype=np.float64)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self.samples[self.count % len(self.samples)] = value
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def summary(self):
+        """Milliseconds: mean, p50, p95, p99, max"""
+        if self.count == 0:
+            return None
+        window = self.samples[:min(self.count, len(self.samples))]
+        p50, p95, p99 = np.percentile(window, (50, 95, 99)) * 1000
+        return {
+            'count': self.count,
+            'mean': self.total / self.count * 1000,
+            'p50': float(p50),
+            'p95': float(p95),
+            'p99': float(p99),
+            'max': self.max * 1000,
+        }
+
+
+class PipelineMetrics:
+    """
+    Per-stage timing of the gesture pipeline.
+
+    Stages are timed with 'record(stage, start)', which adds the time since
+    'start' to the stage and returns the current time, so consecutive stages
+    can be chained. Times of a stage are summed over the frame and pushed to
+    the stage's rolling window in 'end_frame'. A frame that takes longer than
+    'budget_ms' from capture to the end of processing is counted as a stall,
+    together with its slowest stage.
+    """
+
+    def __init__(self, budget_ms=50.0, window=1024):
+        self.budget = budget_ms / 1000.0
+        self.stages = {name: RollingLatency(window) for name in STAGES}
+        self.frame_times = dict.fromkeys(STAGES, 0.0)
+        self.frame_start = 0.0
+        self.capture_time = None
+        self.frames = 0
+        self.stalls = 0
+        self.recent_stalls = collections.deque(maxlen=20)
+        self.last_stall_report = 0.0
+        self.exporter = None
+        self.server = None
+
+    def begin_frame(self, capture_time=None):
+        """Starts timing a frame, 'capture_time' is the perf_counter() time the frame was captured"""
+        now = time.perf_counter()
+        frame_times = self.frame_times
+        for name in frame_times:
+            frame_times[name] = 0.0
+        self.frame_start = now
+        self.capture_time = capture_time
+        if capture_time is not None:
+            frame_times['capture'] = now - capture_time
+        return now
+
+    def record(self, stage, start):
+        now = time.perf_counter()
+        self.frame_times[stage] += now - start
+        return now
+
+    def end_frame(self):
+        now = time.perf_counter()
+        start = self.capture_time if self.capture_time is not None else self.frame_start
+        total = now - start
+        frame_times = self.frame_times
+        frame_times['total'] = total
+
+        for name, value in frame_times.items():
+            if value > 0.0:
+                self.stages[name].add(value)
+        self.frames += 1
+
+        if total > self.budget:
+            self.stalls += 1
+            slowest = max((name for name in STAGES if name != 'total'), key=frame_times.get)
+            stall = {
+                'frame': self.frames,
+                'total_ms': total * 1000,
+                'stage': slowest,
+                'stage_ms': frame_times[slowest] * 1000,
+            }
+            self.recent_stalls.append(stall)
+            # at most one message per second
+            if now - self.last_stall_report > 1.0:
+                self.last_stall_report = now
+                print(f"Stall: frame {stall['frame']} took {stall['total_ms']:.1f} ms "
+                      f"(budget {self.budget * 1000:.0f} ms), slowest stage "
+                      f"{stall['stage']} {stall['stage_ms']:.1f} ms")
+        return now
+
+    def summary(self):
+        return {
+            'frames': self.frames,
+            'stalls': self.stalls,
+            'budget_ms': self.budget * 1000,
+            'stages': {name: hist.summary() for name, hist in self.stages.items() if hist.count},
+            'recent_stalls': list(self.recent_stalls),
+        }
+
+    def report(self):
+        """Prints the per-stage latency table"""
+        summary = self.summary()
+        print(f"Stage latency (ms) over {summary['frames']} frames, "
+              f"{summary['stalls']} over the {summary['budget_ms']:.0f} ms budget:")
+        print(f"  {'stage':<15}{'count':>8}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+        for name in STAGES:
+            s = summary['stages'].get(name)
+            if s is None:
+                continue
+            print(f"  {name:<15}{s['count']:>8}{s['mean']:>9.2f}{s['p50']:>9.2f}"
+                  f"{s['p95']:>9.2f}{s['p99']:>9.2f}{s['max']:>9.2f}")
+
+    def write_json(self, path):
+        """Writes the summary to 'path', replacing the file atomically"""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def start_exporter(self, path=None, port=None, interval=1.0):
+        """
+        Exposes the live summary as a JSON file rewritten every 'interval'
+        seconds and/or on http://127.0.0.1:<port>/metrics
+        """
+        if port is not None:
+            metrics = self
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.rstrip('/') not in ('', '/metrics'):
+                        self.send_error(404)
+                        return
+                    body = json.dumps(metrics.summary(), indent=2).encode()
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass
+
+            self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+            threading.Thread(target=self.server.serve_forever, name="MetricsServer", daemon=True).start()
+            print(f"Metrics on http://127.0.0.1:{port}/metrics")
+
+        if path is not None:
+            stop = threading.Event()
+
+            def export():
+                while not stop.wait(interval):
+                    self.write_json(path)
+
+            threading.Thread(target=export, name="MetricsExporter", daemon=True).start()
+            self.exporter = (stop, path)
+
+    def stop_exporter(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        if self.exporter is not None:
+            stop, path = self.exporter
+            stop.set()
+            self.write_json(path)
+            self.exporter = None
@@ -0,0 +1,142 @@
+import math
+import time
+
+import numpy as np
+
+from landmark_filter import OneEuroFilter
+
+
+class PiecewiseCurve:
+    """
+    The original acceleration curve on hand speed instead of per-frame
+    distance: no motion below 'dead_zone' px/s, a gain growing linearly
+    with speed ('slope' per px/s) up to 'linear_until' px/s and 'max_gain'
+    above. The defaults match the per-frame curve (5 px, 0.07 * dist,
+    30 px, 2.1x) at 30 fps.
+    """
+
+    def __init__(self, dead_zone=150.0, linear_until=900.0, slope=0.07 / 30, max_gain=2.1):
+        self.dead_zone = dead_zone
+        self.linear_until = linear_until
+        self.slope = slope
+        self.max_gain = max_gain
+
+    def __call__(self, speed):
+        if speed <= self.dead_zone:
+            return 0.0
+        if speed <= self.linear_until:
+            return self.slope * speed
+        return self.max_gain
+
+
+class ExponentialCurve:
+    """
+    Gain (speed / 'ref_speed') ** 'exponent', 1 at 'ref_speed' px/s, capped
+    at 'max_gain', with no motion below 'dead_zone' px/s
+    """
+
+    def __init__(self, ref_speed=600.0, exponent=0.8, max_gain=2.5, dead_zone=60.0):
+        self.ref_speed = ref_speed
+        self.exponent = exponent
+        self.max_gain = max_gain
+        self.dead_zone = dead_zone
+
+    def __call__(self, speed):
+        if speed <= self.dead_zone:
+            return 0.0
+        return min(self.max_gain, (speed / self.ref_speed) ** self.exponent)
+
+
+class TableCurve:
+    """Gain interpolated linearly between (speed px/s, gain) points, constant past the ends"""
+
+    def __init__(self, points=((0.0, 0.0), (60.0, 0.0), (120.0, 0.4), (600.0, 1.2), (1500.0, 2.2))):
+        points = sorted(points)
+        self.speeds = [float(speed) for speed, _ in points]
+        self.gains = [float(gain) for _, gain in points]
+
+    def __call__(self, speed):
+        return float(np.interp(speed, self.speeds, self.gains))
+
+
+POINTER_CURVES = {
+    'legacy': PiecewiseCurve,
+    'exponential': ExponentialCurve,
+    'table': TableCurve,
+}
+
+
+class PointerFilter:
+    """
+    Turns the hand position of consecutive frames into relative cursor
+    motion.
+
+    The hand position is optionally smoothed ('smoothing', a OneEuroFilter
+    on normalized coordinates or None), then its velocity is taken over the
+    real time between frames, so the gain 'curve' (a callable from speed in
+    screen px/s to gain) sees the same speed at any frame rate and the
+    cursor covers the same distance for the same hand motion.
+
+    Curve and smoothing can be swapped at any time; a gap longer than
+    'max_gap' seconds restarts the motion instead of jumping.
+    """
+
+    def __init__(self, curve=None, smoothing=None, max_gap=0.25):
+        self.curve = curve if curve is not None else PiecewiseCurve()
+        self.smoothing = smoothing
+        self.max_gap = max_gap
+        self.last = None
+        self.last_time = None
+
+    def set_curve(self, curve):
+        self.curve = curve
+
+    def set_smoothing(self, smoothing):
+        self.smoothing = smoothing
+        self.reset()
+
+    def reset(self):
+        self.last = None
+        self.last_time = None
+        if self.smoothing is not None:
+            self.smoothing.reset()
+
+    def update(self, position, size, now=None):
+        """
+        Cursor motion (dx, dy) in px for the normalized hand 'position' at
+        'now' (seconds) on a screen of 'size' px
+        """
+        if now is None:
+            now = time.perf_counter()
+        if self.last_time is not None and now - self.last_time > self.max_gap:
+            self.reset()
+
+        x, y = position
+        if self.smoothing is not None:
+            x, y = self.smoothing(np.array(position, dtype=np.float32), now).tolist()
+        x *= size[0]
+        y *= size[1]
+
+        if self.last is None:
+            self.last = (x, y)
+            self.last_time = now
+            return 0.0, 0.0
+        dt = now - self.last_time
+        if dt <= 0:
+            # held frame of a hand missing from this frame
+            return 0.0, 0.0
+
+        dx = x - self.last[0]
+        dy = y - self.last[1]
+        self.last = (x, y)
+        self.last_time = now
+        gain = self.curve(math.hypot(dx, dy) / dt)
+        return dx * gain, dy * gain
+
+
+def make_pointer_filter(curve='legacy', smoothing='none', **curve_args):
+    """PointerFilter with one of POINTER_CURVES and 'none' or 'one-euro' smoothing"""
+    if smoothing not in ('none', 'one-euro'):
+        raise ValueError(f"unknown pointer smoothing {smoothing!r}")
+    smoother = OneEuroFilter(min_cutoff=1.0, beta=10.0) if smoothing == 'one-euro' else None
+    return PointerFilter(POINTER_CURVES[curve](**curve_args), smoother)
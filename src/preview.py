@@ -0,0 +1,170 @@
+import threading
+import time
+import cv2
+import numpy as np
+
+# MediaPipe's hand skeleton
+HAND_CONNECTIONS = ((0, 1), (1, 2), (2, 3), (3, 4), (0, 5), (5, 6), (6, 7), (7, 8),
+                    (5, 9), (9, 10), (10, 11), (11, 12), (9, 13), (13, 14), (14, 15), (15, 16),
+                    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20))
+CONNECTION_COLOR = (224, 224, 224)
+LANDMARK_COLOR = (0, 0, 255)
+LANDMARK_BORDER_COLOR = (224, 224, 224)
+
+
+def draw_hand(image, coords):
+    """Draws the skeleton of a hand's (21, 3) normalized landmark coordinates like mp_drawing does"""
+    height, width = image.shape[:2]
+    points = np.rint(coords[:, :2] * (width, height)).astype(np.int32)
+    cv2.polylines(image, [points[list(pair)] for pair in HAND_CONNECTIONS], False, CONNECTION_COLOR, 2)
+    for x, y in points.tolist():
+        cv2.circle(image, (x, y), 3, LANDMARK_BORDER_COLOR, 2)
+        cv2.circle(image, (x, y), 2, LANDMARK_COLOR, 2)
+
+
+class TextOverlay:
+    """
+    Static text pre-rendered once per frame size and blended onto frames
+    with its coverage mask, instead of rasterizing it with cv2.putText
+    every frame.
+    """
+
+    def __init__(self, text, org, scale, color, thickness):
+        self.text = text
+        self.org = org  # negative y counts from the bottom of the frame
+        self.scale = scale
+        self.color = color
+        self.thickness = thickness
+        self.shape = None
+        self.region = None
+        self.alpha = None
+        self.inv_alpha = None
+        self.color_patch = None
+
+    def _render(self, shape):
+        height, width = shape[:2]
+        x, y = self.org
+        if y < 0:
+            y += height
+        (text_w, text_h), baseline = cv2.getTextSize(self.text, cv2.FONT_HERSHEY_SIMPLEX, self.scale, self.thickness)
+        pad = self.thickness + 1
+        y0 = max(0, y - text_h - pad)
+        y1 = min(height, y + baseline + pad)
+        x0 = max(0, x - pad)
+        x1 = min(width, x + text_w + pad)
+
+        coverage = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+        cv2.putText(coverage, self.text, (x - x0, y - y0), cv2.FONT_HERSHEY_SIMPLEX,
+                    self.scale, 255, self.thickness)
+        self.alpha = coverage.astype(np.float32) / 255.0
+        self.inv_alpha = 1.0 - self.alpha
+        self.color_patch = np.empty((y1 - y0, x1 - x0, shape[2]), dtype=np.uint8)
+        self.color_patch[:] = self.color
+        self.region = (slice(y0, y1), slice(x0, x1))
+        self.shape = shape
+
+    def draw(self, image):
+        if self.shape != image.shape:
+            self._render(image.shape)
+        target = image[self.region]
+        cv2.blendLinear(target, self.color_patch, self.inv_alpha, self.alpha, dst=target)
+
+
+class PreviewRenderer:
+    """
+    Draws and shows the preview window on its own thread at a limited rate.
+
+    The control loop only hands over frames with 'submit', which copies the
+    frame when a new preview frame is due and the renderer is idle, and
+    returns immediately otherwise. Landmarks, overlays, imshow and waitKey
+    all run on the renderer thread, so control never waits on the window.
+    """
+
+    def __init__(self, window_name, fps=15.0):
+        self.window_name = window_name
+        self.interval = 1.0 / fps
+        self.cond = threading.Condition()
+        self.buffer = None
+        self.hands = None
+        self.status_text = None
+        self.pending = False
+        self.last_submit = 0.0
+        self.running = False
+        self.exit_requested = False
+        self.thread = None
+        self.frames_shown = 0
+
+        self.hands_overlay = TextOverlay("Custom gestures enabled", (10, -10), 0.5, (255, 255, 255), 1)
+        self.no_hands_overlay = TextOverlay("Show hand for gesture control", (10, 30), 0.7, (0, 0, 255), 2)
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="PreviewRenderer", daemon=True)
+        self.thread.start()
+        return self
+
+    def wants_frame(self, now=None):
+        """True if a frame submitted now would be shown"""
+        if now is None:
+            now = time.perf_counter()
+        return not self.pending and now - self.last_submit >= self.interval
+
+    def submit(self, image, hands=None, status_text=None):
+        """Hands a frame and its HandFrames to the renderer if one is due, never blocks on drawing"""
+        now = time.perf_counter()
+        if not self.wants_frame(now):
+            return False
+        with self.cond:
+            if self.buffer is None or self.buffer.shape != image.shape:
+                self.buffer = np.empty_like(image)
+            np.copyto(self.buffer, image)
+            self.hands = hands
+            self.status_text = status_text
+            self.pending = True
+            self.last_submit = now
+            self.cond.notify()
+        return True
+
+    def _run(self):
+        # window calls stay on this thread
+        while self.running:
+            with self.cond:
+                self.cond.wait_for(lambda: self.pending or not self.running, 0.1)
+                job = (self.buffer, self.hands, self.status_text) if self.pending else None
+
+            if job is not None:
+                image, hands, status_text = job
+                self._draw(image, hands, status_text)
+                cv2.imshow(self.window_name, image)
+                self.frames_shown += 1
+
+            if self.frames_shown:
+                # Exit on ESC key or Enter key
+                key = cv2.waitKey(1) & 0xFF
+                if key == 13 or key == 27:
+                    self.exit_requested = True
+
+            if job is not None:
+                with self.cond:
+                    self.pending = False
+
+        if self.frames_shown:
+            cv2.destroyWindow(self.window_name)
+
+    def _draw(self, image, hands, status_text):
+        if hands:
+            for hand in hands:
+                draw_hand(image, hand.coords)
+            self.hands_overlay.draw(image)
+            if status_text:
+                cv2.putText(image, status_text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+        else:
+            self.no_hands_overlay.draw(image)
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        if self.thread is not None:
+            self.thread.join(timeout=2.0)
+        self.thread = None
@@ -0,0 +1,146 @@
+import math
+import threading
+import time
+
+from input_backend import get_backend
+
+
+class ScrollEngine:
+    """
+    Analog scrolling: the pinch sets a scroll velocity, a thread turns it
+    into wheel events.
+
+    'set_velocity' is called every frame with the velocity in wheel notches
+    per second (positive up / right). The thread scrolls by velocity * time
+    at 'rate_hz', in fractions of a notch where the input backend takes high
+    resolution wheel deltas, so the scroll speed is independent of the frame
+    rate and starts on the first frame past the dead zone. After 'release'
+    the velocity decays with time constant 'momentum' seconds until it drops
+    below 'min_velocity'; a new 'set_velocity' (a new pinch) takes over at
+    once.
+
+    Until 'start' is called every 'set_velocity' scrolls synchronously by
+    the distance since the previous call and there is no momentum, which
+    keeps replays and benchmarks deterministic.
+    """
+
+    def __init__(self, rate_hz=120.0, momentum=0.35, min_velocity=0.5, backend=None):
+        self.interval = 1.0 / rate_hz
+        self.momentum = momentum
+        self.min_velocity = min_velocity
+        self.backend = backend
+        self.cond = threading.Condition()
+        self.velocity = (0.0, 0.0)  # notches/s, vertical and horizontal
+        self.driven = False         # velocity set by a pinch, not coasting
+        self.last_time = None
+        self.running = False
+        self.thread = None
+
+        self.updates = 0
+        self.scroll_events = 0
+        self.notches = 0.0
+        self.coasts = 0
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="ScrollEngine", daemon=True)
+        self.thread.start()
+        return self
+
+    def set_velocity(self, vertical, horizontal=0.0, now=None):
+        """Sets the scroll velocity in notches/s, never blocks"""
+        self.updates += 1
+        if self.thread is None:
+            if now is None:
+                now = time.perf_counter()
+            if self.driven and self.last_time is not None:
+                self._scroll_by(self.velocity, now - self.last_time)
+            self.velocity = (vertical, horizontal)
+            self.driven = True
+            self.last_time = now
+            return
+        with self.cond:
+            self.velocity = (vertical, horizontal)
+            self.driven = True
+            self.cond.notify()
+
+    def release(self):
+        """Ends the pinch, the scroll coasts to a stop"""
+        with self.cond:
+            if not self.driven:
+                return
+            self.driven = False
+            if self.thread is None:
+                self.velocity = (0.0, 0.0)
+                self.last_time = None
+            elif self._moving():
+                self.coasts += 1
+            self.cond.notify()
+
+    def _moving(self):
+        return abs(self.velocity[0]) >= self.min_velocity or abs(self.velocity[1]) >= self.min_velocity
+
+    def _has_work(self):
+        return (self.driven and any(self.velocity)) or self._moving() or not self.running
+
+    def _backend(self):
+        return self.backend if self.backend is not None else get_backend()
+
+    def _scroll_by(self, velocity, dt):
+        vertical, horizontal = velocity
+        backend = self._backend()
+        with backend.batch():
+            for notches, is_horizontal in ((vertical * dt, False), (horizontal * dt, True)):
+                if notches and backend.scroll(notches, is_horizontal):
+                    self.scroll_events += 1
+                self.notches += abs(notches)
+
+    def _run(self):
+        last_step = None
+        while True:
+            with self.cond:
+                self.cond.wait_for(self._has_work)
+                if not self.running:
+                    break
+
+            now = time.perf_counter()
+            if last_step is None or now - last_step > 4 * self.interval:
+                # first step after idling covers one interval
+                last_step = now - self.interval
+            delay = last_step + self.interval - now
+            if delay > 0:
+                with self.cond:
+                    if self.cond.wait_for(lambda: not self.running, delay):
+                        break
+                now = time.perf_counter()
+
+            dt = now - last_step
+            last_step = now
+            with self.cond:
+                scale = 1.0
+                velocity = self.velocity
+                if not self.driven:
+                    # momentum: the velocity decays exponentially, the step
+                    # covers the integral of the decaying velocity over dt
+                    decay = math.exp(-dt / self.momentum)
+                    scale = self.momentum * (1.0 - decay) / dt
+                    self.velocity = (velocity[0] * decay, velocity[1] * decay)
+                    if not self._moving():
+                        self.velocity = (0.0, 0.0)
+            self._scroll_by(velocity, dt * scale)
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        if self.thread is not None:
+            self.thread.join(timeout=2.0)
+        self.thread = None
+
+    def stats(self):
+        return {
+            'updates': self.updates,
+            'scroll_events': self.scroll_events,
+            'notches': self.notches,
+            'coasts': self.coasts,
+        }